@@ -0,0 +1,243 @@
+# scripts/benchmarks/fake_akshare.py
+"""
+离线基准使用的 AkShare 替身
+
+按 AkShareFetcher 使用的接口生成列名与真实接口一致的确定性数据（同一代码、同一区间每次结果相同），
+并支持配置请求延迟和错误注入。用法：
+
+    from scripts.benchmarks import fake_akshare
+    fake_akshare.install(stocks=500, latency=0.05, error_rate=0.01)
+    # 之后导入的 AkShareFetcher 使用替身数据
+"""
+
+import hashlib
+import random
+import sys
+import threading
+import time
+import types
+
+import numpy as np
+import pandas as pd
+
+# 随机游走序列的固定长度（1990-01-01 起约 50 年），随机数的消耗与请求区间无关
+_HORIZON_DAYS = 50 * 366
+
+
+class FakeAkShare:
+    """
+    AkShare 替身
+
+    latency 为平均请求延迟（秒，实际延迟在 0.5~1.5 倍之间随机），error_rate 为请求失败的概率
+    """
+
+    def __init__(self, stocks=500, indexes=50, concepts=100, latency=0.0, error_rate=0.0, seed=0):
+        """
+        初始化替身
+        """
+        self.stocks = stocks
+        self.indexes = indexes
+        self.concepts = concepts
+        self.latency = latency
+        self.error_rate = error_rate
+        self.seed = seed
+        self.calls = 0
+        self.spot_date = None
+        self.errors = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _simulate_request(self):
+        """
+        模拟网络延迟和随机错误
+        """
+        with self._lock:
+            self.calls += 1
+            delay = self.latency * self._random.uniform(0.5, 1.5) if self.latency else 0.0
+            fail = self._random.random() < self.error_rate
+            if fail:
+                self.errors += 1
+        if delay:
+            time.sleep(delay)
+        if fail:
+            raise ConnectionError("Injected error from fake akshare backend")
+
+    def _rng(self, *key) -> np.random.Generator:
+        """
+        按代码生成确定性的随机数发生器（不依赖进程内随机化的 hash()）
+        """
+        digest = hashlib.sha256(repr((self.seed,) + key).encode("utf-8")).digest()
+        return np.random.default_rng(int.from_bytes(digest[:8], "little"))
+
+    @staticmethod
+    def _dates(start_date, end_date) -> pd.DatetimeIndex:
+        """
+        区间内的工作日
+        """
+        return pd.bdate_range(pd.Timestamp(str(start_date)), pd.Timestamp(str(end_date)))
+
+    def _bars(self, key, dates: pd.DatetimeIndex) -> dict:
+        """
+        生成随机游走的 OHLCV 数据，同一代码同一日期的数据与请求区间无关
+        """
+        rng = self._rng(key)
+        # 以 1990-01-01 为起点生成完整序列后截取，保证不同区间的请求结果一致
+        offsets = (dates - pd.Timestamp("1990-01-01")).days.to_numpy()
+        horizon = max(int(offsets.max()) + 1, _HORIZON_DAYS) if len(offsets) else 0
+        returns = rng.normal(0, 0.02, horizon)
+        closes = (10 + rng.uniform(0, 90)) * np.exp(np.cumsum(returns))[offsets] if horizon else np.empty(0)
+        prev_closes = closes / np.exp(returns[offsets]) if horizon else np.empty(0)
+        noise = rng.uniform(0, 0.02, (4, horizon))[:, offsets] if horizon else np.empty((4, 0))
+        opens = prev_closes * (1 + noise[0] - 0.01)
+        highs = np.maximum(opens, closes) * (1 + noise[1])
+        lows = np.minimum(opens, closes) * (1 - noise[2])
+        volumes = (rng.integers(1_000_000, 50_000_000, horizon)[offsets] if horizon else np.empty(0)).astype("int64")
+        return {
+            "open": opens.round(2), "close": closes.round(2), "high": highs.round(2), "low": lows.round(2),
+            "prev_close": prev_closes, "volume": volumes, "amount": (volumes * closes).round(2),
+            "turnover_rate": (noise[3] * 100).round(2),
+        }
+
+    def stock_zh_a_spot(self) -> pd.DataFrame:
+        """新浪 A 股实时行情（股票列表），行情为 spot_date（默认今天）的日线，与 stock_zh_a_daily 的不复权数据一致"""
+        self._simulate_request()
+        codes = [f"sh{600000 + i}" if i % 2 == 0 else f"sz{i:06d}" for i in range(self.stocks)]
+        day = pd.DatetimeIndex([pd.Timestamp(self.spot_date or pd.Timestamp.today().normalize())])
+        bars = pd.DataFrame([{name: values[0] for name, values in self._bars(("stock", code), day).items()}
+                             for code in codes])
+        return pd.DataFrame({
+            "代码": codes, "名称": [f"股票{i}" for i in range(self.stocks)],
+            "最新价": bars["close"], "昨收": bars["prev_close"].round(2), "今开": bars["open"],
+            "最高": bars["high"], "最低": bars["low"], "成交量": bars["volume"], "成交额": bars["amount"],
+        })
+
+    def _hfq_factors(self, symbol) -> pd.DataFrame:
+        """
+        确定性的后复权因子：1900-01-01 的基准因子加上 0~3 次除权除息
+        """
+        rng = self._rng("adj", symbol)
+        offsets = np.sort(rng.choice(9000, rng.integers(0, 4), replace=False))
+        events = pd.Timestamp("2000-01-03") + pd.to_timedelta(offsets, unit="D")
+        factors = np.cumprod(np.concatenate([[1.0], 1 + rng.uniform(0.02, 0.5, len(events))])).round(4)
+        return pd.DataFrame({"date": pd.DatetimeIndex(["1900-01-01"]).append(events).date,
+                             "hfq_factor": factors})
+
+    def stock_zh_a_daily(self, symbol, start_date="19900101", end_date="21000118", adjust="") -> pd.DataFrame:
+        """新浪 A 股日线；adjust 为 hfq-factor/qfq-factor 时返回复权因子"""
+        self._simulate_request()
+        factors = self._hfq_factors(symbol)
+        if adjust == "hfq-factor":
+            return factors
+        if adjust == "qfq-factor":
+            return pd.DataFrame({"date": factors["date"][::-1].to_numpy(),
+                                 "qfq_factor": (factors["hfq_factor"].iloc[-1] / factors["hfq_factor"])[::-1].to_numpy()})
+        dates = self._dates(start_date, end_date)
+        bars = self._bars(("stock", symbol), dates)
+        multiplier = np.ones(len(dates))
+        if adjust in ("hfq", "qfq"):
+            position = np.searchsorted(pd.DatetimeIndex(factors["date"]).to_numpy(), dates.to_numpy(), side="right") - 1
+            multiplier = factors["hfq_factor"].to_numpy()[np.maximum(position, 0)]
+            if adjust == "qfq":
+                multiplier = multiplier / factors["hfq_factor"].iloc[-1]
+        return pd.DataFrame({
+            "date": dates.date,
+            "open": bars["open"] * multiplier,
+            "high": bars["high"] * multiplier,
+            "low": bars["low"] * multiplier,
+            "close": bars["close"] * multiplier,
+            "volume": bars["volume"].astype("float64"),
+            "amount": bars["amount"],
+            "outstanding_share": float(self._rng("shares", symbol).integers(100_000_000, 5_000_000_000)),
+            "turnover": (bars["turnover_rate"] / 100).round(6),
+        })
+
+    def stock_zh_index_spot_em(self, symbol="沪深重要指数") -> pd.DataFrame:
+        """东方财富指数实时行情（指数列表）"""
+        self._simulate_request()
+        return pd.DataFrame({
+            "序号": range(1, self.indexes + 1),
+            "代码": [f"{i:06d}" for i in range(1, self.indexes + 1)],
+            "名称": [f"指数{i}" for i in range(1, self.indexes + 1)],
+        })
+
+    def _em_hist(self, key, start_date, end_date) -> pd.DataFrame:
+        """
+        东方财富历史行情的通用列
+        """
+        dates = self._dates(start_date, end_date)
+        bars = self._bars(key, dates)
+        change = bars["close"] - bars["prev_close"]
+        return pd.DataFrame({
+            "日期": dates.strftime("%Y-%m-%d"),
+            "开盘": bars["open"],
+            "收盘": bars["close"],
+            "最高": bars["high"],
+            "最低": bars["low"],
+            "成交量": bars["volume"],
+            "成交额": bars["amount"],
+            "振幅": ((bars["high"] - bars["low"]) / bars["prev_close"] * 100).round(2),
+            "涨跌幅": (change / bars["prev_close"] * 100).round(2),
+            "涨跌额": change.round(2),
+            "换手率": bars["turnover_rate"],
+        })
+
+    def index_zh_a_hist(self, symbol, period="daily", start_date="19700101", end_date="20500101") -> pd.DataFrame:
+        """东方财富指数历史行情"""
+        self._simulate_request()
+        return self._em_hist(("index", symbol), start_date, end_date)
+
+    def stock_board_concept_name_em(self) -> pd.DataFrame:
+        """东方财富概念板块列表"""
+        self._simulate_request()
+        return pd.DataFrame({
+            "排名": range(1, self.concepts + 1),
+            "板块名称": [f"概念{i}" for i in range(self.concepts)],
+            "板块代码": [f"BK{i:04d}" for i in range(self.concepts)],
+        })
+
+    def stock_board_concept_hist_em(self, symbol, period="daily", start_date="20220101", end_date="20500101",
+                                    adjust="") -> pd.DataFrame:
+        """东方财富概念板块历史行情"""
+        self._simulate_request()
+        frame = self._em_hist(("concept", symbol), start_date, end_date)
+        # 概念板块接口的列顺序与指数接口不同
+        return frame[["日期", "开盘", "收盘", "最高", "最低", "涨跌幅", "涨跌额", "成交量", "成交额", "振幅", "换手率"]]
+
+    def stock_board_concept_cons_em(self, symbol) -> pd.DataFrame:
+        """东方财富概念板块成分股（5~30 只股票）"""
+        self._simulate_request()
+        rng = self._rng("constituents", symbol)
+        members = np.sort(rng.choice(self.stocks, min(self.stocks, int(rng.integers(5, 31))), replace=False))
+        codes = [f"{600000 + i}" if i % 2 == 0 else f"{i:06d}" for i in members]
+        return pd.DataFrame({"序号": range(1, len(codes) + 1), "代码": codes,
+                             "名称": [f"股票{i}" for i in members]})
+
+    def tool_trade_date_hist_sina(self) -> pd.DataFrame:
+        """新浪交易日历（1990-12-19 至当年年底的工作日）"""
+        self._simulate_request()
+        dates = pd.bdate_range("1990-12-19", f"{pd.Timestamp.today().year}-12-31")
+        return pd.DataFrame({"trade_date": dates.date})
+
+    def as_module(self) -> types.ModuleType:
+        """
+        包装为 akshare 模块
+        """
+        module = types.ModuleType("akshare")
+        for name in ("stock_zh_a_spot", "stock_zh_a_daily", "stock_zh_index_spot_em", "index_zh_a_hist",
+                     "stock_board_concept_name_em", "stock_board_concept_hist_em", "stock_board_concept_cons_em",
+                     "tool_trade_date_hist_sina"):
+            setattr(module, name, getattr(self, name))
+        return module
+
+
+def install(**kwargs) -> FakeAkShare:
+    """
+    用替身替换 akshare 模块，需在导入 AkShareFetcher 之前调用；已导入的获取器模块也会被替换
+    """
+    fake = FakeAkShare(**kwargs)
+    module = fake.as_module()
+    sys.modules["akshare"] = module
+    for name in ("src.data_ingestion.fetchers.akshare_fetcher", "src.data_ingestion.fetchers.async_akshare_fetcher"):
+        if name in sys.modules:
+            sys.modules[name].ak = module
+    return fake
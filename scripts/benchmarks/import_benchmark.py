@@ -0,0 +1,110 @@
+# scripts/benchmarks/import_benchmark.py
+"""
+CLI 启动开销检查
+
+在全新的解释器中检查：
+  - 导入 scripts.run_tasks 不加载 akshare、pandas、SQLAlchemy 等重量级依赖
+  - 导入单个任务模块不加载其它任务模块，也不导入 akshare（首次请求时才导入）
+  - run_tasks --help 的耗时（取多次中的最小值）不超过预算
+任一检查失败时以非零状态退出，可以放在 CI 中防止启动开销回退。
+
+用法: python -m scripts.benchmarks.import_benchmark [--budget-ms 400] [--repeat 5] [--top 10]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+HEAVY_MODULES = ("akshare", "pandas", "numpy", "sqlalchemy", "psycopg2", "pyarrow")
+TASK_MODULES = {
+    "stock": "src.data_ingestion.tasks.stock_tasks",
+    "index": "src.data_ingestion.tasks.index_tasks",
+    "concept": "src.data_ingestion.tasks.concept_tasks",
+}
+
+
+def python(code: str, *options) -> subprocess.CompletedProcess:
+    """
+    在全新的解释器中执行代码
+    """
+    env = dict(os.environ)
+    env.setdefault("DATABASE_URL", "sqlite://")
+    return subprocess.run([sys.executable, *options, "-c", code], capture_output=True, text=True, env=env, check=True)
+
+
+def loaded_modules(module: str, candidates) -> list:
+    """
+    导入 module 后，candidates 中已被加载的模块
+    """
+    code = (f"import sys, json, {module}\n"
+            f"print(json.dumps([name for name in {list(candidates)!r} if name in sys.modules]))")
+    return json.loads(python(code).stdout.strip().splitlines()[-1])
+
+
+def slowest_imports(module: str, top: int) -> list:
+    """
+    使用 -X importtime 统计导入 module 时累计耗时最多的模块，返回 [(微秒, 模块名)]
+    """
+    stderr = python(f"import {module}", "-X", "importtime").stderr
+    rows = []
+    for line in stderr.splitlines():
+        if line.startswith("import time:") and "|" in line and "cumulative" not in line:
+            _, cumulative, name = line[len("import time:"):].split("|")
+            rows.append((int(cumulative), name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def help_time(repeat: int) -> float:
+    """
+    运行 python -m scripts.run_tasks --help 的最短耗时（毫秒）
+    """
+    env = dict(os.environ)
+    env.setdefault("DATABASE_URL", "sqlite://")
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, "-m", "scripts.run_tasks", "--help"], capture_output=True, env=env, check=True)
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CLI 启动开销检查")
+    parser.add_argument("--budget-ms", type=float, default=400, help="run_tasks --help 的耗时预算（毫秒）")
+    parser.add_argument("--repeat", type=int, default=5, help="计时重复次数")
+    parser.add_argument("--top", type=int, default=10, help="列出累计导入耗时最多的模块数")
+    args = parser.parse_args()
+
+    failures = []
+    heavy = loaded_modules("scripts.run_tasks", HEAVY_MODULES)
+    print(f"import scripts.run_tasks loads heavy modules: {heavy or 'none'}")
+    if heavy:
+        failures.append(f"scripts.run_tasks imports {', '.join(heavy)} at import time")
+
+    for task, module in TASK_MODULES.items():
+        others = [name for name in TASK_MODULES.values() if name != module]
+        loaded = loaded_modules(module, others + ["akshare"])
+        print(f"import {module} loads: {loaded or 'no other task modules, no akshare'}")
+        if loaded:
+            failures.append(f"--task {task} imports {', '.join(loaded)}")
+
+    print("slowest imports for scripts.run_tasks (cumulative):")
+    for microseconds, name in slowest_imports("scripts.run_tasks", args.top):
+        print(f"  {microseconds / 1000:8.1f} ms  {name}")
+
+    elapsed = help_time(args.repeat)
+    print(f"run_tasks --help: {elapsed:.0f} ms (budget {args.budget_ms:.0f} ms)")
+    if elapsed > args.budget_ms:
+        failures.append(f"run_tasks --help took {elapsed:.0f} ms, over the {args.budget_ms:.0f} ms budget")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
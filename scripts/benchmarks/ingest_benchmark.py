@@ -0,0 +1,191 @@
+# scripts/benchmarks/ingest_benchmark.py
+"""
+离线端到端摄取基准
+
+使用 fake_akshare 替身驱动 StockTasks、IndexTasks 和 ConceptTasks，分别在 SQLite 和本地 PostgreSQL 上
+完整运行 获取 → 转换 → 加载，报告每个任务的行/秒、各阶段耗时和进程峰值内存。
+每个数据库在独立子进程中运行（数据库连接和配置在导入时确定，峰值内存也按进程统计）。
+
+用法:
+    python -m scripts.benchmarks.ingest_benchmark [--db sqlite postgres] [--stocks 300] [--days 750]
+        [--latency 0.05] [--error-rate 0.01] [--json result.json] [--baseline base.json --tolerance 0.2]
+
+PostgreSQL 连接串通过 --postgres-url 或环境变量 BENCH_POSTGRES_URL 指定，基准会删除并重建其中的表。
+指定 --baseline 时与之前保存的 --json 结果比较，任一任务的行/秒下降超过 tolerance 时以非零状态退出
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+TASKS = ("stock", "index", "concept")
+
+
+def run_worker(args):
+    """
+    子进程：配置环境、安装替身、重建数据库并依次运行各任务，结果以 JSON 输出到标准输出最后一行
+    """
+    work_dir = tempfile.mkdtemp(prefix="ingest-bench-")
+    start_date = (time.time() - args.days * 86400 * 7 / 5)
+    os.environ.update({
+        "DATABASE_URL": args.db_url,
+        "CACHE_PATH": os.path.join(work_dir, "cache"),
+        "LOG_DIR": os.path.join(work_dir, "logs"),
+        "LOG_LEVEL": "WARNING",
+        "AKSHARE_DATA_START_DATE": time.strftime("%Y%m%d", time.localtime(start_date)),
+        "CONCEPT_DATA_START_DATE": time.strftime("%Y%m%d", time.localtime(start_date)),
+        "RESPONSE_CACHE_ENABLED": "False",
+        "PARQUET_SINK_ENABLED": "False",
+        "WORK_LEASE_ENABLED": "False",
+        "METRICS_PORT": "0",
+        "RUN_ID": f"bench-{os.getpid()}",
+        "RETRY_BACKOFF_BASE": "0.01",
+    })
+    for source in ("SINA", "EASTMONEY", "DEFAULT"):
+        os.environ[f"{source}_RATE_LIMIT"] = str(args.rate_limit)
+        os.environ[f"{source}_RATE_BURST"] = str(max(int(args.rate_limit), 1))
+    os.makedirs(os.environ["CACHE_PATH"], exist_ok=True)
+
+    from scripts.benchmarks import fake_akshare
+    fake = fake_akshare.install(stocks=args.stocks, indexes=args.indexes, concepts=args.concepts,
+                                latency=args.latency, error_rate=args.error_rate)
+
+    import resource
+    from src.core.metrics import metrics
+    from src.database.base import Base
+    from src.database.session import get_engine
+    from src.data_ingestion.tasks.stock_tasks import StockTasks
+    from src.data_ingestion.tasks.index_tasks import IndexTasks
+    from src.data_ingestion.tasks.concept_tasks import ConceptTasks
+    from scripts.init_db import init_database
+
+    Base.metadata.drop_all(get_engine())
+    init_database()
+
+    runners = {
+        "stock": lambda: StockTasks().download_and_save_stock_data(),
+        "index": lambda: IndexTasks().download_and_save_index_data(),
+        "concept": lambda: ConceptTasks().download_and_save_concept_data(),
+    }
+    tables = {"stock": "stock_daily_data", "index": "index_daily_data", "concept": "concept_board"}
+    results = {}
+    for task in args.tasks:
+        started = time.perf_counter()
+        runners[task]()
+        elapsed = time.perf_counter() - started
+        snapshot = metrics.snapshot()
+        # 行/秒只按管道加载阶段写入的行计算；概念板块涨跌家数聚合对同一张表的 UPDATE 单独报告
+        rows = snapshot.get("ingest_rows_loaded_total", {}).get(task, 0)
+        written = sum(count for key, count in snapshot.get("db_rows_written_total", {}).items()
+                      if key.startswith(f"{tables[task]},") and not key.endswith(",skipped"))
+        stages = {key.split(",")[1]: value["sum"] for key, value in snapshot.get("ingest_stage_seconds", {}).items()
+                  if key.startswith(f"{task},")}
+        results[task] = {"seconds": round(elapsed, 3), "rows": rows, "rows_per_sec": round(rows / elapsed, 1),
+                         "aggregated_rows": max(written - rows, 0), "stage_seconds": stages}
+
+    results["peak_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    results["fake_calls"], results["fake_errors"] = fake.calls, fake.errors
+    print(json.dumps(results))
+
+
+def run_database(name: str, url: str, args) -> dict:
+    """
+    在子进程中对一个数据库运行基准
+    """
+    command = [sys.executable, "-m", "scripts.benchmarks.ingest_benchmark", "--worker", "--db-url", url,
+               "--stocks", str(args.stocks), "--indexes", str(args.indexes), "--concepts", str(args.concepts),
+               "--days", str(args.days), "--latency", str(args.latency), "--error-rate", str(args.error_rate),
+               "--rate-limit", str(args.rate_limit), "--tasks", *args.tasks]
+    completed = subprocess.run(command, capture_output=True, text=True)
+    if completed.returncode != 0:
+        sys.stderr.write(completed.stderr)
+        raise RuntimeError(f"Benchmark worker for {name} failed with exit code {completed.returncode}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def report(name: str, result: dict, tasks):
+    """
+    打印一个数据库的基准结果
+    """
+    print(f"{name}: peak RSS {result['peak_rss_mb']} MB, fake calls {result['fake_calls']}, "
+          f"injected errors {result['fake_errors']}")
+    for task in tasks:
+        task_result = result[task]
+        stages = "  ".join(f"{stage} {seconds:.2f}s" for stage, seconds in sorted(task_result["stage_seconds"].items()))
+        aggregated = task_result.get("aggregated_rows", 0)
+        print(f"  {task:<8}: {task_result['rows']:>9,} rows in {task_result['seconds']:7.2f} s "
+              f"{task_result['rows_per_sec']:>12,.0f} rows/sec   busy: {stages}"
+              + (f"   aggregated: {aggregated:,} rows" if aggregated else ""))
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """
+    与基线比较，返回行/秒下降超过 tolerance 的 (数据库, 任务, 基线, 当前)
+    """
+    regressions = []
+    for name, result in results.items():
+        for task in TASKS:
+            if task in result and task in baseline.get(name, {}):
+                before, after = baseline[name][task]["rows_per_sec"], result[task]["rows_per_sec"]
+                if before and after < before * (1 - tolerance):
+                    regressions.append((name, task, before, after))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="离线端到端摄取基准")
+    parser.add_argument("--db", nargs="+", choices=["sqlite", "postgres"], default=["sqlite", "postgres"],
+                        help="要测试的数据库")
+    parser.add_argument("--sqlite-url", default=None, help="SQLite 连接串，默认使用临时文件")
+    parser.add_argument("--postgres-url", default=os.getenv("BENCH_POSTGRES_URL"), help="PostgreSQL 连接串")
+    parser.add_argument("--tasks", nargs="+", choices=TASKS, default=list(TASKS), help="要运行的任务")
+    parser.add_argument("--stocks", type=int, default=300, help="股票数量")
+    parser.add_argument("--indexes", type=int, default=30, help="指数数量")
+    parser.add_argument("--concepts", type=int, default=60, help="概念板块数量")
+    parser.add_argument("--days", type=int, default=750, help="每个代码的交易日数")
+    parser.add_argument("--latency", type=float, default=0.0, help="模拟的平均请求延迟（秒）")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="模拟的请求失败概率")
+    parser.add_argument("--rate-limit", type=float, default=1000.0, help="各数据源限速（每秒请求数）")
+    parser.add_argument("--json", default=None, help="保存结果的 JSON 文件")
+    parser.add_argument("--baseline", default=None, help="用于比较的基线 JSON 文件")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="允许的行/秒下降比例")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--db-url", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args)
+        return
+
+    urls = {}
+    for name in args.db:
+        if name == "sqlite":
+            urls[name] = args.sqlite_url or f"sqlite:///{tempfile.mkdtemp(prefix='ingest-bench-')}/bench.db"
+        elif args.postgres_url:
+            urls[name] = args.postgres_url
+        else:
+            print("postgres: skipped (set --postgres-url or BENCH_POSTGRES_URL)")
+
+    results = {}
+    for name, url in urls.items():
+        results[name] = run_database(name, url, args)
+        report(name, results[name], args.tasks)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for name, task, before, after in regressions:
+            print(f"REGRESSION {name}/{task}: {before:,.0f} -> {after:,.0f} rows/sec")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
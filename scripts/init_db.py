@@ -2,10 +2,14 @@
 """
 初始化数据库脚本
 """
+import argparse
 import time
 from sqlalchemy import inspect
 from sqlalchemy.exc import SQLAlchemyError
-from src.database.session import engine, Base
+from src.database.session import get_engine, Base
+# 导入全部模型以注册到 Base.metadata（任务模块按需导入，不能依赖它们间接导入模型）
+from src.database.models import stock, index, concept, progress, lease, adj_factor, setting  # noqa: F401
+from src.database.partitioning import DailyPartitioning
 from src.core.logger import logger
 from src.core.config import config
 
@@ -14,6 +18,7 @@ def init_database():
     """初始化数据库，创建所有表，包含重试机制"""
     for attempt in range(config.DB_INIT_MAX_RETRIES):
         try:
+            engine = get_engine()
             inspector = inspect(engine)
             existing_tables = inspector.get_table_names()
             all_tables = Base.metadata.tables.keys()
@@ -21,12 +26,12 @@ def init_database():
 
             if not missing_tables:
                 logger.info("所有表都已存在，跳过创建步骤。")
-                return  # 提前退出，避免不必要的重试
             else:
                 logger.info(f"以下表不存在，将创建这些表: {missing_tables}")
                 Base.metadata.create_all(bind=engine)
                 logger.info("数据库表创建成功！")
-                return  # 成功后退出循环
+            ensure_storage_layout(engine)
+            return  # 成功后退出循环
 
         except SQLAlchemyError as e:  # 捕获SQLAlchemy特定的异常
             logger.error(f"创建数据库表时发生错误 (尝试 {attempt + 1}/{config.DB_INIT_MAX_RETRIES}): {str(e)}")
@@ -40,5 +45,41 @@ def init_database():
             raise
 
 
+def ensure_storage_layout(engine):
+    """
+    为已有的表补建缺少的索引（如日线表的日期索引）；启用分区时预先创建各年份的分区
+    """
+    for table in Base.metadata.sorted_tables:
+        for table_index in table.indexes:
+            table_index.create(bind=engine, checkfirst=True)
+
+    if not DailyPartitioning.enabled(engine):
+        return
+    partition_tables = [table for table in Base.metadata.sorted_tables if DailyPartitioning.is_partition_table(table)]
+    for table in partition_tables:
+        with engine.connect() as connection:
+            partitioned = DailyPartitioning.is_partitioned(connection, table.name)
+        if partitioned:
+            DailyPartitioning.ensure_year_partitions(engine, table, DailyPartitioning.initial_years())
+        else:
+            logger.warning(f"{table.name} 不是分区表，运行 python -m scripts.init_db --migrate-partitions 迁移")
+
+
+def migrate_partitions():
+    """
+    将已有的普通日线表迁移为按年份分区的表
+    """
+    engine = get_engine()
+    for table in Base.metadata.sorted_tables:
+        if DailyPartitioning.is_partition_table(table):
+            DailyPartitioning.migrate(engine, table)
+
+
 if __name__ == '__main__':
-    init_database()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="初始化数据库")
+    parser.add_argument("--migrate-partitions", action="store_true",
+                        help="将已有的日线表迁移为按年份分区的表（需 DAILY_PARTITIONING_ENABLED=True）")
+    args = parser.parse_args()
+    init_database()
+    if args.migrate_partitions:
+        migrate_partitions()
\ No newline at end of file
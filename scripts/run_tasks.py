@@ -1,59 +1,154 @@
 # scripts/run_tasks.py
 import argparse
+import importlib
 import logging
+import os
 import time
-from src.data_ingestion.tasks.stock_tasks import StockTasks
-from src.data_ingestion.tasks.index_tasks import IndexTasks
-from src.data_ingestion.tasks.concept_tasks import ConceptTasks
+from datetime import date, datetime
 from src.core.logger import logger
-from src.utils.db_utils import initialize_database_if_needed
+from src.core.metrics import (
+    metrics, health, start_metrics_server, TASK_SECONDS, TASK_RUNS, TASK_LAST_SUCCESS, TASK_NEXT_RUN
+)
 from src.core.config import config
 
+# 任务类型 → (模块, 任务类, 方法, 任务名称)；运行时才导入任务模块，单个任务只加载自己的依赖
+TASKS = {
+    "stock": ("src.data_ingestion.tasks.stock_tasks", "StockTasks", "download_and_save_stock_data", "股票数据摄取"),
+    "index": ("src.data_ingestion.tasks.index_tasks", "IndexTasks", "download_and_save_index_data", "指数数据摄取"),
+    "concept": ("src.data_ingestion.tasks.concept_tasks", "ConceptTasks", "download_and_save_concept_data",
+                "概念板块数据摄取"),
+}
+
+
+def load_task(task):
+    """导入任务模块，返回 (任务函数, 任务名称)"""
+    module_name, class_name, method_name, task_name = TASKS[task]
+    task_class = getattr(importlib.import_module(module_name), class_name)
+    return getattr(task_class(), method_name), task_name
+
 
 def run_task_with_retry(task_func, task_name):
     """运行任务，如果失败则重试。"""
-    for attempt in range(config.MAX_RETRIES):
-        try:
-            logger.info(f"开始运行 {task_name} (尝试 {attempt + 1}/{config.MAX_RETRIES})")
-            task_func()
-            logger.info(f"{task_name} 任务完成")
-            return  # 任务成功，退出循环
-        except Exception as e:
-            logger.error(f"{task_name} 任务失败 (尝试 {attempt + 1}/{config.MAX_RETRIES}): {e}")
-            if attempt < config.MAX_RETRIES - 1:
-                logger.info(f"等待 {config.RETRY_DELAY} 秒后重试...")
-                time.sleep(config.RETRY_DELAY)
-            else:
-                logger.error(f"{task_name} 任务达到最大重试次数，放弃。")
+    started = time.perf_counter()
+    health.task_started()
+    try:
+        for attempt in range(config.MAX_RETRIES):
+            try:
+                logger.info(f"开始运行 {task_name} (尝试 {attempt + 1}/{config.MAX_RETRIES})")
+                task_func()
+                logger.info(f"{task_name} 任务完成")
+                TASK_RUNS.inc(task=task_name, outcome="success")
+                TASK_LAST_SUCCESS.set(time.time(), task=task_name)
+                return  # 任务成功，退出循环
+            except Exception as e:
+                logger.error(f"{task_name} 任务失败 (尝试 {attempt + 1}/{config.MAX_RETRIES}): {e}")
+                if attempt < config.MAX_RETRIES - 1:
+                    logger.info(f"等待 {config.RETRY_DELAY} 秒后重试...")
+                    time.sleep(config.RETRY_DELAY)
+                else:
+                    logger.error(f"{task_name} 任务达到最大重试次数，放弃。")
+                    TASK_RUNS.inc(task=task_name, outcome="failure")
+    finally:
+        TASK_SECONDS.observe(time.perf_counter() - started, task=task_name)
+        health.task_finished()
+        metrics.write_textfile()
+
+
+def default_run_id(task_label):
+    """
+    单次运行的默认运行 ID：最近一个已收盘的交易日（未启用交易日历时为今天）加任务类型
+
+    崩溃后重启的同一次运行得到相同的 ID，从进度日志中跳过已完成的代码；新的交易日收盘后得到新的 ID
+    """
+    session = None
+    if config.TRADING_CALENDAR_ENABLED:
+        from src.data_ingestion.tasks.trading_calendar import get_trading_calendar
+        session = get_trading_calendar().last_closed_session()
+    return f"{(session or date.today()).strftime('%Y%m%d')}-{task_label}"
+
+
+def run_once(tasks, task_label):
+    """依次运行一组任务，并输出本次运行的指标摘要"""
+    started_at = datetime.now()
+    for task in tasks:
+        task_func, task_name = load_task(task)
+        run_task_with_retry(task_func, task_name)
+
+    metrics.write_textfile()
+    metrics.write_summary(
+        run_id=config.RUN_ID, worker_id=config.WORKER_ID, task=task_label,
+        started_at=started_at.isoformat(timespec="seconds"), finished_at=datetime.now().isoformat(timespec="seconds"),
+    )
+
+
+def warm_up(tasks):
+    """常驻模式启动时预先导入任务模块和 akshare，第一次触发不再承担导入开销"""
+    for task in tasks:
+        importlib.import_module(TASKS[task][0])
+    try:
+        importlib.import_module("akshare")
+    except ImportError as e:
+        logger.warning(f"预先导入 akshare 失败: {e}")
+
+
+def run_daemon(tasks):
+    """
+    常驻模式：按 config.TASK_SCHEDULES 中的 cron 表达式定时运行任务，直到收到 SIGTERM/SIGINT
+
+    进程常驻，数据库连接池、数据获取运行时（线程和限速器）、响应缓存、交易日历和读取缓存在多次运行之间复用；
+    每次触发使用计划时间作为运行 ID，多个副本的同一次触发共享进度日志和工作单元；
+    启动时补跑 SCHEDULE_CATCHUP_SECONDS 之内错过的触发，重启前中断的运行从进度日志中续跑
+    """
+    from src.core.scheduler import ScheduledJob, TaskScheduler
+
+    def make_job(task):
+        def run(fire_time):
+            config.RUN_ID = fire_time.strftime("%Y%m%d%H%M")
+            run_once([task], task)
+        return ScheduledJob(task, config.TASK_SCHEDULES[task], run, config.SCHEDULE_CATCHUP_SECONDS)
+
+    jobs = [make_job(task) for task in tasks]
+    scheduler = TaskScheduler(jobs, config.SCHEDULE_JITTER_SECONDS)
+    scheduler.install_signal_handlers()
+    warm_up(tasks)
+
+    def on_idle(job, next_fire):
+        TASK_NEXT_RUN.set(next_fire.timestamp(), task=TASKS[job.name][3])
+        logger.info(f"下一个任务: {TASKS[job.name][3]}，计划于 {next_fire} 运行")
+
+    scheduler.run_forever(on_idle=on_idle)
 
 
 def main():
-    initialize_database_if_needed()
     parser = argparse.ArgumentParser(description="运行数据摄取任务")
     parser.add_argument(
         "--task",
         type=str,
-        choices=["all", "stock", "index", "concept"],
+        choices=["all", *TASKS],
         default="all",
         help="要运行的任务类型 (all, stock, index, concept)",
     )
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="常驻运行，按 STOCK_SCHEDULE/INDEX_SCHEDULE/CONCEPT_SCHEDULE 定时执行任务",
+    )
     args = parser.parse_args()
 
-    # 使用字典映射任务类型到函数，避免重复的 if/elif 结构
-    task_map = {
-        "all": lambda: [run_task_with_retry(StockTasks().download_and_save_stock_data, "股票数据摄取"),
-                        run_task_with_retry(IndexTasks().download_and_save_index_data, "指数数据摄取"),
-                        run_task_with_retry(ConceptTasks().download_and_save_concept_data, "概念板块数据摄取")],
-        "stock": lambda: run_task_with_retry(StockTasks().download_and_save_stock_data, "股票数据摄取"),
-        "index": lambda: run_task_with_retry(IndexTasks().download_and_save_index_data, "指数数据摄取"),
-        "concept": lambda: run_task_with_retry(ConceptTasks().download_and_save_concept_data, "概念板块数据摄取")
-    }
-
-    task_action = task_map.get(args.task)
-    if task_action:
-        task_action()
+    # 解析参数之后才导入数据库模块并连接数据库，--help 和参数错误时立即返回
+    from src.utils.db_utils import initialize_database_if_needed, check_database_connection
+
+    start_metrics_server()
+    health.readiness_check = check_database_connection
+    initialize_database_if_needed()
+
+    tasks = list(TASKS) if args.task == "all" else [args.task]
+    if args.daemon:
+        run_daemon(tasks)
     else:
-        logger.error("无效的任务类型")
+        if not os.getenv("RUN_ID"):
+            config.RUN_ID = default_run_id(args.task)
+        run_once(tasks, args.task)
 
 
 if __name__ == "__main__":
@@ -4,6 +4,8 @@
 """
 
 import os
+import socket
+from datetime import datetime
 from dotenv import load_dotenv
 
 # 获取项目根目录的绝对路径
@@ -46,9 +48,77 @@ class Config:
     RETRY_DELAY = int(os.getenv("RETRY_DELAY", 5))
     GET_TIMEOUT = int(os.getenv("GET_TIMEOUT", 10))
 
+    # 指数退避重试：基础间隔和最大间隔（秒），实际等待时间带随机抖动
+    RETRY_BACKOFF_BASE = float(os.getenv("RETRY_BACKOFF_BASE", 1))
+    RETRY_BACKOFF_MAX = float(os.getenv("RETRY_BACKOFF_MAX", 30))
+
+    # 超时后被放弃但仍在运行的请求数上限
+    MAX_ABANDONED_CALLS = int(os.getenv("MAX_ABANDONED_CALLS", 4))
+
+    # 数据源熔断：连续失败次数阈值、熔断持续时间（秒）、请求等待熔断恢复的最长时间（秒）
+    CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", 5))
+    CIRCUIT_RESET_TIMEOUT = float(os.getenv("CIRCUIT_RESET_TIMEOUT", 60))
+    CIRCUIT_MAX_WAIT = float(os.getenv("CIRCUIT_MAX_WAIT", 120))
+
     # 并行线程数
     MAX_THREADS = int(os.getenv("MAX_THREADS", 12))
 
+    # 流式处理管道：获取/转换/加载各阶段线程数、阶段间队列长度、
+    # 加载阶段合并写入的行数阈值，以及上游空闲多久（秒）后写入未满的批次
+    PIPELINE_FETCH_WORKERS = int(os.getenv("PIPELINE_FETCH_WORKERS", MAX_THREADS))
+    PIPELINE_TRANSFORM_WORKERS = int(os.getenv("PIPELINE_TRANSFORM_WORKERS", 2))
+    PIPELINE_LOAD_WORKERS = int(os.getenv("PIPELINE_LOAD_WORKERS", 1))
+    PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", 32))
+    PIPELINE_LOAD_BATCH_ROWS = int(os.getenv("PIPELINE_LOAD_BATCH_ROWS", 50000))
+    PIPELINE_LOAD_FLUSH_INTERVAL = float(os.getenv("PIPELINE_LOAD_FLUSH_INTERVAL", 2))
+
+    # 进度日志：运行 ID（未设置时 run_tasks.py 单次运行使用最近已收盘的交易日加任务类型，重启后跳过已完成的代码；
+    # 常驻模式使用每次触发的计划时间；其它调用方默认每个进程一个新的 ID）、是否启用、
+    # 任务末尾对失败代码的重跑轮数、进度记录保留天数
+    RUN_ID = os.getenv("RUN_ID") or f"{datetime.now().strftime('%Y%m%d%H%M%S')}-{os.getpid()}"
+    PROGRESS_JOURNAL_ENABLED = os.getenv("PROGRESS_JOURNAL_ENABLED", "True").lower() == "true"
+    FAILED_RERUN_PASSES = int(os.getenv("FAILED_RERUN_PASSES", 1))
+    PROGRESS_RETENTION_DAYS = int(os.getenv("PROGRESS_RETENTION_DAYS", 30))
+
+    # 多副本分片：是否启用数据库租约领取工作单元、副本标识、每个工作单元的代码数、
+    # 租约有效期、续约间隔、等待其它副本时的轮询间隔（秒）
+    WORK_LEASE_ENABLED = os.getenv("WORK_LEASE_ENABLED", "False").lower() == "true"
+    WORKER_ID = os.getenv("WORKER_ID") or f"{socket.gethostname()}-{os.getpid()}"
+    WORK_UNIT_SIZE = int(os.getenv("WORK_UNIT_SIZE", 200))
+    LEASE_TTL = int(os.getenv("LEASE_TTL", 300))
+    LEASE_HEARTBEAT_INTERVAL = int(os.getenv("LEASE_HEARTBEAT_INTERVAL", 60))
+    LEASE_POLL_INTERVAL = int(os.getenv("LEASE_POLL_INTERVAL", 15))
+
+    # 指标与探针：HTTP 端口（/metrics、/healthz、/readyz，0 表示不启动）、textfile collector 文件路径（为空不写）、
+    # 运行结束的 JSON 摘要路径、任务运行中无进展多久（秒）判定为卡死
+    METRICS_PORT = int(os.getenv("METRICS_PORT", 9108))
+    METRICS_TEXTFILE = os.getenv("METRICS_TEXTFILE", "")
+    METRICS_SUMMARY_PATH = os.path.join(LOG_DIR, os.getenv("METRICS_SUMMARY_FILE", "run_summary.json"))
+    HEALTH_STALL_SECONDS = int(os.getenv("HEALTH_STALL_SECONDS", 900))
+
+    # 常驻模式（run_tasks --daemon）：各任务的 cron 表达式（分 时 日 月 星期，按本地时间）、
+    # 每次触发前的最大随机等待（秒，错开多个副本）、启动时补跑多久（秒）之内错过的触发（0 表示不补跑）
+    TASK_SCHEDULES = {
+        "stock": os.getenv("STOCK_SCHEDULE", "35 15 * * 1-5"),
+        "index": os.getenv("INDEX_SCHEDULE", "45 15 * * 1-5"),
+        "concept": os.getenv("CONCEPT_SCHEDULE", "0 16 * * 1-5"),
+    }
+    SCHEDULE_JITTER_SECONDS = float(os.getenv("SCHEDULE_JITTER_SECONDS", 60))
+    SCHEDULE_CATCHUP_SECONDS = int(os.getenv("SCHEDULE_CATCHUP_SECONDS", 21600))
+
+    # 各数据源限速（每秒请求数）和突发容量，替代固定的 sleep
+    SINA_RATE_LIMIT = float(os.getenv("SINA_RATE_LIMIT", 3))
+    SINA_RATE_BURST = int(os.getenv("SINA_RATE_BURST", 3))
+    EASTMONEY_RATE_LIMIT = float(os.getenv("EASTMONEY_RATE_LIMIT", 5))
+    EASTMONEY_RATE_BURST = int(os.getenv("EASTMONEY_RATE_BURST", 5))
+    DEFAULT_RATE_LIMIT = float(os.getenv("DEFAULT_RATE_LIMIT", 2))
+    DEFAULT_RATE_BURST = int(os.getenv("DEFAULT_RATE_BURST", 2))
+
+    # 异步获取时各数据源同时进行中的请求数上限（每个数据源一个信号量）
+    SINA_MAX_CONCURRENCY = int(os.getenv("SINA_MAX_CONCURRENCY", 4))
+    EASTMONEY_MAX_CONCURRENCY = int(os.getenv("EASTMONEY_MAX_CONCURRENCY", 8))
+    DEFAULT_MAX_CONCURRENCY = int(os.getenv("DEFAULT_MAX_CONCURRENCY", 2))
+
     # 批量插入大小
     BATCH_SIZE = int(os.getenv("BATCH_SIZE", 100))
 
@@ -61,19 +131,103 @@ class Config:
     # 数据缓存目录
     DATA_CACHE_DIR = os.getenv("DATA_CACHE_DIR", "data_cache")
 
+    # AkShare 原始响应缓存：是否启用、缓存目录、大小上限（MB）
+    RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "True").lower() == "true"
+    RESPONSE_CACHE_DIR = os.path.join(CACHE_PATH, os.getenv("RESPONSE_CACHE_DIR", "responses"))
+    RESPONSE_CACHE_MAX_MB = int(os.getenv("RESPONSE_CACHE_MAX_MB", 2048))
+
+    # 各数据集响应缓存的有效期（秒）
+    RESPONSE_CACHE_TTL = {
+        "stock_daily": int(os.getenv("STOCK_DAILY_CACHE_TTL", 24 * 3600)),
+        "index_daily": int(os.getenv("INDEX_DAILY_CACHE_TTL", 24 * 3600)),
+        "concept_daily": int(os.getenv("CONCEPT_DAILY_CACHE_TTL", 24 * 3600)),
+        "list": int(os.getenv("LIST_CACHE_TTL", 12 * 3600)),
+        "adj_factor": int(os.getenv("ADJ_FACTOR_CACHE_TTL", 24 * 3600)),
+        "spot": int(os.getenv("SPOT_CACHE_TTL", 60)),
+    }
+
+    # 离线回放模式：只从响应缓存读取数据，不访问 AkShare
+    CACHE_REPLAY_MODE = os.getenv("CACHE_REPLAY_MODE", "False").lower() == "true"
+
     # 数据库初始化重试次数和间隔
     DB_INIT_MAX_RETRIES = int(os.getenv("DB_INIT_MAX_RETRIES", 3))
     DB_INIT_RETRY_DELAY = int(os.getenv("DB_INIT_RETRY_DELAY", 5))
 
+    # 数据库连接池：常驻连接数（默认为加载线程数加上进度日志、租约心跳等零星使用）、溢出连接数、
+    # 等待连接超时、连接回收时间（秒）和取用前是否探测连接可用
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", PIPELINE_LOAD_WORKERS + 4))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+    DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", 30))
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+    DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "True").lower() == "true"
+
+    # psycopg2 批量执行：executemany 模式和每页参数组数
+    PG_EXECUTEMANY_MODE = os.getenv("PG_EXECUTEMANY_MODE", "values_plus_batch")
+    PG_EXECUTEMANY_PAGE_SIZE = int(os.getenv("PG_EXECUTEMANY_PAGE_SIZE", 1000))
+
+    # 日线表存储布局：PostgreSQL 下是否按年份范围分区（只对新建的表生效，已有表用 init_db --migrate-partitions 迁移）、
+    # 预先创建分区的起始年份，以及日期索引类型 btree(日期+代码) / brin(日期，体积小，适合按日期顺序写入的数据)
+    DAILY_PARTITIONING_ENABLED = os.getenv("DAILY_PARTITIONING_ENABLED", "False").lower() == "true"
+    DAILY_PARTITION_START_YEAR = int(os.getenv("DAILY_PARTITION_START_YEAR", 1990))
+    DAILY_DATE_INDEX_TYPE = os.getenv("DAILY_DATE_INDEX_TYPE", "btree")
+
     # 数据加载批量插入大小
     DATA_LOAD_BATCH_SIZE = int(os.getenv("DATA_LOAD_BATCH_SIZE", 1000))
 
+    # 各任务的主键冲突处理策略：skip(跳过已存在记录) / update(更新已存在记录) / error(报错)
+    STOCK_CONFLICT_POLICY = os.getenv("STOCK_CONFLICT_POLICY", "update")
+    INDEX_CONFLICT_POLICY = os.getenv("INDEX_CONFLICT_POLICY", "update")
+    CONCEPT_CONFLICT_POLICY = os.getenv("CONCEPT_CONFLICT_POLICY", "update")
+
+    # Parquet 数据湖：是否同时写入、根目录、分区内触发合并的文件数
+    PARQUET_SINK_ENABLED = os.getenv("PARQUET_SINK_ENABLED", "False").lower() == "true"
+    DATA_LAKE_PATH = os.path.join(PROJECT_ROOT, os.getenv("DATA_LAKE_PATH", "datalake"))
+    DATA_LAKE_COMPACT_MIN_FILES = int(os.getenv("DATA_LAKE_COMPACT_MIN_FILES", 8))
+
+    # PostgreSQL 下是否使用 COPY + ON CONFLICT 批量加载
+    USE_PG_COPY_LOADER = os.getenv("USE_PG_COPY_LOADER", "True").lower() == "true"
+
+    # 数据读取：PostgreSQL 下是否用 COPY TO 读取完整结果、流式读取每块行数、
+    # 是否缓存最近的查询结果以及缓存的总行数上限
+    USE_PG_COPY_READER = os.getenv("USE_PG_COPY_READER", "True").lower() == "true"
+    READ_CHUNK_ROWS = int(os.getenv("READ_CHUNK_ROWS", 100000))
+    READ_CACHE_ENABLED = os.getenv("READ_CACHE_ENABLED", "True").lower() == "true"
+    READ_CACHE_MAX_ROWS = int(os.getenv("READ_CACHE_MAX_ROWS", 2000000))
+
     # 数据转换验证是否开启
     TRANSFORMER_VALIDATE_DATA = os.getenv("TRANSFORMER_VALIDATE_DATA", "True").lower() == "true"
 
     # AkShare API 数据起始日期
     AKSHARE_DATA_START_DATE = os.getenv("AKSHARE_DATA_START_DATE", "20040101")
 
+    # 概念板块数据起始日期
+    CONCEPT_DATA_START_DATE = os.getenv("CONCEPT_DATA_START_DATE", "20220101")
+
+    # 增量下载模式：根据数据库中每个代码的最后日期，只下载缺失的区间
+    INCREMENTAL_MODE = os.getenv("INCREMENTAL_MODE", "True").lower() == "true"
+
+    # 股票日线的存储方式：空字符串存储不复权数据并单独保存复权因子，读取时计算前/后复权；
+    # hfq/qfq 为旧的存储方式（直接存储复权后的数据，切换存储方式需要清空股票日线后重新下载全部历史）；
+    # 存储方式记录在数据库中，与已有数据不一致时股票任务拒绝写入，旧版本写入的数据为 hfq
+    STOCK_STORE_ADJUST = os.getenv("STOCK_STORE_ADJUST", "")
+
+    # 复权因子的刷新间隔（天），分红送转后在下次刷新时更新因子，不需要重新下载历史行情
+    ADJ_FACTOR_REFRESH_DAYS = int(os.getenv("ADJ_FACTOR_REFRESH_DAYS", 7))
+
+    # 快照模式：收盘后用一次全市场实时行情生成当日日线，只有缺失多日或新上市的股票逐只下载历史；
+    # 只在按不复权存储、启用交易日历且当天是已收盘的交易日时生效
+    STOCK_SNAPSHOT_MODE = os.getenv("STOCK_SNAPSHOT_MODE", "True").lower() == "true"
+
+    # 交易日历：是否按交易日裁剪下载区间并跳过没有新交易日的运行、日历缓存的有效期（天）、
+    # 收盘时间（当天的日线在此之后才视为可用）
+    TRADING_CALENDAR_ENABLED = os.getenv("TRADING_CALENDAR_ENABLED", "True").lower() == "true"
+    TRADING_CALENDAR_MAX_AGE_DAYS = int(os.getenv("TRADING_CALENDAR_MAX_AGE_DAYS", 30))
+    MARKET_CLOSE_TIME = os.getenv("MARKET_CLOSE_TIME", "15:30")
+
+    # 概念板块成分股的刷新间隔（天），以及是否根据成分股和股票日线计算板块的涨跌家数和总市值
+    CONCEPT_CONSTITUENT_REFRESH_DAYS = int(os.getenv("CONCEPT_CONSTITUENT_REFRESH_DAYS", 7))
+    CONCEPT_AGGREGATION_ENABLED = os.getenv("CONCEPT_AGGREGATION_ENABLED", "True").lower() == "true"
+
 
 # 实例化配置对象
 config = Config()
\ No newline at end of file
@@ -14,4 +14,25 @@ class DataSaveError(Exception):
     """
     数据保存失败异常
     """
-    pass
\ No newline at end of file
+    pass
+
+
+class DataReadError(Exception):
+    """
+    数据读取失败异常
+    """
+    pass
+
+
+class FetchTimeoutError(DataFetchError):
+    """
+    数据获取超时异常
+    """
+    pass
+
+
+class CircuitOpenError(DataFetchError):
+    """
+    数据源熔断中，拒绝请求异常
+    """
+    pass
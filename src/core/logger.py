@@ -23,8 +23,8 @@ log_file = os.path.join(config.LOG_DIR, f"stockdata_download_{today}.log")
 logger = logging.getLogger(__name__)
 logger.setLevel(config.LOG_LEVEL)
 
-# 创建文件处理器，按日期分割日志
-file_handler = logging.FileHandler(log_file, encoding="utf-8")
+# 创建文件处理器，按日期分割日志；首次写日志时才打开文件，--help 等不写日志的路径不会创建文件
+file_handler = logging.FileHandler(log_file, encoding="utf-8", delay=True)
 file_handler.setLevel(config.LOG_LEVEL)
 
 # 创建控制台处理器
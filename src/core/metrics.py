@@ -0,0 +1,387 @@
+# src/core/metrics.py
+"""
+指标模块
+
+提供线程安全的计数器、仪表和直方图，以 Prometheus 文本格式通过 HTTP 端点或 textfile collector 导出，
+并在运行结束时生成 JSON 摘要；HTTP 端点同时提供存活和就绪探针
+"""
+
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src.core.config import config
+from src.core.logger import logger
+
+# 请求和处理耗时的直方图分桶（秒）
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    """
+    格式化 Prometheus 标签
+    """
+    parts = [
+        '{}="{}"'.format(name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in zip(names, values)
+    ]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    """
+    带标签的指标基类
+    """
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        """
+        初始化指标
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        """
+        按标签名顺序取标签值
+        """
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self) -> list:
+        """
+        生成 Prometheus 文本格式的行
+        """
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {value}")
+        return lines
+
+    def snapshot(self) -> dict:
+        """
+        生成 JSON 摘要，键为以逗号连接的标签值
+        """
+        with self._lock:
+            return {",".join(key) or "total": value for key, value in sorted(self._values.items())}
+
+
+class Counter(_Metric):
+    """
+    只增不减的计数器
+    """
+    type_name = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        """
+        增加计数
+        """
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """
+    可任意设置的仪表
+    """
+    type_name = "gauge"
+
+    def set(self, value: float, **labels):
+        """
+        设置数值
+        """
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels):
+        """
+        增加数值
+        """
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        """
+        减少数值
+        """
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    """
+    直方图，记录分桶计数、总数和总和
+    """
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets=LATENCY_BUCKETS):
+        """
+        初始化直方图
+        """
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, **labels):
+        """
+        记录一次观测值
+        """
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = {"buckets": [0] * len(self.buckets), "count": 0, "sum": 0.0, "max": 0.0}
+                self._values[key] = state
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state["buckets"][i] += 1
+            state["count"] += 1
+            state["sum"] += value
+            state["max"] = max(state["max"], value)
+
+    def render(self) -> list:
+        """
+        生成 Prometheus 文本格式的行（分桶计数为累计值）
+        """
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        with self._lock:
+            for key, state in sorted(self._values.items()):
+                labels = _format_labels(self.labelnames, key)
+                for bound, count in zip(self.buckets, state["buckets"]):
+                    bucket_labels = _format_labels(self.labelnames, key, 'le="{}"'.format(bound))
+                    lines.append(f"{self.name}_bucket{bucket_labels} {count}")
+                inf_labels = _format_labels(self.labelnames, key, 'le="+Inf"')
+                lines.append(f"{self.name}_bucket{inf_labels} {state['count']}")
+                lines.append(f"{self.name}_count{labels} {state['count']}")
+                lines.append(f"{self.name}_sum{labels} {state['sum']}")
+        return lines
+
+    def snapshot(self) -> dict:
+        """
+        生成 JSON 摘要：次数、总耗时、平均值和最大值
+        """
+        with self._lock:
+            return {
+                ",".join(key) or "total": {
+                    "count": state["count"],
+                    "sum": round(state["sum"], 6),
+                    "avg": round(state["sum"] / state["count"], 6) if state["count"] else 0.0,
+                    "max": round(state["max"], 6),
+                }
+                for key, state in sorted(self._values.items())
+            }
+
+
+class MetricsRegistry:
+    """
+    指标注册表
+    """
+
+    def __init__(self):
+        """
+        初始化注册表
+        """
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        """
+        注册指标，同名指标只注册一次
+        """
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, documentation: str, labelnames: tuple = ()) -> Counter:
+        """注册计数器"""
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: tuple = ()) -> Gauge:
+        """注册仪表"""
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: tuple = (), buckets=LATENCY_BUCKETS) -> Histogram:
+        """注册直方图"""
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """
+        生成全部指标的 Prometheus 文本格式
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(line for metric in metrics for line in metric.render()) + "\n"
+
+    def snapshot(self) -> dict:
+        """
+        生成全部指标的 JSON 摘要，忽略没有数据的指标
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {metric.name: values for metric in metrics if (values := metric.snapshot())}
+
+    def write_textfile(self, path=config.METRICS_TEXTFILE):
+        """
+        供 node_exporter textfile collector 读取，先写临时文件再原子替换
+        """
+        if not path:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.render())
+        os.replace(tmp_path, path)
+
+    def write_summary(self, path=config.METRICS_SUMMARY_PATH, **extra) -> dict:
+        """
+        写入运行结束的 JSON 摘要并返回摘要内容
+        """
+        summary = {**extra, "metrics": self.snapshot()}
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(summary, f, ensure_ascii=False, indent=2, default=str)
+            logger.info(f"Run summary written to {path}")
+        return summary
+
+
+class HealthState:
+    """
+    探针状态
+
+    存活：没有任务运行，或最近 HEALTH_STALL_SECONDS 秒内有处理进展（处理数据、等待或续约工作单元租约、聚合计算）；
+    就绪：就绪检查函数（例如数据库连通性）返回 True
+    """
+
+    def __init__(self, stall_seconds=config.HEALTH_STALL_SECONDS):
+        """
+        初始化探针状态
+        """
+        self.stall_seconds = stall_seconds
+        self.readiness_check = None
+        self._active_tasks = 0
+        self._last_activity = time.monotonic()
+        self._lock = threading.Lock()
+
+    def task_started(self):
+        """记录任务开始"""
+        with self._lock:
+            self._active_tasks += 1
+            self._last_activity = time.monotonic()
+
+    def task_finished(self):
+        """记录任务结束"""
+        with self._lock:
+            self._active_tasks = max(self._active_tasks - 1, 0)
+            self._last_activity = time.monotonic()
+
+    def touch(self):
+        """记录处理进展"""
+        self._last_activity = time.monotonic()
+
+    def is_alive(self) -> bool:
+        """存活检查"""
+        with self._lock:
+            return self._active_tasks == 0 or time.monotonic() - self._last_activity < self.stall_seconds
+
+    def is_ready(self) -> bool:
+        """就绪检查"""
+        if self.readiness_check is None:
+            return True
+        try:
+            return bool(self.readiness_check())
+        except Exception as e:
+            logger.warning(f"Readiness check failed: {e}")
+            return False
+
+
+metrics = MetricsRegistry()
+health = HealthState()
+
+# 数据获取
+AKSHARE_REQUESTS = metrics.counter(
+    "akshare_requests_total", "AkShare API attempts by outcome (success/error/timeout)", ("api", "outcome"))
+AKSHARE_REQUEST_SECONDS = metrics.histogram(
+    "akshare_request_seconds", "AkShare API attempt latency in seconds", ("api",))
+AKSHARE_RETRIES = metrics.counter("akshare_retries_total", "AkShare API retries", ("api",))
+CIRCUIT_OPENED = metrics.counter("akshare_circuit_opened_total", "Circuit breaker openings", ("endpoint",))
+RESPONSE_CACHE_LOOKUPS = metrics.counter(
+    "response_cache_lookups_total", "Response cache lookups by result (hit/miss)", ("dataset", "result"))
+
+# 处理管道
+STAGE_SECONDS = metrics.histogram(
+    "ingest_stage_seconds", "Per-item fetch/transform and per-batch load time in seconds", ("task", "stage"))
+ITEMS_PROCESSED = metrics.counter(
+    "ingest_items_total", "Symbols processed by outcome (succeeded/failed)", ("task", "outcome"))
+ROWS_LOADED = metrics.counter(
+    "ingest_rows_loaded_total", "Rows handed to the pipeline load stage in successful batches", ("task",))
+
+# 数据写入
+ROWS_WRITTEN = metrics.counter(
+    "db_rows_written_total", "Rows written by table and action (inserted/updated/skipped)", ("table", "action"))
+LAKE_ROWS_WRITTEN = metrics.counter("lake_rows_written_total", "Rows written to the Parquet data lake", ("dataset",))
+
+# 任务
+TASK_SECONDS = metrics.histogram(
+    "ingest_task_seconds", "Task run time in seconds", ("task",), buckets=(60, 300, 900, 1800, 3600, 7200, 14400))
+TASK_RUNS = metrics.counter("ingest_task_runs_total", "Task runs by outcome (success/failure)", ("task", "outcome"))
+TASK_LAST_SUCCESS = metrics.gauge(
+    "ingest_task_last_success_timestamp_seconds", "Unix time of the last successful task run", ("task",))
+TASK_NEXT_RUN = metrics.gauge(
+    "ingest_task_next_run_timestamp_seconds", "Unix time of the next scheduled task run in daemon mode", ("task",))
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """
+    指标和探针的 HTTP 处理器
+    """
+
+    def do_GET(self):
+        """
+        /metrics 返回 Prometheus 文本格式，/healthz 为存活探针，/readyz 为就绪探针
+        """
+        path = self.path.split("?", 1)[0]
+        if path == "/metrics":
+            status, body, content_type = 200, metrics.render(), "text/plain; version=0.0.4; charset=utf-8"
+        elif path == "/healthz":
+            alive = health.is_alive()
+            status, body, content_type = (200 if alive else 503), ("ok\n" if alive else "stalled\n"), "text/plain"
+        elif path == "/readyz":
+            ready = health.is_ready()
+            status, body, content_type = (200 if ready else 503), ("ok\n" if ready else "not ready\n"), "text/plain"
+        else:
+            status, body, content_type = 404, "not found\n", "text/plain"
+        payload = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        """探针请求频繁，不写入访问日志"""
+        pass
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port=config.METRICS_PORT):
+    """
+    在后台线程启动指标和探针 HTTP 服务，port 为 0 时不启动
+    """
+    global _server
+    if not port:
+        return None
+    with _server_lock:
+        if _server is None:
+            _server = ThreadingHTTPServer(("0.0.0.0", port), _MetricsHandler)
+            threading.Thread(target=_server.serve_forever, name="metrics-server", daemon=True).start()
+            logger.info(f"Metrics server listening on :{port} (/metrics, /healthz, /readyz)")
+        return _server
@@ -0,0 +1,215 @@
+# src/core/scheduler.py
+"""
+常驻进程的定时调度
+"""
+
+import random
+import signal
+import threading
+from datetime import datetime, timedelta
+
+from src.core.logger import logger
+
+# cron 各字段的取值范围：分、时、日、月、星期（0 和 7 均为星期日）
+_FIELD_RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+
+class CronSchedule:
+    """
+    五段式 cron 表达式（分 时 日 月 星期），支持 *、a-b、a,b、*/n、a-b/n
+
+    与标准 cron 一致，日和星期都不是 * 时满足其一即可；按本地时间计算
+    """
+
+    def __init__(self, expression: str):
+        """
+        解析 cron 表达式，格式错误时抛出 ValueError
+        """
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression must have 5 fields: '{expression}'")
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, weekdays = (
+            self._parse_field(field, low, high) for field, (low, high) in zip(fields, _FIELD_RANGES)
+        )
+        self.weekdays = {day % 7 for day in weekdays}
+        self._any_day = fields[2] == "*"
+        self._any_weekday = fields[4] == "*"
+
+    @staticmethod
+    def _parse_field(field: str, low: int, high: int) -> set:
+        """
+        解析单个字段为取值集合
+        """
+        values = set()
+        for part in field.split(","):
+            span, _, step = part.partition("/")
+            if span == "*":
+                start, end = low, high
+            elif "-" in span:
+                start, end = (int(value) for value in span.split("-", 1))
+            else:
+                start = end = int(span)
+            step = int(step) if step else 1
+            if start < low or end > high or start > end or step < 1:
+                raise ValueError(f"Invalid cron field '{field}' (allowed {low}-{high})")
+            values.update(range(start, end + 1, step))
+        return values
+
+    def _day_matches(self, moment: datetime) -> bool:
+        """
+        日期是否满足日和星期字段
+        """
+        day_match = moment.day in self.days
+        weekday_match = (moment.weekday() + 1) % 7 in self.weekdays
+        if self._any_day or self._any_weekday:
+            return day_match and weekday_match
+        return day_match or weekday_match
+
+    def next_after(self, moment: datetime) -> datetime:
+        """
+        严格晚于 moment 的下一个触发时间（精确到分钟）
+        """
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = candidate + timedelta(days=366 * 5)
+        while candidate < limit:
+            if candidate.month not in self.months:
+                month = candidate.month % 12 + 1
+                candidate = candidate.replace(year=candidate.year + (month == 1), month=month, day=1, hour=0, minute=0)
+            elif not self._day_matches(candidate):
+                candidate = (candidate + timedelta(days=1)).replace(hour=0, minute=0)
+            elif candidate.hour not in self.hours:
+                candidate = (candidate + timedelta(hours=1)).replace(minute=0)
+            elif candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+            else:
+                return candidate
+        raise ValueError(f"Cron expression '{self.expression}' never fires")
+
+    def last_between(self, earliest: datetime, moment: datetime):
+        """
+        不早于 earliest、不晚于 moment 的最后一个触发时间，没有时返回 None
+        """
+        latest = None
+        candidate = self.next_after(earliest - timedelta(minutes=1))
+        while candidate <= moment:
+            latest = candidate
+            candidate = self.next_after(candidate)
+        return latest
+
+
+class ScheduledJob:
+    """
+    调度中的一个任务：cron 表达式、执行函数和下一次触发时间
+    """
+
+    def __init__(self, name: str, expression: str, func, catchup_seconds: float = 0):
+        """
+        初始化任务，func 接收本次触发的计划时间
+
+        catchup_seconds 内有错过的触发时（如进程在运行中被重启），第一次触发为其中最近的一次，
+        立即补跑并沿用该次触发的计划时间，任务可以从进度日志中续跑
+        """
+        self.name = name
+        self.schedule = CronSchedule(expression)
+        self.func = func
+        now = datetime.now()
+        missed = self.schedule.last_between(now - timedelta(seconds=catchup_seconds), now) \
+            if catchup_seconds else None
+        self.next_fire = missed or self.schedule.next_after(now)
+
+
+class TaskScheduler:
+    """
+    单线程的 cron 调度器
+
+    任务在主线程中依次执行，不会重叠：某个任务运行期间到期的其它任务在它结束后立即补跑一次，
+    同一任务错过的多次触发合并为一次。每次触发前随机等待 0~jitter 秒，错开多个副本的请求高峰。
+    第一次 SIGTERM/SIGINT 在当前任务结束后退出，第二次立即中断当前任务
+    """
+
+    def __init__(self, jobs: list, jitter_seconds: float = 0):
+        """
+        初始化调度器
+        """
+        self.jobs = jobs
+        self.jitter_seconds = jitter_seconds
+        self._stop = threading.Event()
+        self._running = None
+
+    def install_signal_handlers(self):
+        """
+        注册 SIGTERM/SIGINT 处理函数（只能在主线程调用）
+        """
+        signal.signal(signal.SIGTERM, self._handle_signal)
+        signal.signal(signal.SIGINT, self._handle_signal)
+
+    def _handle_signal(self, signum, frame):
+        """
+        第一次信号请求停止，第二次信号中断正在运行的任务
+        """
+        if self._stop.is_set() and self._running is not None:
+            logger.warning(f"再次收到信号 {signum}，中断正在运行的任务 {self._running}")
+            raise SystemExit(128 + signum)
+        self._stop.set()
+        if self._running is not None:
+            logger.info(f"收到信号 {signum}，任务 {self._running} 结束后退出")
+        else:
+            logger.info(f"收到信号 {signum}，退出调度")
+
+    def stop(self):
+        """
+        请求停止调度
+        """
+        self._stop.set()
+
+    def _wait_until(self, moment: datetime) -> bool:
+        """
+        等待到指定时间，期间收到停止请求时返回 False
+        """
+        while not self._stop.is_set():
+            remaining = (moment - datetime.now()).total_seconds()
+            if remaining <= 0:
+                return True
+            # 分段等待，系统时间调整后也能及时醒来
+            self._stop.wait(min(remaining, 60))
+        return False
+
+    def run_forever(self, on_idle=None):
+        """
+        运行调度循环直到收到停止请求；on_idle(任务, 下次触发时间) 在每次开始等待前调用
+        """
+        now = datetime.now()
+        for job in self.jobs:
+            if job.next_fire <= now:
+                logger.info(f"调度任务 {job.name}: '{job.schedule.expression}'，补跑启动前错过的 {job.next_fire} 触发")
+            else:
+                logger.info(f"调度任务 {job.name}: '{job.schedule.expression}'，下次运行 {job.next_fire}")
+        while not self._stop.is_set():
+            job = min(self.jobs, key=lambda item: item.next_fire)
+            if on_idle:
+                on_idle(job, job.next_fire)
+            jitter = random.uniform(0, self.jitter_seconds) if self.jitter_seconds else 0
+            if not self._wait_until(job.next_fire + timedelta(seconds=jitter)):
+                break
+
+            fire_time = job.next_fire
+            self._running = job.name
+            try:
+                job.func(fire_time)
+            except Exception as e:
+                logger.error(f"调度任务 {job.name} 运行失败: {e}")
+            finally:
+                self._running = None
+
+            # 运行期间错过的本任务触发合并为一次，下次触发从当前时间算起
+            now = datetime.now()
+            skipped = 0
+            moment = job.schedule.next_after(fire_time)
+            while moment <= now:
+                skipped += 1
+                moment = job.schedule.next_after(moment)
+            job.next_fire = moment
+            if skipped:
+                logger.warning(f"调度任务 {job.name} 运行期间错过 {skipped} 次触发，已合并")
+        logger.info("调度器已停止")
@@ -3,15 +3,20 @@
 AkShare 数据获取器
 """
 
-import time
 from datetime import datetime, timedelta
-from concurrent.futures import ThreadPoolExecutor, TimeoutError
 
-import akshare as ak
+import pandas as pd
 
 from src.core.config import config
 from src.core.exceptions import DataFetchError
 from src.core.logger import logger
+from src.core.metrics import RESPONSE_CACHE_LOOKUPS
+from src.data_ingestion.fetchers.fetch_runtime import get_fetch_runtime
+from src.data_ingestion.fetchers.response_cache import get_response_cache
+from src.utils.lazy_import import lazy_import
+
+# akshare 导入开销很大，首次调用接口时才导入
+ak = lazy_import("akshare")
 
 
 class AkShareFetcher:
@@ -32,12 +37,24 @@ class AkShareFetcher:
         """
         try:
             logger.info("Fetching stock list...")
-            stock_list = ak.stock_zh_a_spot()
+            stock_list = AkShareFetcher._cached_fetch("list", ak.stock_zh_a_spot)
             return stock_list
         except Exception as e:
             logger.error(f"Failed to fetch stock list: {e}")
             raise DataFetchError(f"Failed to fetch stock list: {e}")
 
+    @staticmethod
+    def fetch_stock_spot():
+        """
+        获取全市场实时行情（与股票列表同一接口，响应缓存有效期很短，收盘后获取即为当日行情）
+        """
+        try:
+            logger.info("Fetching A-share spot snapshot...")
+            return AkShareFetcher._cached_fetch("spot", ak.stock_zh_a_spot)
+        except Exception as e:
+            logger.error(f"Failed to fetch spot snapshot: {e}")
+            raise DataFetchError(f"Failed to fetch spot snapshot: {e}")
+
     @staticmethod
     def fetch_index_list():
         """
@@ -45,53 +62,114 @@ class AkShareFetcher:
         """
         try:
             logger.info("Fetching index list from EastMoney...")
-            index_list = ak.stock_zh_index_spot_em(symbol="沪深重要指数")
+            index_list = AkShareFetcher._cached_fetch("list", ak.stock_zh_index_spot_em, symbol="沪深重要指数")
             return index_list
         except Exception as e:
             logger.error(f"Failed to fetch index list: {e}")
             raise DataFetchError(f"Failed to fetch index list: {e}")
 
+    @staticmethod
+    def fetch_trade_calendar():
+        """
+        获取交易日历（新浪，包含当年已公布的全部交易日）
+        """
+        try:
+            logger.info("Fetching trading calendar...")
+            return AkShareFetcher._cached_fetch("list", ak.tool_trade_date_hist_sina)
+        except Exception as e:
+            logger.error(f"Failed to fetch trading calendar: {e}")
+            raise DataFetchError(f"Failed to fetch trading calendar: {e}")
+
     @staticmethod
     def _fetch_with_timeout(fetch_func, *args, **kwargs):
         """
-        带超时的数据获取
+        带超时的数据获取，由常驻运行时执行，超时后不等待挂起的调用
         """
-        with ThreadPoolExecutor(max_workers=1) as executor:
-            future = executor.submit(fetch_func, *args, **kwargs)
-            try:
-                return future.result(timeout=config.GET_TIMEOUT)
-            except TimeoutError:
-                raise DataFetchError(f"Operation timed out after {config.GET_TIMEOUT} seconds")
+        return get_fetch_runtime().call_with_timeout(fetch_func, *args, **kwargs)
 
     @staticmethod
-    def _fetch_with_retry(fetch_func, *args, max_retries=config.MAX_RETRIES, retry_delay=config.RETRY_DELAY, **kwargs):
+    def _fetch_with_retry(fetch_func, *args, max_retries=config.MAX_RETRIES, retry_delay=config.RETRY_BACKOFF_BASE,
+                          **kwargs):
         """
         带重试和超时的数据获取
+
+        请求前从所属数据源的令牌桶获取令牌并检查熔断状态，失败后按指数退避加随机抖动重试
+        """
+        return get_fetch_runtime().call_with_retry(
+            fetch_func, *args, max_retries=max_retries, retry_delay=retry_delay, **kwargs
+        )
+
+    @staticmethod
+    def _filter_date_range(data, start_date, end_date):
         """
-        for attempt in range(max_retries):
-            try:
-                result = AkShareFetcher._fetch_with_timeout(fetch_func, *args, **kwargs)
-                time.sleep(0.5)  # 成功后等待0.5秒
-                return result
-            except DataFetchError as e:
-                logger.warning(f"Timeout on attempt {attempt + 1}/{max_retries}")
-                if attempt < max_retries - 1:
-                    time.sleep(retry_delay)
-                    continue
-                raise DataFetchError(f"Failed to fetch data after {max_retries} attempts: {str(e)}")
-            except Exception as e:
-                logger.warning(f"Error on attempt {attempt + 1}/{max_retries}: {str(e)}")
-                if attempt < max_retries - 1:
-                    time.sleep(retry_delay)
-                    continue
-                raise DataFetchError(f"Failed to fetch data after {max_retries} attempts: {e}")
+        按 YYYYMMDD 格式的日期区间过滤数据，用于回放时截取缓存中更大区间的响应
+        """
+        date_column = next((col for col in ("date", "日期") if col in data.columns), None)
+        if date_column is None or start_date is None or end_date is None:
+            return data
+        dates = pd.to_datetime(data[date_column], errors='coerce')
+        return data[(dates >= pd.Timestamp(start_date)) & (dates <= pd.Timestamp(end_date))]
+
+    @staticmethod
+    def _read_cache(cache, dataset, fetch_func, kwargs):
+        """
+        读取响应缓存，未命中或已过期时返回 None
+
+        回放模式下只读缓存，找不到完全一致的请求时使用同一代码的最新缓存并按日期区间截取，
+        仍找不到则抛出 DataFetchError
+        """
+        api_name = fetch_func.__name__
+        key = cache.make_key(api_name, **kwargs)
+        if config.CACHE_REPLAY_MODE:
+            data = cache.get(key)
+            if data is None:
+                series_params = {k: v for k, v in kwargs.items() if k not in ("start_date", "end_date")}
+                data = cache.find_latest(api_name, **series_params)
+                if data is not None:
+                    data = AkShareFetcher._filter_date_range(data, kwargs.get("start_date"), kwargs.get("end_date"))
+            if data is None:
+                raise DataFetchError(f"Replay mode: no cached response for {api_name} {kwargs}")
+            return data
+
+        data = cache.get(key, ttl=config.RESPONSE_CACHE_TTL.get(dataset))
+        RESPONSE_CACHE_LOOKUPS.inc(dataset=dataset, result="miss" if data is None else "hit")
+        if data is not None:
+            logger.debug(f"Response cache hit for {api_name} {kwargs}")
+        return data
+
+    @staticmethod
+    def _write_cache(cache, dataset, fetch_func, kwargs, data):
+        """
+        将接口返回的 DataFrame 写入响应缓存
+        """
+        if isinstance(data, pd.DataFrame):
+            api_name = fetch_func.__name__
+            cache.put(cache.make_key(api_name, **kwargs), data, dataset, api_name, kwargs)
+
+    @staticmethod
+    def _cached_fetch(dataset, fetch_func, **kwargs):
+        """
+        经过响应缓存的数据获取
+
+        缓存键为 (API 函数, 代码, 复权方式, 日期区间等全部参数)，命中且未过期时直接返回缓存
+        """
+        cache = get_response_cache()
+        if cache is None:
+            return AkShareFetcher._fetch_with_retry(fetch_func, **kwargs)
+
+        data = AkShareFetcher._read_cache(cache, dataset, fetch_func, kwargs)
+        if data is None:
+            data = AkShareFetcher._fetch_with_retry(fetch_func, **kwargs)
+            AkShareFetcher._write_cache(cache, dataset, fetch_func, kwargs, data)
+        return data
 
     def fetch_stock_daily_data(self, symbol, start_date, end_date, adjust='hfq'):
         """
         获取股票日线数据
         """
         logger.info(f"Fetching daily data in mode {adjust}: for {symbol} from {start_date} to {end_date}...")
-        return self._fetch_with_retry(
+        return self._cached_fetch(
+            "stock_daily",
             ak.stock_zh_a_daily,
             symbol=symbol,
             start_date=start_date,
@@ -99,12 +177,25 @@ class AkShareFetcher:
             adjust=adjust
         )
 
+    def fetch_stock_adj_factor(self, symbol):
+        """
+        获取股票的后复权因子（每次除权除息一行，数据量很小）
+        """
+        logger.info(f"Fetching adjustment factors for {symbol}...")
+        return self._cached_fetch(
+            "adj_factor",
+            ak.stock_zh_a_daily,
+            symbol=symbol,
+            adjust="hfq-factor"
+        )
+
     def fetch_index_daily_data(self, symbol, start_date, end_date):
         """
         获取指数日数据
         """
         logger.info(f"Fetching daily data for index {symbol} from {start_date} to {end_date}...")
-        return self._fetch_with_retry(
+        return self._cached_fetch(
+            "index_daily",
             ak.index_zh_a_hist,  # 修改为东财的历史数据接口
             symbol=symbol,
             start_date=start_date,
@@ -118,21 +209,37 @@ class AkShareFetcher:
         """
         try:
             logger.info("Fetching concept board list...")
-            return self._fetch_with_retry(ak.stock_board_concept_name_em)
+            return self._cached_fetch("list", ak.stock_board_concept_name_em)
         except Exception as e:
             logger.error(f"Failed to fetch concept board list: {e}")
             raise DataFetchError(f"Failed to fetch concept board list: {e}")
 
-    def fetch_concept_board_daily_data(self, board_name, adjust, start_date='20220101', end_date='20310101'):
+    def fetch_concept_constituents(self, board_name):
+        """
+        获取概念板块的成分股
+        """
+        try:
+            logger.info(f"Fetching constituents for concept board {board_name}...")
+            return self._cached_fetch("list", ak.stock_board_concept_cons_em, symbol=board_name)
+        except Exception as e:
+            logger.error(f"Failed to fetch concept board constituents: {e}")
+            raise DataFetchError(f"Failed to fetch concept board constituents: {e}")
+
+    def fetch_concept_board_daily_data(self, board_name, adjust, start_date=config.CONCEPT_DATA_START_DATE,
+                                       end_date=None):
         """
         获取概念板块历史数据
         """
+        if end_date is None:
+            end_date = self.today.strftime("%Y%m%d")
         try:
-            logger.info(f"Fetching daily data in mode {adjust} : for concept board {board_name}...")
-            return self._fetch_with_retry(
+            logger.info(f"Fetching daily data in mode {adjust} : for concept board {board_name} "
+                        f"from {start_date} to {end_date}...")
+            return self._cached_fetch(
+                "concept_daily",
                 ak.stock_board_concept_hist_em,
                 symbol=board_name,
-                start_date=start_date,  # 这里要想办法解决一下，起始时间如何根据API来确定？
+                start_date=start_date,
                 end_date=end_date,
                 adjust=adjust
             )
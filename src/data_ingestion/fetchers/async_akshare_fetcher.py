@@ -0,0 +1,237 @@
+# src/data_ingestion/fetchers/async_akshare_fetcher.py
+"""
+AkShare 异步数据获取器
+"""
+
+import asyncio
+import time
+from datetime import datetime
+
+from src.core.config import config
+from src.core.exceptions import DataFetchError, FetchTimeoutError
+from src.core.logger import logger
+from src.data_ingestion.fetchers.akshare_fetcher import AkShareFetcher
+from src.data_ingestion.fetchers.fetch_runtime import get_fetch_runtime
+from src.data_ingestion.fetchers.rate_limiter import get_endpoint, get_endpoint_concurrency, get_rate_limiter
+from src.data_ingestion.fetchers.response_cache import get_response_cache
+from src.utils.lazy_import import lazy_import
+
+# akshare 导入开销很大，首次调用接口时才导入
+ak = lazy_import("akshare")
+
+
+class AsyncAkShareFetcher:
+    """
+    AkShare 异步数据获取器，AkShareFetcher 的协程版本
+
+    AkShare 本身是阻塞接口，实际请求仍由常驻运行时的工作线程执行；等待限速、熔断恢复、
+    退避重试和请求结果都在事件循环中进行，因此可以同时挂起数百个代码的请求而不必每个请求占用一个线程。
+    每个数据源使用一个信号量限制同时进行中的请求数；超时会取消等待，已在运行的调用计入被放弃的调用数。
+    与 AkShareFetcher 共用令牌桶、熔断器和响应缓存。
+
+    信号量绑定到首次使用它的事件循环，一个实例只应在一个事件循环中使用
+    """
+
+    def __init__(self, runtime=None):
+        """
+        初始化异步数据获取器
+        """
+        self.runtime = runtime or get_fetch_runtime()
+        self._semaphores = {}
+
+    def _semaphore(self, endpoint: str) -> asyncio.Semaphore:
+        """
+        获取数据源对应的信号量
+        """
+        semaphore = self._semaphores.get(endpoint)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(get_endpoint_concurrency(endpoint))
+            self._semaphores[endpoint] = semaphore
+        return semaphore
+
+    async def _fetch_with_timeout(self, fetch_func, timeout=config.GET_TIMEOUT, poll_interval=0.05, **kwargs):
+        """
+        带超时的数据获取，超时或被取消时放弃等待，不阻塞事件循环
+        """
+        deadline = time.monotonic() + timeout
+        while not self.runtime.has_capacity():
+            if time.monotonic() >= deadline:
+                raise FetchTimeoutError("Too many abandoned calls in flight")
+            await asyncio.sleep(poll_interval)
+
+        future = self.runtime.submit(fetch_func, **kwargs)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), max(deadline - time.monotonic(), 0))
+        except asyncio.TimeoutError:
+            self.runtime.abandon(future)
+            raise FetchTimeoutError(f"Operation timed out after {timeout} seconds")
+        except asyncio.CancelledError:
+            self.runtime.abandon(future)
+            raise
+
+    async def _fetch_with_retry(self, fetch_func, max_retries=config.MAX_RETRIES,
+                                retry_delay=config.RETRY_BACKOFF_BASE, **kwargs):
+        """
+        带限速、熔断、超时和指数退避重试的数据获取
+
+        只在请求进行期间持有数据源信号量，退避等待时释放给其它请求；
+        半开状态下的探测请求在等待信号量、限速或请求期间被取消时释放探测名额，熔断器不会一直拒绝后续请求
+        """
+        endpoint = get_endpoint(fetch_func)
+        api = getattr(fetch_func, "__name__", "unknown")
+        limiter = get_rate_limiter(endpoint)
+        breaker = self.runtime.get_breaker(endpoint)
+        for attempt in range(max_retries):
+            probe = await breaker.before_call_async()
+            try:
+                async with self._semaphore(endpoint):
+                    await limiter.acquire_async()
+                    started = time.perf_counter()
+                    try:
+                        result = await self._fetch_with_timeout(fetch_func, **kwargs)
+                        error = None
+                    except Exception as e:
+                        error = e
+            except BaseException:
+                # asyncio.CancelledError 不是 Exception 的子类，请求没有结果
+                if probe:
+                    breaker.release_probe()
+                raise
+
+            will_retry = error is not None and attempt < max_retries - 1
+            self.runtime.record_attempt(api, started, error, will_retry=will_retry)
+            if error is None:
+                breaker.record_success()
+                return result
+
+            breaker.record_failure()
+            if isinstance(error, FetchTimeoutError):
+                logger.warning(f"Timeout on attempt {attempt + 1}/{max_retries}")
+            else:
+                logger.warning(f"Error on attempt {attempt + 1}/{max_retries}: {str(error)}")
+            if will_retry:
+                await asyncio.sleep(self.runtime.backoff_delay(attempt, base=retry_delay))
+                continue
+            raise DataFetchError(f"Failed to fetch data after {max_retries} attempts: {error}")
+
+    async def _cached_fetch(self, dataset, fetch_func, **kwargs):
+        """
+        经过响应缓存的数据获取，缓存读写在线程中执行
+        """
+        cache = get_response_cache()
+        if cache is None:
+            return await self._fetch_with_retry(fetch_func, **kwargs)
+
+        data = await asyncio.to_thread(AkShareFetcher._read_cache, cache, dataset, fetch_func, kwargs)
+        if data is None:
+            data = await self._fetch_with_retry(fetch_func, **kwargs)
+            await asyncio.to_thread(AkShareFetcher._write_cache, cache, dataset, fetch_func, kwargs, data)
+        return data
+
+    async def fetch_stock_daily_data(self, symbol, start_date, end_date, adjust='hfq'):
+        """
+        获取股票日线数据
+        """
+        logger.info(f"Fetching daily data in mode {adjust}: for {symbol} from {start_date} to {end_date}...")
+        return await self._cached_fetch(
+            "stock_daily",
+            ak.stock_zh_a_daily,
+            symbol=symbol,
+            start_date=start_date,
+            end_date=end_date,
+            adjust=adjust
+        )
+
+    async def fetch_stock_adj_factor(self, symbol):
+        """
+        获取股票的后复权因子
+        """
+        logger.info(f"Fetching adjustment factors for {symbol}...")
+        return await self._cached_fetch(
+            "adj_factor",
+            ak.stock_zh_a_daily,
+            symbol=symbol,
+            adjust="hfq-factor"
+        )
+
+    async def fetch_index_daily_data(self, symbol, start_date, end_date):
+        """
+        获取指数日数据
+        """
+        logger.info(f"Fetching daily data for index {symbol} from {start_date} to {end_date}...")
+        return await self._cached_fetch(
+            "index_daily",
+            ak.index_zh_a_hist,
+            symbol=symbol,
+            start_date=start_date,
+            end_date=end_date,
+            period="daily"
+        )
+
+    async def fetch_concept_constituents(self, board_name):
+        """
+        获取概念板块的成分股
+        """
+        try:
+            logger.info(f"Fetching constituents for concept board {board_name}...")
+            return await self._cached_fetch("list", ak.stock_board_concept_cons_em, symbol=board_name)
+        except Exception as e:
+            logger.error(f"Failed to fetch concept board constituents: {e}")
+            raise DataFetchError(f"Failed to fetch concept board constituents: {e}")
+
+    async def fetch_concept_board_daily_data(self, board_name, adjust, start_date=config.CONCEPT_DATA_START_DATE,
+                                             end_date=None):
+        """
+        获取概念板块历史数据
+        """
+        if end_date is None:
+            end_date = datetime.today().strftime("%Y%m%d")
+        try:
+            logger.info(f"Fetching daily data in mode {adjust} : for concept board {board_name} "
+                        f"from {start_date} to {end_date}...")
+            return await self._cached_fetch(
+                "concept_daily",
+                ak.stock_board_concept_hist_em,
+                symbol=board_name,
+                start_date=start_date,
+                end_date=end_date,
+                adjust=adjust
+            )
+        except Exception as e:
+            logger.error(f"Failed to fetch concept board data: {e}")
+            raise DataFetchError(f"Failed to fetch concept board data: {e}")
+
+    @staticmethod
+    async def gather_keyed(calls: dict) -> dict:
+        """
+        并发等待 {键: 协程}，返回 {键: 结果或异常}，单个请求失败不影响其它请求
+        """
+        results = await asyncio.gather(*calls.values(), return_exceptions=True)
+        return dict(zip(calls.keys(), results))
+
+    async def fetch_stock_daily_batch(self, items, adjust='hfq') -> dict:
+        """
+        并发获取多只股票的日线数据，items 为 (代码, 开始日期, 结束日期)，返回 {代码: DataFrame 或异常}
+        """
+        return await self.gather_keyed({
+            symbol: self.fetch_stock_daily_data(symbol, start_date, end_date, adjust)
+            for symbol, start_date, end_date in items
+        })
+
+    async def fetch_index_daily_batch(self, items) -> dict:
+        """
+        并发获取多个指数的日数据，items 为 (代码, 开始日期, 结束日期)，返回 {代码: DataFrame 或异常}
+        """
+        return await self.gather_keyed({
+            symbol: self.fetch_index_daily_data(symbol, start_date, end_date)
+            for symbol, start_date, end_date in items
+        })
+
+    async def fetch_concept_board_daily_batch(self, items, adjust='hfq') -> dict:
+        """
+        并发获取多个概念板块的历史数据，items 为 (板块名称, 开始日期, 结束日期)，返回 {板块名称: DataFrame 或异常}
+        """
+        return await self.gather_keyed({
+            board_name: self.fetch_concept_board_daily_data(board_name, adjust, start_date, end_date)
+            for board_name, start_date, end_date in items
+        })
@@ -0,0 +1,292 @@
+# src/data_ingestion/fetchers/fetch_runtime.py
+"""
+长期运行的数据获取运行时：超时看门狗、指数退避重试和按数据源熔断
+"""
+
+import asyncio
+import queue
+import random
+import threading
+import time
+from concurrent.futures import Future, TimeoutError
+
+from src.core.config import config
+from src.core.exceptions import DataFetchError, FetchTimeoutError, CircuitOpenError
+from src.core.logger import logger
+from src.core.metrics import AKSHARE_REQUESTS, AKSHARE_REQUEST_SECONDS, AKSHARE_RETRIES, CIRCUIT_OPENED
+from src.data_ingestion.fetchers.rate_limiter import get_endpoint, get_rate_limiter
+
+
+class CircuitBreaker:
+    """
+    数据源熔断器
+
+    连续失败达到阈值后进入熔断状态，熔断期间请求等待恢复而不是继续访问数据源；
+    熔断时间结束后只放行一个探测请求，成功则恢复，失败则重新熔断
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name, failure_threshold=config.CIRCUIT_FAILURE_THRESHOLD,
+                 reset_timeout=config.CIRCUIT_RESET_TIMEOUT):
+        """
+        初始化熔断器
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._cond = threading.Condition()
+
+    def _try_enter(self):
+        """
+        检查是否放行请求，调用方需持有锁；放行时返回 None，否则返回建议的等待秒数
+        """
+        now = time.monotonic()
+        if self.state == self.CLOSED:
+            return None
+        if self.state == self.OPEN and now >= self._opened_at + self.reset_timeout:
+            logger.info(f"Circuit for {self.name} half-open, sending probe request.")
+            self.state = self.HALF_OPEN
+            self._probe_in_flight = False
+        if self.state == self.HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return None
+        if self.state == self.OPEN:
+            return self._opened_at + self.reset_timeout - now
+        # 探测请求进行中，等待其结果
+        return self.reset_timeout
+
+    def before_call(self, max_wait=config.CIRCUIT_MAX_WAIT):
+        """
+        请求前检查熔断状态，熔断中最多等待 max_wait 秒，仍未恢复则抛出 CircuitOpenError；
+        放行时返回本次请求是否为半开状态下的探测请求
+        """
+        deadline = time.monotonic() + max_wait
+        with self._cond:
+            while True:
+                wait_time = self._try_enter()
+                if wait_time is None:
+                    return self.state == self.HALF_OPEN
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise CircuitOpenError(f"Circuit for {self.name} is open")
+                self._cond.wait(min(wait_time, remaining))
+
+    async def before_call_async(self, max_wait=config.CIRCUIT_MAX_WAIT, poll_interval=1.0):
+        """
+        before_call 的协程版本，熔断中按 poll_interval 轮询状态，不阻塞事件循环
+        """
+        deadline = time.monotonic() + max_wait
+        while True:
+            with self._cond:
+                wait_time = self._try_enter()
+                probe = wait_time is None and self.state == self.HALF_OPEN
+            if wait_time is None:
+                return probe
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise CircuitOpenError(f"Circuit for {self.name} is open")
+            await asyncio.sleep(min(wait_time, remaining, poll_interval))
+
+    def release_probe(self):
+        """
+        探测请求被取消、没有结果时释放探测名额，下一个请求重新探测
+        """
+        with self._cond:
+            if self.state == self.HALF_OPEN:
+                self._probe_in_flight = False
+            self._cond.notify_all()
+
+    def record_success(self):
+        """
+        记录成功请求，恢复为闭合状态
+        """
+        with self._cond:
+            if self.state != self.CLOSED:
+                logger.info(f"Circuit for {self.name} closed.")
+            self.state = self.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+            self._cond.notify_all()
+
+    def record_failure(self):
+        """
+        记录失败请求，达到阈值或探测失败时进入熔断状态
+        """
+        with self._cond:
+            self._failures += 1
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    CIRCUIT_OPENED.inc(endpoint=self.name)
+                    logger.warning(f"Circuit for {self.name} opened after {self._failures} consecutive failures, "
+                                   f"pausing requests for {self.reset_timeout} seconds.")
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._probe_in_flight = False
+            self._cond.notify_all()
+
+
+class FetchRuntime:
+    """
+    数据获取运行时
+
+    使用常驻的守护线程池执行 API 调用，超时后直接放弃等待而不阻塞在线程池关闭上；
+    被放弃但仍在运行的调用数量受 MAX_ABANDONED_CALLS 限制，超出时新请求等待
+    """
+
+    def __init__(self, max_workers=config.MAX_THREADS, max_abandoned=config.MAX_ABANDONED_CALLS):
+        """
+        初始化运行时并启动工作线程
+        """
+        self.max_abandoned = max_abandoned
+        self._abandoned = 0
+        self._abandoned_cond = threading.Condition()
+        self._breakers = {}
+        self._breakers_lock = threading.Lock()
+        self._queue = queue.Queue()
+        # 为被放弃的调用预留线程，避免挂起的请求占满工作线程
+        for i in range(max_workers + max_abandoned):
+            thread = threading.Thread(target=self._worker, name=f"akshare-fetch-{i}", daemon=True)
+            thread.start()
+
+    def _worker(self):
+        """
+        工作线程主循环
+        """
+        while True:
+            future, fetch_func, args, kwargs = self._queue.get()
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fetch_func(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+
+    def _release_abandoned(self, _future):
+        """
+        被放弃的调用结束后释放名额
+        """
+        with self._abandoned_cond:
+            self._abandoned -= 1
+            self._abandoned_cond.notify_all()
+
+    def get_breaker(self, endpoint) -> CircuitBreaker:
+        """
+        获取数据源对应的熔断器
+        """
+        with self._breakers_lock:
+            breaker = self._breakers.get(endpoint)
+            if breaker is None:
+                breaker = CircuitBreaker(endpoint)
+                self._breakers[endpoint] = breaker
+            return breaker
+
+    def has_capacity(self) -> bool:
+        """
+        被放弃的调用数是否低于上限
+        """
+        with self._abandoned_cond:
+            return self._abandoned < self.max_abandoned
+
+    def submit(self, fetch_func, *args, **kwargs) -> Future:
+        """
+        将调用提交给工作线程，返回 concurrent.futures.Future
+        """
+        future = Future()
+        self._queue.put((future, fetch_func, args, kwargs))
+        return future
+
+    def abandon(self, future: Future):
+        """
+        放弃等待一个调用：尚未开始的直接取消，已在运行的计入被放弃的调用数，结束后释放名额
+        """
+        if not future.cancel():
+            with self._abandoned_cond:
+                self._abandoned += 1
+            future.add_done_callback(self._release_abandoned)
+
+    def call_with_timeout(self, fetch_func, *args, timeout=config.GET_TIMEOUT, **kwargs):
+        """
+        带超时的数据获取，超时后立即返回，不等待挂起的调用结束
+        """
+        with self._abandoned_cond:
+            if not self._abandoned_cond.wait_for(lambda: self._abandoned < self.max_abandoned, timeout=timeout):
+                raise FetchTimeoutError(f"Too many abandoned calls in flight ({self._abandoned})")
+
+        future = self.submit(fetch_func, *args, **kwargs)
+        try:
+            return future.result(timeout=timeout)
+        except TimeoutError:
+            self.abandon(future)
+            raise FetchTimeoutError(f"Operation timed out after {timeout} seconds")
+
+    @staticmethod
+    def record_attempt(api: str, started: float, error=None, will_retry=False):
+        """
+        记录一次请求尝试的耗时和结果
+        """
+        AKSHARE_REQUEST_SECONDS.observe(time.perf_counter() - started, api=api)
+        if error is None:
+            outcome = "success"
+        else:
+            outcome = "timeout" if isinstance(error, FetchTimeoutError) else "error"
+        AKSHARE_REQUESTS.inc(api=api, outcome=outcome)
+        if will_retry:
+            AKSHARE_RETRIES.inc(api=api)
+
+    @staticmethod
+    def backoff_delay(attempt, base=config.RETRY_BACKOFF_BASE, cap=config.RETRY_BACKOFF_MAX):
+        """
+        计算带随机抖动的指数退避等待时间（full jitter）
+        """
+        return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+    def call_with_retry(self, fetch_func, *args, max_retries=config.MAX_RETRIES,
+                        retry_delay=config.RETRY_BACKOFF_BASE, **kwargs):
+        """
+        带限速、熔断、超时和指数退避重试的数据获取
+        """
+        endpoint = get_endpoint(fetch_func)
+        api = getattr(fetch_func, "__name__", "unknown")
+        limiter = get_rate_limiter(endpoint)
+        breaker = self.get_breaker(endpoint)
+        for attempt in range(max_retries):
+            breaker.before_call()
+            limiter.acquire()
+            started = time.perf_counter()
+            try:
+                result = self.call_with_timeout(fetch_func, *args, **kwargs)
+            except Exception as e:
+                self.record_attempt(api, started, e, will_retry=attempt < max_retries - 1)
+                breaker.record_failure()
+                if isinstance(e, FetchTimeoutError):
+                    logger.warning(f"Timeout on attempt {attempt + 1}/{max_retries}")
+                else:
+                    logger.warning(f"Error on attempt {attempt + 1}/{max_retries}: {str(e)}")
+                if attempt < max_retries - 1:
+                    time.sleep(self.backoff_delay(attempt, base=retry_delay))
+                    continue
+                raise DataFetchError(f"Failed to fetch data after {max_retries} attempts: {e}")
+            self.record_attempt(api, started)
+            breaker.record_success()
+            return result
+
+
+_runtime = None
+_runtime_lock = threading.Lock()
+
+
+def get_fetch_runtime() -> FetchRuntime:
+    """
+    获取进程内共享的数据获取运行时
+    """
+    global _runtime
+    with _runtime_lock:
+        if _runtime is None:
+            _runtime = FetchRuntime()
+        return _runtime
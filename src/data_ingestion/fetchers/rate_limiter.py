@@ -0,0 +1,124 @@
+# src/data_ingestion/fetchers/rate_limiter.py
+"""
+按数据源限速的令牌桶限流器
+"""
+
+import asyncio
+import threading
+import time
+
+from src.core.config import config
+
+
+class TokenBucket:
+    """
+    线程安全的令牌桶
+
+    rate 为每秒补充的令牌数，capacity 为允许的最大突发请求数
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        """
+        初始化令牌桶
+        """
+        if rate <= 0:
+            raise ValueError("Token bucket rate must be positive.")
+        self.rate = float(rate)
+        self.capacity = max(float(capacity), 1.0)
+        self._tokens = self.capacity
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        """
+        按经过的时间补充令牌，调用方需持有锁
+        """
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    def try_acquire(self, tokens: float = 1.0) -> float:
+        """
+        尝试获取令牌，不阻塞；成功时返回 0，令牌不足时返回需要等待的秒数
+        """
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self.rate
+
+    def acquire(self, tokens: float = 1.0):
+        """
+        获取令牌，令牌不足时阻塞等待
+        """
+        while True:
+            wait_time = self.try_acquire(tokens)
+            if wait_time <= 0:
+                return
+            time.sleep(wait_time)
+
+    async def acquire_async(self, tokens: float = 1.0):
+        """
+        获取令牌的协程版本，令牌不足时让出事件循环而不阻塞线程
+        """
+        while True:
+            wait_time = self.try_acquire(tokens)
+            if wait_time <= 0:
+                return
+            await asyncio.sleep(wait_time)
+
+
+# 各 API 函数所属的数据源
+API_ENDPOINTS = {
+    "stock_zh_a_spot": "sina",
+    "stock_zh_a_daily": "sina",
+    "tool_trade_date_hist_sina": "sina",
+    "stock_zh_index_spot_em": "eastmoney",
+    "index_zh_a_hist": "eastmoney",
+    "stock_board_concept_name_em": "eastmoney",
+    "stock_board_concept_hist_em": "eastmoney",
+    "stock_board_concept_cons_em": "eastmoney",
+}
+
+# 各数据源的限速配置: (每秒请求数, 突发容量)
+ENDPOINT_LIMITS = {
+    "sina": (config.SINA_RATE_LIMIT, config.SINA_RATE_BURST),
+    "eastmoney": (config.EASTMONEY_RATE_LIMIT, config.EASTMONEY_RATE_BURST),
+}
+
+# 异步获取时各数据源同时进行中的请求数上限
+ENDPOINT_CONCURRENCY = {
+    "sina": config.SINA_MAX_CONCURRENCY,
+    "eastmoney": config.EASTMONEY_MAX_CONCURRENCY,
+}
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_endpoint(fetch_func) -> str:
+    """
+    根据 API 函数名获取所属数据源，未登记的函数归入 default
+    """
+    return API_ENDPOINTS.get(getattr(fetch_func, "__name__", ""), "default")
+
+
+def get_rate_limiter(endpoint: str) -> TokenBucket:
+    """
+    获取数据源共享的令牌桶，同一数据源的所有线程共用一个限速预算
+    """
+    with _limiters_lock:
+        limiter = _limiters.get(endpoint)
+        if limiter is None:
+            rate, burst = ENDPOINT_LIMITS.get(endpoint, (config.DEFAULT_RATE_LIMIT, config.DEFAULT_RATE_BURST))
+            limiter = TokenBucket(rate, burst)
+            _limiters[endpoint] = limiter
+        return limiter
+
+
+def get_endpoint_concurrency(endpoint: str) -> int:
+    """
+    获取数据源允许同时进行中的请求数
+    """
+    return ENDPOINT_CONCURRENCY.get(endpoint, config.DEFAULT_MAX_CONCURRENCY)
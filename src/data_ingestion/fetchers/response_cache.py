@@ -0,0 +1,235 @@
+# src/data_ingestion/fetchers/response_cache.py
+"""
+AkShare 原始响应的磁盘缓存
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+from src.core.config import config
+from src.core.logger import logger
+
+
+class ResponseCache:
+    """
+    按内容寻址的 AkShare 响应缓存
+
+    缓存键由 (API 函数, 请求参数) 计算得到，响应以 zstd 压缩的 Parquet 文件保存；
+    索引常驻内存（OrderedDict，按最近访问排序），磁盘上以追加写的 index.jsonl 记录写入和删除，
+    加载时回放并压缩。总大小超过上限时按 LRU 淘汰。
+    命中时只更新内存中的访问时间，在压缩索引时写回：日志行数超过记录数的 INDEX_COMPACT_RATIO 倍，
+    或访问时间超过 INDEX_COMPACT_INTERVAL 秒未写回时压缩，常驻进程中索引文件不会无限增长
+    """
+
+    INDEX_FILE = "index.jsonl"
+    INDEX_COMPACT_RATIO = 2
+    INDEX_COMPACT_SLACK = 100
+    INDEX_COMPACT_INTERVAL = 600
+
+    def __init__(self, cache_dir=config.RESPONSE_CACHE_DIR, max_bytes=config.RESPONSE_CACHE_MAX_MB * 1024 * 1024):
+        """
+        初始化缓存并加载索引
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._index_path = os.path.join(cache_dir, self.INDEX_FILE)
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        self._index_lines = 0
+        self._access_dirty = False
+        self._compacted_at = time.monotonic()
+        self._lock = threading.RLock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self._load_index()
+
+    @staticmethod
+    def make_key(api_name: str, **params) -> str:
+        """
+        根据 API 函数名和请求参数计算缓存键
+        """
+        payload = json.dumps([api_name, sorted(params.items())], ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _file_path(self, key: str) -> str:
+        """
+        缓存文件路径，按键前两位分目录
+        """
+        return os.path.join(self.cache_dir, key[:2], f"{key}.parquet")
+
+    def _load_index(self):
+        """
+        回放追加写的索引日志，删除已失效的记录和孤立文件，并重写压缩后的索引
+        """
+        entries = {}
+        if os.path.exists(self._index_path):
+            with open(self._index_path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # 进程中断时可能留下不完整的最后一行
+                    key = record.get("key")
+                    if record.get("op") == "put":
+                        entries[key] = record["entry"]
+                    elif record.get("op") == "touch" and key in entries:  # 旧版本按命中追加的访问记录
+                        entries[key]["accessed"] = record["accessed"]
+                    elif record.get("op") == "delete":
+                        entries.pop(key, None)
+
+        for key, entry in sorted(entries.items(), key=lambda item: item[1]["accessed"]):
+            if os.path.exists(self._file_path(key)):
+                self._entries[key] = entry
+                self._total_bytes += entry["size"]
+
+        # 删除索引中没有记录的缓存文件
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith(".parquet") and name[:-len(".parquet")] not in self._entries:
+                    os.remove(os.path.join(root, name))
+
+        self._rewrite_index()
+        logger.info(f"Response cache loaded: {len(self._entries)} entries, {self._total_bytes / 1024 / 1024:.1f} MB.")
+
+    def _rewrite_index(self):
+        """
+        将内存中的索引（包括访问时间）完整写回磁盘
+        """
+        tmp_path = self._index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for key, entry in self._entries.items():
+                f.write(json.dumps({"op": "put", "key": key, "entry": entry}, ensure_ascii=False) + "\n")
+        os.replace(tmp_path, self._index_path)
+        self._index_lines = len(self._entries)
+        self._access_dirty = False
+        self._compacted_at = time.monotonic()
+
+    def _maybe_compact(self):
+        """
+        索引日志过长或访问时间长时间未写回时压缩索引，调用方需持有锁
+        """
+        too_long = self._index_lines > self.INDEX_COMPACT_RATIO * len(self._entries) + self.INDEX_COMPACT_SLACK
+        stale = self._access_dirty and time.monotonic() - self._compacted_at > self.INDEX_COMPACT_INTERVAL
+        if too_long or stale:
+            try:
+                self._rewrite_index()
+            except OSError as e:
+                logger.warning(f"Failed to compact response cache index: {e}")
+
+    def _append_index(self, record: dict):
+        """
+        追加一条索引日志，调用方需持有锁
+        """
+        with open(self._index_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._index_lines += 1
+        self._maybe_compact()
+
+    def _evict(self, key: str):
+        """
+        删除一条缓存，调用方需持有锁
+        """
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._total_bytes -= entry["size"]
+        try:
+            os.remove(self._file_path(key))
+        except FileNotFoundError:
+            pass
+        self._append_index({"op": "delete", "key": key})
+
+    def get(self, key: str, ttl=None):
+        """
+        读取缓存，未命中或超过 ttl 秒时返回 None；ttl 为 None 表示不检查过期
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if ttl is not None and time.time() - entry["created"] > ttl:
+                self._evict(key)
+                return None
+            entry["accessed"] = time.time()
+            self._entries.move_to_end(key)
+            self._access_dirty = True
+            self._maybe_compact()
+
+        try:
+            return pd.read_parquet(self._file_path(key))
+        except Exception as e:
+            logger.warning(f"Failed to read cached response {key}: {e}")
+            with self._lock:
+                self._evict(key)
+            return None
+
+    def put(self, key: str, data: pd.DataFrame, dataset: str, api_name: str, params: dict):
+        """
+        写入缓存，超过大小上限时淘汰最久未访问的记录
+        """
+        path = self._file_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            data.to_parquet(tmp_path, compression="zstd", index=False)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Failed to cache response for {api_name} {params}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+
+        now = time.time()
+        entry = {
+            "dataset": dataset,
+            "api": api_name,
+            "params": {k: str(v) for k, v in params.items()},
+            "size": os.path.getsize(path),
+            "created": now,
+            "accessed": now,
+        }
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._total_bytes -= previous["size"]
+            self._entries[key] = entry
+            self._total_bytes += entry["size"]
+            self._append_index({"op": "put", "key": key, "entry": entry})
+            while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+                self._evict(next(iter(self._entries)))
+
+    def find_latest(self, api_name: str, **params):
+        """
+        在缓存中查找同一 API、参数匹配的最新响应（用于离线回放时日期区间不完全一致的情况）
+        """
+        expected = {k: str(v) for k, v in params.items()}
+        with self._lock:
+            candidates = [
+                (entry["created"], key) for key, entry in self._entries.items()
+                if entry["api"] == api_name and all(entry["params"].get(k) == v for k, v in expected.items())
+            ]
+        if not candidates:
+            return None
+        return self.get(max(candidates)[1])
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """
+    获取进程内共享的响应缓存，未启用时返回 None
+    """
+    global _cache
+    if not config.RESPONSE_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache()
+        return _cache
@@ -1,61 +1,327 @@
 # src/data_ingestion/loaders/database_loader.py
+import numpy as np
 import pandas as pd
+from datetime import datetime
+from sqlalchemy import func, tuple_, Date, Integer, Numeric, Float, String
 from sqlalchemy.orm import Session
-from sqlalchemy.exc import IntegrityError
-from src.database.session import get_db
+from src.database.session import SessionLocal, get_engine, session_scope
 from src.database.models.stock import StockDailyData
+from src.database.models.index import IndexDailyData
+from src.database.models.concept import ConceptBoardData, ConceptConstituent
+from src.database.models.adj_factor import StockAdjFactor
+from src.database.models.setting import StorageSetting
+from src.database.partitioning import DailyPartitioning
+from src.database.data_reader import DataReader
 from src.core.logger import logger
 from src.core.exceptions import DataSaveError
 from src.core.config import config
+from src.core.metrics import ROWS_WRITTEN
+from src.data_ingestion.loaders.postgres_copy_loader import PostgresCopyLoader
+from src.data_ingestion.loaders.load_result import (
+    LoadResult, CONFLICT_UPDATE, CONFLICT_ERROR, validate_conflict_policy
+)
 
 
 class DatabaseLoader:
     """数据库加载器"""
 
     @staticmethod
-    def load_stock_daily_data(stock_data: pd.DataFrame, symbol: str):
-        """加载股票日线数据到数据库，包含批量插入和冲突处理"""
-        logger.info(f"Loading daily data for stock {symbol} to database...")
-        db: Session = next(get_db())
-        data_to_insert = []
-
-        for _, row in stock_data.iterrows():
-            row_date_str = row["date"]
-            row_date = pd.to_datetime(row_date_str, errors='coerce').date()
-            if pd.isna(row_date):
-                logger.warning(f"Invalid date format: {row_date_str}")
-                continue
-
-            data_to_insert.append(
-                StockDailyData(
-                    symbol=symbol,
-                    date=row_date,
-                    open=row["open"],
-                    close=row["close"],
-                    high=row["high"],
-                    low=row["low"],
-                    volume=row["volume"],
-                    amount=row["amount"],
-                    outstanding_share=row["outstanding_share"],
-                    turnover=row["turnover"]
-                )
-            )
+    def _use_copy_loader() -> bool:
+        """
+        PostgreSQL 下使用 COPY 批量加载，其它数据库（如 SQLite）使用 ORM 批量插入
+        """
+        return config.USE_PG_COPY_LOADER and get_engine().dialect.name == "postgresql"
 
-        try:
-            # 使用 SQLAlchemy 的 bulk_insert_mappings 方法
-            db.bulk_insert_mappings(StockDailyData, [data.__dict__ for data in data_to_insert])
+    @staticmethod
+    def get_latest_dates(model, key_column: str, date_column: str = "date") -> dict:
+        """
+        查询每个代码在数据库中的最后日期，返回 {代码: 最后日期}
+
+        使用一次 GROUP BY 查询代替逐个代码查询
+        """
+        key = getattr(model, key_column)
+        with SessionLocal() as db:
+            rows = db.query(key, func.max(getattr(model, date_column))).group_by(key).all()
+        logger.info(f"Found latest dates for {len(rows)} keys in {model.__tablename__}.")
+        return {code: last_date for code, last_date in rows}
+
+    @staticmethod
+    def get_latest_stock_dates() -> dict:
+        """获取每只股票的最后日期"""
+        return DatabaseLoader.get_latest_dates(StockDailyData, "symbol")
+
+    @staticmethod
+    def get_adj_factor_refresh_times() -> dict:
+        """获取每只股票复权因子的最近刷新时间"""
+        return DatabaseLoader.get_latest_dates(StockAdjFactor, "symbol", "updated_at")
+
+    @staticmethod
+    def get_latest_index_dates() -> dict:
+        """获取每个指数的最后日期"""
+        return DatabaseLoader.get_latest_dates(IndexDailyData, "symbol")
+
+    @staticmethod
+    def get_latest_concept_dates() -> dict:
+        """获取每个概念板块的最后日期"""
+        return DatabaseLoader.get_latest_dates(ConceptBoardData, "concept_code")
+
+    @staticmethod
+    def get_constituent_refresh_times() -> dict:
+        """获取每个概念板块成分股的最近刷新时间"""
+        return DatabaseLoader.get_latest_dates(ConceptConstituent, "concept_code", "updated_at")
+
+    @staticmethod
+    def get_concept_constituents() -> pd.DataFrame:
+        """获取全部概念板块的成分股，返回 concept_code、symbol 两列"""
+        with SessionLocal() as db:
+            rows = db.query(ConceptConstituent.concept_code, ConceptConstituent.symbol).all()
+        return pd.DataFrame.from_records(rows, columns=["concept_code", "symbol"])
+
+    @staticmethod
+    def delete_stale_constituents(concept_codes, refreshed_at) -> int:
+        """
+        删除这些板块中早于本次刷新时间的成分股（已被调出板块的股票），返回删除的行数
+        """
+        with session_scope() as db:
+            deleted = db.query(ConceptConstituent).filter(
+                ConceptConstituent.concept_code.in_(list(concept_codes)),
+                ConceptConstituent.updated_at < refreshed_at,
+            ).delete(synchronize_session=False)
+            db.commit()
+        return deleted
+
+    @staticmethod
+    def get_concept_aggregation_window() -> tuple:
+        """
+        返回需要计算涨跌家数和总市值的日期区间 (最早未计算的板块日期, 股票日线的最后日期)，没有待计算的日期时起始日期为 None
+        """
+        with SessionLocal() as db:
+            last_stock_date = db.query(func.max(StockDailyData.date)).scalar()
+            first_pending = db.query(func.min(ConceptBoardData.date)).filter(
+                ConceptBoardData.up_count.is_(None), ConceptBoardData.date <= last_stock_date
+            ).scalar() if last_stock_date is not None else None
+        return first_pending, last_stock_date
+
+    @staticmethod
+    def has_rows(model) -> bool:
+        """表中是否已有数据"""
+        with SessionLocal() as db:
+            return db.query(model).first() is not None
+
+    @staticmethod
+    def get_storage_setting(name: str):
+        """获取已记录的存储设置，没有记录时返回 None"""
+        with SessionLocal() as db:
+            return db.query(StorageSetting.value).filter(StorageSetting.name == name).scalar()
+
+    @staticmethod
+    def set_storage_setting(name: str, value: str):
+        """记录存储设置，已有记录时覆盖"""
+        with SessionLocal() as db:
+            db.merge(StorageSetting(name=name, value=value, updated_at=datetime.now()))
             db.commit()
-            logger.info(f"Inserted {len(data_to_insert)} new records for stock {symbol}.")
 
-        except IntegrityError as e:
-            db.rollback()
-            # 唯一约束冲突，记录冲突信息，然后跳过冲突的记录
-            logger.warning(f"IntegrityError encountered while saving data for stock {symbol}: {e}")
+    @staticmethod
+    def _cast_column(series: pd.Series, column_type) -> pd.Series:
+        """
+        将一列数据转换为模型列类型对应的 pandas 类型
+        """
+        if isinstance(column_type, Date):
+            return pd.to_datetime(series, errors='coerce')
+        if isinstance(column_type, Integer):  # 包括 BigInteger
+            return pd.to_numeric(series, errors='coerce').round().astype("Int64")
+        if isinstance(column_type, Numeric) and not isinstance(column_type, Float):
+            numeric = pd.to_numeric(series, errors='coerce').astype("float64")
+            return numeric.round(column_type.scale) if column_type.scale is not None else numeric
+        if isinstance(column_type, Float):
+            if series.dtype == "float32":
+                # float32 列来自只保留两位小数的百分比字段，升为 float64 时去除 float32 的表示误差
+                return series.astype("float64").round(4)
+            return pd.to_numeric(series, errors='coerce').astype("float64")
+        if isinstance(column_type, String):
+            return series.astype("string")
+        return series
+
+    @staticmethod
+    def prepare_frame(model, data: pd.DataFrame, **key_values) -> pd.DataFrame:
+        """
+        按模型定义整理 DataFrame：根据 column_mappings 重命名，换算单位，转换为模型列类型，
+        附加代码等固定列，并过滤日期无效的行
+        """
+        frame = data.rename(columns=getattr(model, "column_mappings", {}))
+        table_columns = model.__table__.columns
+        data_columns = [col.name for col in table_columns if col.name in frame.columns and col.name not in key_values]
+        frame = frame[data_columns].copy()
+
+        for name, divisor in getattr(model, "column_divisors", {}).items():
+            if name in frame.columns:
+                frame[name] = pd.to_numeric(frame[name], errors='coerce') / divisor
+        for name, value in key_values.items():
+            frame[name] = value
+        for col in table_columns:
+            if col.name in frame.columns:
+                frame[col.name] = DatabaseLoader._cast_column(frame[col.name], col.type)
+
+        date_columns = [col.name for col in table_columns if isinstance(col.type, Date) and col.name in frame.columns]
+        for name in date_columns:
+            invalid_dates = frame[name].isna()
+            if invalid_dates.any():
+                logger.warning(f"Dropping {int(invalid_dates.sum())} rows with invalid {name} "
+                               f"for {model.__tablename__} {key_values}.")
+                frame = frame[~invalid_dates]
+            frame[name] = frame[name].dt.date
+
+        return frame[[col.name for col in table_columns if col.name in frame.columns]]
+
+    @staticmethod
+    def _to_records(frame: pd.DataFrame) -> list:
+        """
+        将 DataFrame 转换为 bulk_insert_mappings 使用的字典列表，缺失值转换为 None
+        """
+        if frame.isna().values.any():
+            frame = frame.astype(object).where(frame.notna(), None)
+        return frame.to_dict('records')
+
+    @staticmethod
+    def _changed_mask(new: pd.DataFrame, stored: pd.DataFrame) -> np.ndarray:
+        """
+        逐行比较即将写入的值和数据库中的现有值（两者按行对齐），返回有差异的行；两边都缺失视为相同
+        """
+        changed = np.zeros(len(new), dtype=bool)
+        for name in new.columns:
+            left, right = new[name], stored[name]
+            if pd.api.types.is_numeric_dtype(left):
+                left = left.astype("float64")
+                right = pd.to_numeric(right, errors='coerce').astype("float64")
+            elif pd.api.types.is_datetime64_any_dtype(left):
+                right = pd.to_datetime(right)
+            else:
+                left = left.astype(object).where(left.notna(), None)
+                right = right.astype(object).where(right.notna(), None)
+            missing = left.isna().to_numpy() & right.isna().to_numpy()
+            changed |= ~((left.to_numpy() == right.to_numpy()) | missing)
+        return changed
+
+    @staticmethod
+    def _load_chunk(db: Session, model, chunk: pd.DataFrame, conflict_policy: str) -> LoadResult:
+        """
+        使用 ORM 批量操作写入一个批次，调用方负责提交或回滚
+
+        先查询批次内已存在的行，再按冲突处理策略决定新增、更新或跳过；
+        update 策略只更新与现有值不同的行，重复运行重叠的区间不会改写未变化的数据
+        """
+        if conflict_policy == CONFLICT_ERROR:
+            db.bulk_insert_mappings(model, DatabaseLoader._to_records(chunk))
+            return LoadResult(inserted=len(chunk))
+
+        pk_columns = [col.name for col in model.__table__.primary_key.columns]
+        unique_chunk = chunk.drop_duplicates(subset=pk_columns, keep='last')
+        keys = list(unique_chunk[pk_columns].itertuples(index=False, name=None))
+        pk_attrs = [getattr(model, name) for name in pk_columns]
+        compare_columns = [name for name in unique_chunk.columns if name not in pk_columns] \
+            if conflict_policy == CONFLICT_UPDATE else []
+        stored = pd.DataFrame.from_records(
+            db.query(*pk_attrs, *[getattr(model, name) for name in compare_columns]).filter(
+                tuple_(*pk_attrs).in_(keys)
+            ).all(),
+            columns=pk_columns + compare_columns,
+        )
+        is_existing = pd.MultiIndex.from_frame(unique_chunk[pk_columns]).isin(
+            list(stored[pk_columns].itertuples(index=False, name=None))
+        )
 
-            # 详细记录重复的键值
-            logger.warning(f"Failed to save daily data for stock {symbol} to database: {e}")
+        new_rows = unique_chunk[~is_existing]
+        existing_rows = unique_chunk[is_existing]
+        result = LoadResult(inserted=len(new_rows), skipped=len(chunk) - len(unique_chunk))
+        if not new_rows.empty:
+            db.bulk_insert_mappings(model, DatabaseLoader._to_records(new_rows))
+        if compare_columns and not existing_rows.empty:
+            aligned = stored.set_index(pk_columns).reindex(pd.MultiIndex.from_frame(existing_rows[pk_columns]))
+            changed_rows = existing_rows[
+                DatabaseLoader._changed_mask(existing_rows[compare_columns], aligned[compare_columns])
+            ]
+            if not changed_rows.empty:
+                db.bulk_update_mappings(model, DatabaseLoader._to_records(changed_rows))
+            result.updated = len(changed_rows)
+            result.skipped += len(existing_rows) - len(changed_rows)
+        else:
+            result.skipped += len(existing_rows)
+        return result
+
+    @staticmethod
+    def load_dataframe(model, frame: pd.DataFrame, description: str, conflict_policy=CONFLICT_UPDATE,
+                       batch_size=config.DATA_LOAD_BATCH_SIZE, atomic=False) -> LoadResult:
+        """
+        将已通过 prepare_frame 整理好的 DataFrame 按 batch_size 分批写入模型对应的表
 
+        每个批次在独立事务中提交，主键冲突按 conflict_policy 处理（skip/update/error），
+        update 策略只改写值有变化的行，因此重复运行重叠的日期区间是幂等的，只会写入差异部分。
+        atomic 为 True 时全部批次在一个事务中提交，失败时整体回滚，调用方可以安全地拆分后重试。
+        PostgreSQL 下使用 COPY + ON CONFLICT，其它数据库使用 ORM 批量操作。
+        在 worker_session() 中调用时复用加载线程的会话和连接，否则使用临时会话
+        """
+        validate_conflict_policy(conflict_policy)
+        try:
+            # 按年份分区时先确保批次涉及的年份都有分区，写入由数据库路由到对应分区
+            DailyPartitioning.ensure_for_frame(get_engine(), model, frame)
+            with session_scope() as db:
+                if DatabaseLoader._use_copy_loader():
+                    try:
+                        result = PostgresCopyLoader.copy_upsert(
+                            get_engine(), model, frame, conflict_policy, batch_size,
+                            connection=db.connection().connection, atomic=atomic
+                        )
+                    finally:
+                        # COPY 直接在 DBAPI 连接上提交，结束会话的事务以便归还连接
+                        db.rollback()
+                else:
+                    result = LoadResult()
+                    chunk_count = (len(frame) + batch_size - 1) // batch_size
+                    try:
+                        for chunk_no, start in enumerate(range(0, len(frame), batch_size), start=1):
+                            chunk_result = DatabaseLoader._load_chunk(
+                                db, model, frame.iloc[start:start + batch_size], conflict_policy
+                            )
+                            if not atomic:
+                                db.commit()
+                            logger.debug(f"Chunk {chunk_no}/{chunk_count} for {description}: {chunk_result}")
+                            result += chunk_result
+                        db.commit()
+                    except Exception:
+                        db.rollback()
+                        raise
         except Exception as e:
-            db.rollback()
-            logger.error(f"Failed to save daily data for stock {symbol} to database: {e}")
-            raise DataSaveError(f"Failed to save daily data for stock {symbol} to database: {e}")
\ No newline at end of file
+            logger.error(f"Failed to save daily data for {description} to database: {e}")
+            raise DataSaveError(f"Failed to save daily data for {description} to database: {e}")
+
+        # 写入的代码和日期区间对应的读取缓存失效
+        DataReader.invalidate(model, frame)
+        for action in ("inserted", "updated", "skipped"):
+            ROWS_WRITTEN.inc(getattr(result, action), table=model.__tablename__, action=action)
+        logger.info(f"Saved daily data for {description}: {result}.")
+        return result
+
+    @staticmethod
+    def load_stock_daily_data(stock_data: pd.DataFrame, symbol: str, conflict_policy=CONFLICT_UPDATE) -> LoadResult:
+        """加载股票日线数据到数据库，分批写入并按策略处理主键冲突"""
+        logger.info(f"Loading daily data for stock {symbol} to database...")
+        frame = DatabaseLoader.prepare_frame(StockDailyData, stock_data, symbol=symbol)
+        return DatabaseLoader.load_dataframe(StockDailyData, frame, f"stock {symbol}", conflict_policy)
+
+    @staticmethod
+    def load_index_daily_data(index_data: pd.DataFrame, symbol: str, name: str,
+                              conflict_policy=CONFLICT_UPDATE) -> LoadResult:
+        """加载指数日线数据到数据库"""
+        logger.info(f"Loading daily data for index {symbol} to database...")
+        frame = DatabaseLoader.prepare_frame(IndexDailyData, index_data, symbol=symbol, name=name)
+        return DatabaseLoader.load_dataframe(IndexDailyData, frame, f"index {symbol}", conflict_policy)
+
+    @staticmethod
+    def load_concept_board_daily_data(concept_data: pd.DataFrame, concept_name: str, concept_code: str,
+                                      conflict_policy=CONFLICT_UPDATE) -> LoadResult:
+        """加载概念板块日线数据到数据库"""
+        logger.info(f"Loading daily data for concept board {concept_name} to database...")
+        frame = DatabaseLoader.prepare_frame(
+            ConceptBoardData, concept_data, concept_name=concept_name, concept_code=concept_code
+        )
+        return DatabaseLoader.load_dataframe(ConceptBoardData, frame, f"concept board {concept_name}", conflict_policy)
\ No newline at end of file
@@ -0,0 +1,47 @@
+# src/data_ingestion/loaders/load_result.py
+"""
+数据加载结果统计与主键冲突处理策略
+"""
+
+from dataclasses import dataclass
+
+# 主键冲突处理策略：跳过已存在的记录、更新已存在的记录、报错
+CONFLICT_SKIP = "skip"
+CONFLICT_UPDATE = "update"
+CONFLICT_ERROR = "error"
+CONFLICT_POLICIES = (CONFLICT_SKIP, CONFLICT_UPDATE, CONFLICT_ERROR)
+
+
+def validate_conflict_policy(policy: str) -> str:
+    """
+    校验冲突处理策略
+    """
+    if policy not in CONFLICT_POLICIES:
+        raise ValueError(f"Unknown conflict policy '{policy}', expected one of {CONFLICT_POLICIES}")
+    return policy
+
+
+@dataclass
+class LoadResult:
+    """
+    数据加载结果：新增、更新和跳过的行数
+    """
+    inserted: int = 0
+    updated: int = 0
+    skipped: int = 0
+
+    def __iadd__(self, other: "LoadResult") -> "LoadResult":
+        self.inserted += other.inserted
+        self.updated += other.updated
+        self.skipped += other.skipped
+        return self
+
+    @property
+    def written(self) -> int:
+        """
+        实际写入（新增和更新）的行数
+        """
+        return self.inserted + self.updated
+
+    def __str__(self):
+        return f"inserted {self.inserted}, updated {self.updated}, skipped {self.skipped}"
@@ -0,0 +1,158 @@
+# src/data_ingestion/loaders/parquet_loader.py
+"""
+Parquet 数据湖加载器
+"""
+
+import os
+import threading
+import uuid
+from datetime import datetime
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.core.config import config
+from src.core.exceptions import DataSaveError
+from src.core.logger import logger
+from src.core.metrics import LAKE_ROWS_WRITTEN
+from src.data_ingestion.loaders.database_loader import DatabaseLoader
+from src.database.models.stock import StockDailyData
+from src.database.models.index import IndexDailyData
+from src.database.models.concept import ConceptBoardData
+
+
+class ParquetLoader:
+    """
+    Parquet 数据湖加载器
+
+    与 DatabaseLoader 并列的第二个写入目标，将转换后的数据按 Hive 分区
+    (dataset=<数据集>/year=<年份>/) 追加写入 Parquet 文件，代码列使用字典编码；
+    每次写入生成新的小文件，由 compact 定期合并
+    """
+
+    # 数据集名称: (模型, 代码列)
+    DATASETS = {
+        "stock": (StockDailyData, "symbol"),
+        "index": (IndexDailyData, "symbol"),
+        "concept": (ConceptBoardData, "concept_code"),
+    }
+
+    def __init__(self, root=config.DATA_LAKE_PATH):
+        """
+        初始化数据湖加载器
+        """
+        self.root = root
+        self._partition_locks = {}
+        self._locks_lock = threading.Lock()
+
+    def dataset_path(self, dataset: str) -> str:
+        """
+        数据集目录
+        """
+        return os.path.join(self.root, f"dataset={dataset}")
+
+    def _partition_lock(self, path: str) -> threading.Lock:
+        """
+        获取分区目录的锁，避免合并与追加写入同时进行
+        """
+        with self._locks_lock:
+            return self._partition_locks.setdefault(path, threading.Lock())
+
+    @staticmethod
+    def _to_table(frame: pd.DataFrame, key_column: str) -> pa.Table:
+        """
+        转换为 Arrow 表，代码列使用字典编码
+        """
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        index = table.schema.get_field_index(key_column)
+        return table.set_column(index, key_column, table.column(key_column).dictionary_encode())
+
+    def write_frame(self, dataset: str, frame: pd.DataFrame) -> int:
+        """
+        将已按模型列整理好的数据按年份分区追加写入，返回写入行数
+        """
+        if frame.empty:
+            return 0
+        _, key_column = self.DATASETS[dataset]
+        years = pd.to_datetime(frame["date"]).dt.year
+        stamp = datetime.now().strftime("%Y%m%d%H%M%S")
+
+        for year, part in frame.groupby(years.values):
+            partition = os.path.join(self.dataset_path(dataset), f"year={year}")
+            os.makedirs(partition, exist_ok=True)
+            file_path = os.path.join(partition, f"part-{stamp}-{uuid.uuid4().hex[:8]}.parquet")
+            with self._partition_lock(partition):
+                pq.write_table(self._to_table(part, key_column), file_path, compression="zstd")
+        LAKE_ROWS_WRITTEN.inc(len(frame), dataset=dataset)
+        return len(frame)
+
+    def _load(self, dataset: str, data: pd.DataFrame, description: str, **key_values) -> int:
+        """
+        整理并写入一个代码的数据
+        """
+        model, _ = self.DATASETS[dataset]
+        try:
+            frame = DatabaseLoader.prepare_frame(model, data, **key_values)
+            written = self.write_frame(dataset, frame)
+            logger.info(f"Wrote {written} rows for {description} to data lake.")
+            return written
+        except Exception as e:
+            logger.error(f"Failed to save daily data for {description} to data lake: {e}")
+            raise DataSaveError(f"Failed to save daily data for {description} to data lake: {e}")
+
+    def load_stock_daily_data(self, stock_data: pd.DataFrame, symbol: str) -> int:
+        """写入股票日线数据"""
+        return self._load("stock", stock_data, f"stock {symbol}", symbol=symbol)
+
+    def load_index_daily_data(self, index_data: pd.DataFrame, symbol: str, name: str) -> int:
+        """写入指数日线数据"""
+        return self._load("index", index_data, f"index {symbol}", symbol=symbol, name=name)
+
+    def load_concept_board_daily_data(self, concept_data: pd.DataFrame, concept_name: str, concept_code: str) -> int:
+        """写入概念板块日线数据"""
+        return self._load(
+            "concept", concept_data, f"concept board {concept_name}",
+            concept_name=concept_name, concept_code=concept_code
+        )
+
+    def compact(self, dataset: str, min_files=config.DATA_LAKE_COMPACT_MIN_FILES):
+        """
+        合并数据集中小文件过多的分区
+
+        按文件写入顺序合并，主键重复时保留最后写入的记录，合并后按 (代码, 日期) 排序
+        """
+        model, key_column = self.DATASETS[dataset]
+        pk_columns = [col.name for col in model.__table__.primary_key.columns]
+        dataset_path = self.dataset_path(dataset)
+        if not os.path.isdir(dataset_path):
+            return
+
+        for name in sorted(os.listdir(dataset_path)):
+            partition = os.path.join(dataset_path, name)
+            with self._partition_lock(partition):
+                files = sorted(
+                    (os.path.join(partition, f) for f in os.listdir(partition) if f.endswith(".parquet")),
+                    key=os.path.getmtime
+                )
+                if len(files) < min_files:
+                    continue
+
+                frame = pd.concat([pq.ParquetFile(f).read().to_pandas() for f in files], ignore_index=True)
+                frame = frame.drop_duplicates(subset=pk_columns, keep="last")
+                frame[key_column] = frame[key_column].astype(str)
+                frame = frame.sort_values(pk_columns)
+                stamp = datetime.now().strftime("%Y%m%d%H%M%S")
+                tmp_path = os.path.join(partition, f".compacted-{stamp}.tmp")
+                pq.write_table(self._to_table(frame, key_column), tmp_path, compression="zstd")
+                # 先发布合并后的文件再删除旧文件，中途失败最多留下可被下次合并去重的重复数据
+                os.replace(tmp_path, os.path.join(partition, f"compacted-{stamp}-{uuid.uuid4().hex[:8]}.parquet"))
+                for f in files:
+                    os.remove(f)
+                logger.info(f"Compacted {len(files)} files into one ({len(frame)} rows) in {partition}.")
+
+    def read_dataset(self, dataset: str, columns=None, filters=None) -> pd.DataFrame:
+        """
+        读取数据集，filters 使用 pyarrow 的谓词下推格式，例如 [("year", ">=", 2020), ("symbol", "=", "sh600000")]
+        """
+        return pd.read_parquet(self.dataset_path(dataset), columns=columns, filters=filters)
@@ -0,0 +1,158 @@
+# src/data_ingestion/loaders/postgres_copy_loader.py
+"""
+基于 COPY 的 PostgreSQL 批量加载器
+"""
+
+import io
+
+import pandas as pd
+
+from src.core.config import config
+from src.core.logger import logger
+from src.database.partitioning import DailyPartitioning
+from src.data_ingestion.loaders.load_result import (
+    LoadResult, CONFLICT_UPDATE, CONFLICT_ERROR, validate_conflict_policy
+)
+
+
+class PostgresCopyLoader:
+    """
+    PostgreSQL 批量加载器
+
+    将 DataFrame 通过 COPY FROM STDIN 写入临时暂存表，再用 INSERT ... ON CONFLICT 合并到目标表
+    """
+
+    @staticmethod
+    def _staging_table_name(table_name: str) -> str:
+        """
+        暂存表名称
+        """
+        return f"_stage_{table_name}"
+
+    @staticmethod
+    def _build_merge_sql(table, columns: list, quote, conflict_policy: str, system_columns=True) -> str:
+        """
+        构造从暂存表合并到目标表的 SQL
+
+        update/skip 策略按主键去重后执行 ON CONFLICT，并通过 RETURNING (xmax = 0) 区分新增和更新；
+        update 策略只改写值有变化的行（IS DISTINCT FROM），未变化的行不返回，计为跳过；
+        error 策略直接插入，主键冲突时由数据库报错。
+        分区表不能返回系统列，system_columns 为 False 时只返回 true，更新行数由 _build_existing_count_sql 单独统计
+        """
+        pk_columns = [col.name for col in table.primary_key.columns]
+        update_columns = [col for col in columns if col not in pk_columns]
+        column_sql = ", ".join(quote(col) for col in columns)
+        pk_sql = ", ".join(quote(col) for col in pk_columns)
+        staging = quote(PostgresCopyLoader._staging_table_name(table.name))
+        insert_sql = f"INSERT INTO {quote(table.name)} ({column_sql}) "
+
+        if conflict_policy == CONFLICT_ERROR:
+            return f"{insert_sql}SELECT {column_sql} FROM {staging} RETURNING true"
+
+        if conflict_policy == CONFLICT_UPDATE and update_columns:
+            update_sql = ", ".join(f"{quote(col)} = EXCLUDED.{quote(col)}" for col in update_columns)
+            current_sql = ", ".join(f"{quote(table.name)}.{quote(col)}" for col in update_columns)
+            excluded_sql = ", ".join(f"EXCLUDED.{quote(col)}" for col in update_columns)
+            conflict_sql = (f"ON CONFLICT ({pk_sql}) DO UPDATE SET {update_sql} "
+                            f"WHERE ROW({current_sql}) IS DISTINCT FROM ROW({excluded_sql})")
+        else:
+            conflict_sql = f"ON CONFLICT ({pk_sql}) DO NOTHING"
+
+        # 同一批次内主键重复时 ON CONFLICT DO UPDATE 会报错，先用 DISTINCT ON 去重
+        return (
+            f"{insert_sql}"
+            f"SELECT DISTINCT ON ({pk_sql}) {column_sql} FROM {staging} "
+            f"{conflict_sql} RETURNING {'(xmax = 0)' if system_columns else 'true'}"
+        )
+
+    @staticmethod
+    def _build_existing_count_sql(table, columns: list, quote) -> str:
+        """
+        构造统计暂存表中有多少主键已存在于目标表、且值与目标表不同（合并时会被更新）的 SQL
+        """
+        pk_columns = [col.name for col in table.primary_key.columns]
+        update_columns = [col for col in columns if col not in pk_columns]
+        pk_sql = ", ".join(quote(col) for col in pk_columns)
+        staging = quote(PostgresCopyLoader._staging_table_name(table.name))
+        target = quote(table.name)
+        changed_sql = ""
+        if update_columns:
+            current_sql = ", ".join(f"{target}.{quote(col)}" for col in update_columns)
+            staged_sql = ", ".join(f"staged.{quote(col)}" for col in update_columns)
+            changed_sql = f" WHERE ROW({current_sql}) IS DISTINCT FROM ROW({staged_sql})"
+        return (f"SELECT count(*) FROM {target} "
+                f"JOIN (SELECT DISTINCT ON ({pk_sql}) * FROM {staging}) AS staged USING ({pk_sql}){changed_sql}")
+
+    @staticmethod
+    def copy_upsert(engine, model, frame: pd.DataFrame, conflict_policy=CONFLICT_UPDATE,
+                    batch_size=config.DATA_LOAD_BATCH_SIZE, connection=None, atomic=False) -> LoadResult:
+        """
+        将已按目标表列名整理好的 DataFrame 分批写入模型对应的表，返回新增/更新/跳过的行数
+
+        每个批次在独立事务中完成 COPY 和合并，暂存表在事务提交时清空；
+        某个批次失败时只回滚该批次，之前已提交的批次保留；atomic 为 True 时全部批次在同一个事务中完成，失败时整体回滚。
+        connection 为调用方持有的 DBAPI 连接（由调用方归还），未提供时从连接池取用一个
+        """
+        validate_conflict_policy(conflict_policy)
+        table = model.__table__
+        columns = [col.name for col in table.columns if col.name in frame.columns]
+        quote = engine.dialect.identifier_preparer.quote
+        staging = quote(PostgresCopyLoader._staging_table_name(table.name))
+        copy_sql = f"COPY {staging} ({', '.join(quote(col) for col in columns)}) FROM STDIN WITH (FORMAT csv)"
+        # 分区表不能通过 xmax 区分新增和更新，update 策略下合并前先统计将被更新的行数
+        partitioned = DailyPartitioning.partitioned_in_database(engine, table.name)
+        count_existing = partitioned and conflict_policy == CONFLICT_UPDATE
+        merge_sql = PostgresCopyLoader._build_merge_sql(
+            table, columns, quote, conflict_policy, system_columns=not partitioned
+        )
+        existing_sql = PostgresCopyLoader._build_existing_count_sql(table, columns, quote)
+
+        result = LoadResult()
+        chunk_count = (len(frame) + batch_size - 1) // batch_size
+        owns_connection = connection is None
+        if owns_connection:
+            connection = engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            try:
+                for chunk_no, start in enumerate(range(0, len(frame), batch_size), start=1):
+                    chunk = frame.iloc[start:start + batch_size]
+                    cursor.execute(
+                        f"CREATE TEMP TABLE IF NOT EXISTS {staging} "
+                        f"(LIKE {quote(table.name)} INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+                    )
+                    buffer = io.StringIO()
+                    chunk[columns].to_csv(buffer, index=False, header=False)
+                    buffer.seek(0)
+                    cursor.copy_expert(copy_sql, buffer)
+                    existing = None
+                    if count_existing:
+                        cursor.execute(existing_sql)
+                        existing = cursor.fetchone()[0]
+                    cursor.execute(merge_sql)
+                    flags = [row[0] for row in cursor.fetchall()]
+                    if atomic:
+                        # 不提交时暂存表不会自动清空
+                        cursor.execute(f"TRUNCATE {staging}")
+                    else:
+                        connection.commit()
+
+                    if existing is None:
+                        inserted = sum(1 for flag in flags if flag)
+                        updated = len(flags) - inserted
+                    else:
+                        updated = existing
+                        inserted = len(flags) - existing
+                    chunk_result = LoadResult(inserted, updated, len(chunk) - inserted - updated)
+                    logger.debug(f"Chunk {chunk_no}/{chunk_count} for {table.name}: {chunk_result}")
+                    result += chunk_result
+                connection.commit()
+            except Exception:
+                connection.rollback()
+                raise
+            cursor.close()
+        finally:
+            if owns_connection:
+                connection.close()
+
+        return result
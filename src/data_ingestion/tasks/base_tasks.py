@@ -0,0 +1,139 @@
+# src/data_ingestion/tasks/base_tasks.py
+"""
+数据任务基类
+"""
+
+import pandas as pd
+
+from src.core.config import config
+from src.core.logger import logger
+from src.database.session import worker_session
+from src.data_ingestion.tasks.pipeline import IngestPipeline
+from src.data_ingestion.tasks.progress_journal import ProgressJournal
+from src.data_ingestion.tasks.trading_calendar import get_trading_calendar
+from src.data_ingestion.tasks.work_leases import WorkLeaseManager
+from src.utils.date_utils import is_range_empty
+
+
+class BaseTasks:
+    """
+    数据任务基类，通过流式管道处理每个代码的获取、转换和加载
+
+    子类需要设置 loader、lake_loader 和 conflict_policy
+    """
+
+    def _run_pipeline(self, name: str, items, fetch, transform, load, describe=str, key=lambda item: item[0]):
+        """
+        使用 获取 → 转换 → 加载 管道处理全部代码，返回 (成功数, 失败数)
+
+        启用进度日志时跳过本次运行（config.RUN_ID）中已完成的代码，并记录每个代码的处理结果；
+        启用租约时代码切分为工作单元，本副本只处理领取到的单元；单元中有本副本代码列表之外的代码时
+        （各副本的列表不一致），处理其余代码后释放该单元，由其它副本处理，本副本不再领取。
+        请求频率由 fetcher 中按数据源共享的令牌桶控制，而不是固定等待
+        """
+        items = list(items)
+        journal = None
+        if config.PROGRESS_JOURNAL_ENABLED:
+            ProgressJournal.purge()
+            journal = ProgressJournal(name)
+
+        stages = (fetch, transform, load, describe, key)
+        if not config.WORK_LEASE_ENABLED:
+            return self._run_passes(name, items, stages, journal)
+
+        WorkLeaseManager.purge()
+        leases = WorkLeaseManager(name)
+        leases.plan([str(key(item)) for item in items])
+        items_by_key = {str(key(item)): item for item in items}
+        succeeded, failed = 0, 0
+        released = set()
+        while True:
+            claimed = leases.claim(exclude=released)
+            if claimed is None:
+                break
+            unit_id, unit_keys = claimed
+            logger.info(f"{name}: 副本 {leases.owner} 领取工作单元 {unit_id} ({len(unit_keys)} 个代码)")
+            unknown = [unit_key for unit_key in unit_keys if unit_key not in items_by_key]
+            if unknown:
+                logger.warning(f"{name}: 工作单元 {unit_id} 中 {len(unknown)} 个代码不在本副本的列表中，"
+                               f"处理其余代码后释放该单元: " + ", ".join(unknown[:50])
+                               + (" ..." if len(unknown) > 50 else ""))
+                released.add(unit_id)
+            with leases.hold(unit_id, complete=not unknown):
+                unit_items = [items_by_key[unit_key] for unit_key in unit_keys if unit_key in items_by_key]
+                unit_succeeded, unit_failed = self._run_passes(name, unit_items, stages, journal)
+            succeeded += unit_succeeded
+            failed += unit_failed
+        return succeeded, failed
+
+    @staticmethod
+    def _run_passes(name: str, items: list, stages: tuple, journal):
+        """
+        处理一组代码：跳过已完成的代码，主流程结束后对失败的代码重跑 FAILED_RERUN_PASSES 轮，
+        仍失败的代码汇总记录在日志中
+        """
+        fetch, transform, load, describe, key = stages
+        if journal:
+            completed = journal.completed()
+            remaining = [item for item in items if str(key(item)) not in completed]
+            if len(remaining) < len(items):
+                logger.info(f"{name}: 跳过运行 {journal.run_id} 中已完成的 {len(items) - len(remaining)} 个代码")
+            items = remaining
+
+        succeeded, failed = 0, 0
+        for attempt in range(config.FAILED_RERUN_PASSES + 1):
+            if not items:
+                break
+            if attempt > 0:
+                logger.info(f"{name}: 第 {attempt} 轮重跑 {len(items)} 个失败的代码")
+            pipeline = IngestPipeline(
+                name, fetch, transform, load, describe,
+                on_success=(lambda done: journal.mark_done([key(item) for item in done])) if journal else None,
+                on_failure=(lambda item, error: journal.mark_failed(key(item), error)) if journal else None,
+                load_context=worker_session,
+            )
+            passed, _ = pipeline.run(items)
+            succeeded += passed
+            failed = len(pipeline.failed_items)
+            items = pipeline.failed_items
+
+        if items:
+            logger.warning(f"{name}: {len(items)} 个代码最终处理失败: "
+                           + ", ".join(describe(item) for item in items[:50])
+                           + (" ..." if len(items) > 50 else ""))
+        return succeeded, failed
+
+    @staticmethod
+    def _fetch_window(start_date: str, end_date: str):
+        """
+        计算一个代码的下载区间 (开始日期, 结束日期)，区间为空时返回 None
+
+        启用交易日历时裁剪到交易日，结束日期不晚于最近一个已收盘的交易日，
+        周末、节假日和盘中运行不会请求尚未产生的数据
+        """
+        if config.TRADING_CALENDAR_ENABLED:
+            return get_trading_calendar().fetch_window(start_date, end_date)
+        return None if is_range_empty(start_date, end_date) else (start_date, end_date)
+
+    @staticmethod
+    def _no_new_session(name: str, latest_dates: dict, keys) -> bool:
+        """
+        增量模式下代码列表中的每个代码都已存储最近一个已收盘交易日时返回 True，任务可以直接结束
+        """
+        if not (config.TRADING_CALENDAR_ENABLED and config.INCREMENTAL_MODE):
+            return False
+        calendar = get_trading_calendar()
+        if calendar.has_new_session(latest_dates, keys):
+            return False
+        logger.info(f"{name}: 全部代码已存储最近的已收盘交易日 {calendar.last_closed_session()}，跳过本次运行")
+        return True
+
+    def _load_batch(self, model, dataset: str, frame: pd.DataFrame, description: str):
+        """
+        将合并后的多代码批次写入数据库，启用数据湖时同时写入 Parquet
+
+        批次在一个事务中写入，失败时整体回滚：管道随后逐个代码重试，error 策略下不会因部分代码已写入而误报失败
+        """
+        self.loader.load_dataframe(model, frame, description, self.conflict_policy, atomic=True)
+        if self.lake_loader:
+            self.lake_loader.write_frame(dataset, frame)
@@ -3,19 +3,33 @@
 概念板块数据任务
 """
 
-import time
+import numpy as np
 import pandas as pd
-from datetime import datetime
+from datetime import date, datetime, timedelta
 
 from src.data_ingestion.fetchers.akshare_fetcher import AkShareFetcher
 from src.data_ingestion.transformers.concept_transformer import ConceptTransformer
+from src.data_ingestion.transformers.concept_aggregator import ConceptAggregator
 from src.data_ingestion.loaders.database_loader import DatabaseLoader
+from src.data_ingestion.loaders.parquet_loader import ParquetLoader
+from src.data_ingestion.loaders.load_result import CONFLICT_UPDATE
+from src.data_ingestion.tasks.base_tasks import BaseTasks
+from src.database.adjustment import PriceAdjuster, ADJUST_HFQ
+from src.database.data_reader import DataReader
+from src.database.models.adj_factor import StockAdjFactor
+from src.database.models.concept import ConceptBoardData, ConceptConstituent
+from src.database.models.stock import StockDailyData
 from src.core.config import config
 from src.core.logger import logger
+from src.core.metrics import health
 from src.utils.file_utils import check_file_validity
+from src.utils.date_utils import next_start_date
 
+# 计算区间第一天的涨跌幅时向前多读取的天数（覆盖长假和短期停牌）
+PREVIOUS_CLOSE_LOOKBACK_DAYS = 30
 
-class ConceptTasks:
+
+class ConceptTasks(BaseTasks):
     """
     概念板块数据任务
     """
@@ -27,11 +41,17 @@ class ConceptTasks:
         self.fetcher = AkShareFetcher()
         self.transformer = ConceptTransformer()
         self.loader = DatabaseLoader()
+        self.lake_loader = ParquetLoader() if config.PARQUET_SINK_ENABLED else None
+        self.conflict_policy = config.CONCEPT_CONFLICT_POLICY
+        self._constituents_refreshed_at = None
 
     def download_and_save_concept_data(self):
         """
         下载并保存概念板块数据
         """
+        # 增量模式下查询每个概念板块已存储的最后日期
+        latest_dates = self.loader.get_latest_concept_dates() if config.INCREMENTAL_MODE else {}
+
         # 下载概念板块
         # 1. 获取并保存概念板块列表
         today_str = datetime.now().strftime("%Y-%m-%d")  # 获取当前日期并格式化为 YYYY-MM-DD
@@ -45,25 +65,168 @@ class ConceptTasks:
             #  这里可以不用saver了，直接保存到本地
             concept_list.to_csv(concept_board_file, index=False)
 
-        # 2. 获取并保存每个概念板块的历史数据
+        # 每个板块都已存储最近的交易日时不再下载，
+        # 但仍计算股票日线在上次运行之后才写入的日期的涨跌家数和总市值
+        if self._no_new_session("concept", latest_dates, concept_list['板块代码']):
+            if config.CONCEPT_AGGREGATION_ENABLED:
+                self.aggregate_concept_breadth()
+            return
+
+        # 2. 下载区间的结束日期（启用交易日历时裁剪到最近已收盘的交易日）
+        end_date = datetime.today().strftime("%Y%m%d")
+
+        # 3. 计算每个概念板块需要下载的区间，已是最新的板块直接跳过
+        work_items = []
         for _, row in concept_list.iterrows():
             board_name = row['板块名称']
             board_code = row['板块代码']
+            window = self._fetch_window(
+                next_start_date(latest_dates.get(board_code), config.CONCEPT_DATA_START_DATE), end_date
+            )
+            if window is None:
+                logger.debug(f"概念板块 {board_name} 数据已是最新，跳过")
+                continue
+            work_items.append((board_name, board_code, *window))
 
-            try:
-                hist_data = self.fetcher.fetch_concept_board_daily_data(board_name, adjust='hfq')
+        # 4. 流式获取、转换每个概念板块的历史数据，并合并成多板块批次保存
+        self._run_pipeline(
+            "concept", work_items, self._fetch_concept, self._transform_concept, self._load_concepts,
+            describe=lambda item: f"概念板块 {item[0]}", key=lambda item: item[1],
+        )
 
-                transformed_data = self.transformer.transform_concept_daily_data(hist_data)
-                self.loader.load_concept_board_daily_data(transformed_data, board_name, board_code)
+        # 5. 刷新成分股，根据成分股和股票日线计算新日期的涨跌家数和总市值
+        if config.CONCEPT_AGGREGATION_ENABLED:
+            self.refresh_constituents(concept_list)
+            self.aggregate_concept_breadth()
 
-                logger.info(f"概念板块 {board_name} 日数据下载并保存完成")
-                time.sleep(0.5)  # 避免请求过快
-            except Exception as e:
-                logger.error(f"Error processing board {board_name}: {e}")
-                continue
+        # 合并数据湖中的小文件
+        if self.lake_loader:
+            self.lake_loader.compact("concept")
 
         logger.info("概念板块数据下载任务完成")
 
+    def refresh_constituents(self, concept_list: pd.DataFrame):
+        """
+        刷新成分股：没有成分股或成分股超过 CONCEPT_CONSTITUENT_REFRESH_DAYS 天未刷新的板块重新下载，
+        已被调出板块的股票在保存时删除
+        """
+        refreshed_at = self.loader.get_constituent_refresh_times()
+        threshold = datetime.now() - timedelta(days=config.CONCEPT_CONSTITUENT_REFRESH_DAYS)
+        work_items = [(row['板块名称'], row['板块代码']) for _, row in concept_list.iterrows()
+                      if refreshed_at.get(row['板块代码']) is None or refreshed_at[row['板块代码']] < threshold]
+        logger.info(f"刷新 {len(work_items)} 个概念板块的成分股")
+        self._constituents_refreshed_at = datetime.now()
+        self._run_pipeline(
+            "concept_constituent", work_items, self._fetch_constituents, self._transform_constituents,
+            self._load_constituents, describe=lambda item: f"概念板块 {item[0]} 成分股", key=lambda item: item[1],
+        )
+
+    def aggregate_concept_breadth(self):
+        """
+        计算概念板块的上涨家数、下跌家数和总市值，只处理尚未计算的日期（不超过股票日线的最后日期）
+
+        使用当前的成分股计算，已计算的历史日期不随成分股调整而重算；
+        总市值为成分股 收盘价 × 流通股本 之和，股票日线按复权价格存储（STOCK_STORE_ADJUST 不为空）时无法计算，保持为空
+        """
+        start_date, end_date = self.loader.get_concept_aggregation_window()
+        if start_date is None:
+            logger.info("概念板块涨跌家数和总市值已是最新")
+            return
+        constituents = self.loader.get_concept_constituents()
+        if constituents.empty:
+            logger.warning("没有概念板块成分股，跳过涨跌家数和总市值的计算")
+            return
+
+        factors = None
+        if not config.STOCK_STORE_ADJUST:
+            factors = DataReader.read_range(StockAdjFactor, columns=["hfq_factor"], use_cache=False)
+        # 按年份分段计算，内存占用与一年的全市场日线成正比
+        for year in range(start_date.year, end_date.year + 1):
+            health.touch()
+            self._aggregate_window(
+                max(start_date, date(year, 1, 1)), min(end_date, date(year, 12, 31)), constituents, factors
+            )
+        logger.info(f"概念板块涨跌家数和总市值计算完成: {start_date} ~ {end_date}")
+
+    def _aggregate_window(self, start_date, end_date, constituents: pd.DataFrame, factors):
+        """
+        计算一个日期区间内全部板块的涨跌家数和总市值并更新到概念板块日线
+        """
+        boards = DataReader.read_range(ConceptBoardData, None, start_date, end_date, ["concept_name"], use_cache=False)
+        if boards.empty:
+            return
+        bars = DataReader.read_range(
+            StockDailyData, None, start_date - timedelta(days=PREVIOUS_CLOSE_LOOKBACK_DAYS), end_date,
+            ["close", "outstanding_share"], use_cache=False,
+        )
+        if factors is not None:
+            # 用后复权收盘价计算涨跌，除权日不会被计为下跌
+            adjusted = PriceAdjuster.adjust(bars, factors, ADJUST_HFQ, price_columns=("close",))["close"]
+            stock_days = ConceptAggregator.stock_changes(bars, adjusted)
+            stock_days["market_value"] = bars["close"] * bars["outstanding_share"]
+        else:
+            stock_days = ConceptAggregator.stock_changes(bars)
+            stock_days["market_value"] = np.nan
+        stock_days = stock_days[stock_days["date"] >= pd.Timestamp(start_date)]
+
+        aggregated = ConceptAggregator.aggregate(stock_days, constituents)
+        frame = boards.astype({"concept_code": object}).merge(aggregated, on=["concept_code", "date"], how="left")
+        frame[["up_count", "down_count"]] = frame[["up_count", "down_count"]].fillna(0)
+        frame = self.loader.prepare_frame(ConceptBoardData, frame)
+        self.loader.load_dataframe(
+            ConceptBoardData, frame, f"concept breadth {start_date} ~ {end_date}", CONFLICT_UPDATE
+        )
+
+    def _fetch_constituents(self, item):
+        """
+        下载单个概念板块的成分股
+        """
+        return self.fetcher.fetch_concept_constituents(item[0])
+
+    def _transform_constituents(self, item, constituents):
+        """
+        转换单个概念板块的成分股并按模型整理
+        """
+        board_name, board_code = item
+        return self.loader.prepare_frame(
+            ConceptConstituent, self.transformer.transform_concept_constituents(constituents),
+            concept_code=board_code, concept_name=board_name, updated_at=self._constituents_refreshed_at,
+        )
+
+    def _load_constituents(self, frame, items):
+        """
+        保存合并后的多个板块成分股，并删除这些板块中本次未出现的股票
+        """
+        self.loader.load_dataframe(ConceptConstituent, frame, f"{len(items)} concept constituents", CONFLICT_UPDATE)
+        deleted = self.loader.delete_stale_constituents([item[1] for item in items], self._constituents_refreshed_at)
+        if deleted:
+            logger.info(f"删除 {deleted} 个已调出概念板块的成分股")
+
+    def _fetch_concept(self, item):
+        """
+        下载单个概念板块的历史数据
+        """
+        board_name, _, start_date, end_date = item
+        return self.fetcher.fetch_concept_board_daily_data(
+            board_name, adjust='hfq', start_date=start_date, end_date=end_date
+        )
+
+    def _transform_concept(self, item, hist_data):
+        """
+        转换单个概念板块的历史数据并按模型整理
+        """
+        board_name, board_code = item[0], item[1]
+        transformed_data = self.transformer.transform_concept_daily_data(hist_data)
+        return self.loader.prepare_frame(
+            ConceptBoardData, transformed_data, concept_name=board_name, concept_code=board_code
+        )
+
+    def _load_concepts(self, frame, items):
+        """
+        保存合并后的多个概念板块历史数据
+        """
+        self._load_batch(ConceptBoardData, "concept", frame, f"{len(items)} concept boards")
+
 
 # 示例用法
 if __name__ == '__main__':
@@ -8,12 +8,16 @@ from datetime import datetime
 from src.data_ingestion.fetchers.akshare_fetcher import AkShareFetcher
 from src.data_ingestion.transformers.index_transformer import IndexTransformer
 from src.data_ingestion.loaders.database_loader import DatabaseLoader
+from src.data_ingestion.loaders.parquet_loader import ParquetLoader
+from src.data_ingestion.tasks.base_tasks import BaseTasks
+from src.database.models.index import IndexDailyData
 from src.core.config import config
 from src.core.logger import logger
 from src.utils.file_utils import check_file_validity
+from src.utils.date_utils import next_start_date
 
 
-class IndexTasks:
+class IndexTasks(BaseTasks):
     """
     指数数据任务
     """
@@ -25,6 +29,8 @@ class IndexTasks:
         self.fetcher = AkShareFetcher()
         self.transformer = IndexTransformer()
         self.loader = DatabaseLoader()
+        self.lake_loader = ParquetLoader() if config.PARQUET_SINK_ENABLED else None
+        self.conflict_policy = config.INDEX_CONFLICT_POLICY
 
     def format_index_code(self, symbol):
         """确保指数代码为6位数字格式"""
@@ -34,6 +40,9 @@ class IndexTasks:
         """
         下载并保存指数数据
         """
+        # 增量模式下查询每个指数已存储的最后日期
+        latest_dates = self.loader.get_latest_index_dates() if config.INCREMENTAL_MODE else {}
+
         # 获取指数列表
         if check_file_validity(config.CACHE_PATH + "/index_list.csv", config.MAX_CSV_AGE_DAYS):
             logger.info("从缓存读取指数列表")
@@ -44,31 +53,62 @@ class IndexTasks:
             #  这里可以不用saver了，直接保存到本地
             index_list.to_csv(config.CACHE_PATH + "/index_list.csv", index=False)
 
-        # 下载指数日数据并保存到数据库
+        # 列表中每个指数都已存储最近的交易日时直接结束
+        if self._no_new_session("index", latest_dates, index_list["代码"].map(self.format_index_code)):
+            return
+
+        end_date = datetime.today().strftime("%Y%m%d")
+
+        # 计算每个指数需要下载的区间，已是最新的指数直接跳过
+        work_items = []
         for _, row in index_list.iterrows():
             symbol = row["代码"]
             name = row["名称"]
             formatted_symbol = self.format_index_code(symbol)
-            try:
-                index_data = self.fetcher.fetch_index_daily_data(
-                    formatted_symbol,
-                    config.AKSHARE_DATA_START_DATE,
-                    datetime.today().strftime("%Y%m%d")
-                )
-                if index_data is None:
-                    logger.warning(f"未能获取到指数 {formatted_symbol}({name}) 的数据")
-                    continue
-
-                transformed_data = self.transformer.transform_index_daily_data(index_data)
-                self.loader.load_index_daily_data(transformed_data, formatted_symbol, name)
-
-                logger.info(f"指数 {formatted_symbol}({name}) 日数据下载并保存完成")
-            except Exception as e:
-                logger.error(f"处理指数 {formatted_symbol}({name}) 时出错: {e}")
+            window = self._fetch_window(
+                next_start_date(latest_dates.get(formatted_symbol), config.AKSHARE_DATA_START_DATE), end_date
+            )
+            if window is None:
+                logger.debug(f"指数 {formatted_symbol}({name}) 数据已是最新，跳过")
                 continue
+            work_items.append((formatted_symbol, name, *window))
+
+        # 流式下载、转换指数日数据，并合并成多指数批次保存到数据库
+        self._run_pipeline(
+            "index", work_items, self._fetch_index, self._transform_index, self._load_indexes,
+            describe=lambda item: f"指数 {item[0]}({item[1]})",
+        )
+
+        # 合并数据湖中的小文件
+        if self.lake_loader:
+            self.lake_loader.compact("index")
 
         logger.info("指数数据下载任务完成")
 
+    def _fetch_index(self, item):
+        """
+        下载单个指数的日数据
+        """
+        formatted_symbol, name, start_date, end_date = item
+        index_data = self.fetcher.fetch_index_daily_data(formatted_symbol, start_date, end_date)
+        if index_data is None:
+            logger.warning(f"未能获取到指数 {formatted_symbol}({name}) 的数据")
+        return index_data
+
+    def _transform_index(self, item, index_data):
+        """
+        转换单个指数的日数据并按模型整理
+        """
+        formatted_symbol, name = item[0], item[1]
+        transformed_data = self.transformer.transform_index_daily_data(index_data)
+        return self.loader.prepare_frame(IndexDailyData, transformed_data, symbol=formatted_symbol, name=name)
+
+    def _load_indexes(self, frame, items):
+        """
+        保存合并后的多个指数日数据
+        """
+        self._load_batch(IndexDailyData, "index", frame, f"{len(items)} indexes")
+
 
 # 示例用法
 if __name__ == '__main__':
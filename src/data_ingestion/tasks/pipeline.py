@@ -0,0 +1,286 @@
+# src/data_ingestion/tasks/pipeline.py
+"""
+获取 → 转换 → 加载 流式处理管道
+"""
+
+import contextlib
+import queue
+import threading
+import time
+
+import pandas as pd
+
+from src.core.config import config
+from src.core.logger import logger
+from src.core.metrics import STAGE_SECONDS, ITEMS_PROCESSED, ROWS_LOADED, health
+
+# 通知下游阶段上游已全部结束的哨兵
+_DONE = object()
+
+# 阻塞在队列上的线程检查停止请求的间隔（秒）
+_POLL_INTERVAL = 0.5
+
+
+class IngestPipeline:
+    """
+    分阶段的流式处理管道
+
+    获取、转换、加载三个阶段各自使用独立的线程数，阶段之间通过有界队列连接：
+    下游处理不过来时上游会阻塞在队列上（背压），避免无限制地积压内存。
+    加载阶段把多个代码的数据合并成大批量后一次写入，总耗时趋近于最慢的阶段，而不是三个阶段之和。
+
+    fetch(item) 返回原始数据；transform(item, raw) 返回已按模型整理好的 DataFrame，
+    返回 None 或空 DataFrame 表示没有需要写入的数据；load(frame, items) 写入合并后的批次。
+    on_success(items) 和 on_failure(item, error) 在代码处理完成或失败时回调，失败的代码保存在 failed_items 中。
+    load_context 为可选的上下文管理器工厂，每个加载线程在整个运行期间处于其中（例如复用数据库会话）。
+    run() 因异常（如第二次 SIGTERM 引发的 SystemExit）中断时通知各阶段线程停止，丢弃尚未写入的数据
+    """
+
+    def __init__(self, name: str, fetch, transform, load, describe=str, on_success=None, on_failure=None,
+                 load_context=None,
+                 fetch_workers=config.PIPELINE_FETCH_WORKERS,
+                 transform_workers=config.PIPELINE_TRANSFORM_WORKERS,
+                 load_workers=config.PIPELINE_LOAD_WORKERS,
+                 queue_size=config.PIPELINE_QUEUE_SIZE,
+                 batch_rows=config.PIPELINE_LOAD_BATCH_ROWS,
+                 flush_interval=config.PIPELINE_LOAD_FLUSH_INTERVAL):
+        """
+        初始化管道
+        """
+        self.name = name
+        self.fetch = fetch
+        self.transform = transform
+        self.load = load
+        self.describe = describe
+        self.on_success = on_success
+        self.on_failure = on_failure
+        self.load_context = load_context
+        self.fetch_workers = fetch_workers
+        self.transform_workers = transform_workers
+        self.load_workers = load_workers
+        self.queue_size = queue_size
+        self.batch_rows = batch_rows
+        self.flush_interval = flush_interval
+
+        self._lock = threading.Lock()
+        self._succeeded = 0
+        self._failed = 0
+        self._busy = {"fetch": 0.0, "transform": 0.0, "load": 0.0}
+        self._running = {}
+        self._stop = threading.Event()
+        self.failed_items = []
+
+    def _record(self, stage: str, busy: float):
+        """
+        记录阶段耗时（获取、转换按代码，加载按批次）
+        """
+        with self._lock:
+            self._busy[stage] += busy
+        STAGE_SECONDS.observe(busy, task=self.name, stage=stage)
+        health.touch()
+
+    def _succeed(self, items: list):
+        """
+        记录处理成功的代码
+        """
+        with self._lock:
+            self._succeeded += len(items)
+        ITEMS_PROCESSED.inc(len(items), task=self.name, outcome="succeeded")
+        if self.on_success:
+            self.on_success(items)
+
+    def _fail(self, item, action: str, error: Exception):
+        """
+        记录处理失败的代码
+        """
+        logger.error(f"{action} {self.describe(item)} 数据失败: {error}")
+        with self._lock:
+            self._failed += 1
+            self.failed_items.append(item)
+        ITEMS_PROCESSED.inc(task=self.name, outcome="failed")
+        if self.on_failure:
+            self.on_failure(item, str(error))
+
+    def _get(self, inbox: queue.Queue, timeout=None):
+        """
+        从队列取出一个元素，timeout 秒内没有元素时抛出 queue.Empty；收到停止请求时返回哨兵
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self._stop.is_set():
+            wait = _POLL_INTERVAL if deadline is None else min(_POLL_INTERVAL, deadline - time.monotonic())
+            if wait <= 0:
+                raise queue.Empty
+            try:
+                return inbox.get(timeout=wait)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _put(self, outbox: queue.Queue, entry) -> bool:
+        """
+        放入队列，队列已满时等待（背压）；收到停止请求时放弃并返回 False
+        """
+        while not self._stop.is_set():
+            try:
+                outbox.put(entry, timeout=_POLL_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _stage_worker(self, stage: str, handler, inbox: queue.Queue, outbox: queue.Queue, downstream_workers: int):
+        """
+        阶段工作线程：处理 inbox 中的元素直到收到哨兵；本阶段最后一个退出的线程向下游发送哨兵
+        """
+        try:
+            while True:
+                entry = self._get(inbox)
+                if entry is _DONE:
+                    break
+                handler(entry, outbox)
+        finally:
+            with self._lock:
+                self._running[stage] -= 1
+                last = self._running[stage] == 0
+            if last:
+                for _ in range(downstream_workers):
+                    self._put(outbox, _DONE)
+
+    def _fetch_one(self, item, outbox: queue.Queue):
+        """
+        获取一个代码的原始数据
+        """
+        start = time.perf_counter()
+        try:
+            raw = self.fetch(item)
+        except Exception as e:
+            self._record("fetch", time.perf_counter() - start)
+            self._fail(item, "获取", e)
+            return
+        self._record("fetch", time.perf_counter() - start)
+        self._put(outbox, (item, raw))
+
+    def _transform_one(self, entry, outbox: queue.Queue):
+        """
+        转换一个代码的数据
+        """
+        item, raw = entry
+        start = time.perf_counter()
+        try:
+            frame = self.transform(item, raw) if raw is not None else None
+        except Exception as e:
+            self._record("transform", time.perf_counter() - start)
+            self._fail(item, "转换", e)
+            return
+        self._record("transform", time.perf_counter() - start)
+        if frame is None or frame.empty:
+            logger.debug(f"{self.describe(item)} 没有需要写入的数据")
+            self._succeed([item])
+            return
+        self._put(outbox, (item, frame))
+
+    def _flush(self, pending: list):
+        """
+        合并多个代码的数据一次写入；整批失败时逐个代码重试，避免一个代码的问题拖累整批
+        """
+        items = [item for item, _ in pending]
+        frame = pd.concat([frame for _, frame in pending], ignore_index=True)
+        start = time.perf_counter()
+        try:
+            self.load(frame, items)
+        except Exception as e:
+            self._record("load", time.perf_counter() - start)
+            if len(pending) == 1:
+                self._fail(items[0], "写入", e)
+                return
+            logger.warning(f"{self.name}: 合并写入 {len(pending)} 个代码失败，改为逐个写入: {e}")
+            for entry in pending:
+                self._flush([entry])
+            return
+
+        self._record("load", time.perf_counter() - start)
+        ROWS_LOADED.inc(len(frame), task=self.name)
+        self._succeed(items)
+        logger.info(f"{self.name}: 已写入 {len(pending)} 个代码的数据")
+
+    def _load_worker(self, inbox: queue.Queue):
+        """
+        加载线程：累积到 batch_rows 行、上游空闲超过 flush_interval 秒或上游结束时写入一批
+        """
+        with self.load_context() if self.load_context else contextlib.nullcontext():
+            self._load_batches(inbox)
+
+    def _load_batches(self, inbox: queue.Queue):
+        """
+        加载线程的主循环
+        """
+        pending, pending_rows = [], 0
+        while True:
+            try:
+                entry = self._get(inbox, timeout=self.flush_interval)
+            except queue.Empty:
+                if pending:
+                    self._flush(pending)
+                    pending, pending_rows = [], 0
+                continue
+            if entry is _DONE:
+                break
+            pending.append(entry)
+            pending_rows += len(entry[1])
+            if pending_rows >= self.batch_rows:
+                self._flush(pending)
+                pending, pending_rows = [], 0
+        if pending and not self._stop.is_set():
+            self._flush(pending)
+
+    def run(self, items) -> tuple:
+        """
+        处理全部代码，返回 (成功数, 失败数)
+        """
+        fetch_queue = queue.Queue(maxsize=self.queue_size)
+        transform_queue = queue.Queue(maxsize=self.queue_size)
+        load_queue = queue.Queue(maxsize=self.queue_size)
+        started = time.perf_counter()
+
+        self._running = {"fetch": self.fetch_workers, "transform": self.transform_workers}
+
+        # 阶段线程为守护线程：中断后仍在等待数据源响应的线程不会阻止进程退出
+        threads = []
+        for i in range(self.fetch_workers):
+            threads.append(threading.Thread(
+                target=self._stage_worker, name=f"{self.name}-fetch-{i}",
+                args=("fetch", self._fetch_one, fetch_queue, transform_queue, self.transform_workers), daemon=True,
+            ))
+        for i in range(self.transform_workers):
+            threads.append(threading.Thread(
+                target=self._stage_worker, name=f"{self.name}-transform-{i}",
+                args=("transform", self._transform_one, transform_queue, load_queue, self.load_workers), daemon=True,
+            ))
+        for i in range(self.load_workers):
+            threads.append(threading.Thread(
+                target=self._load_worker, name=f"{self.name}-load-{i}", args=(load_queue,), daemon=True,
+            ))
+        for thread in threads:
+            thread.start()
+
+        try:
+            # 队列已满时在此阻塞，直到获取阶段腾出空间
+            for item in items:
+                self._put(fetch_queue, item)
+            for _ in range(self.fetch_workers):
+                self._put(fetch_queue, _DONE)
+            for thread in threads:
+                thread.join()
+        except BaseException:
+            # 中断时各阶段线程在当前调用结束后退出，阻塞在队列上的线程立即退出，不等待它们
+            self._stop.set()
+            logger.warning(f"{self.name}: 管道被中断，停止全部阶段线程")
+            raise
+
+        elapsed = time.perf_counter() - started
+        logger.info(
+            f"{self.name}: processed {self._succeeded + self._failed} items in {elapsed:.1f}s: "
+            f"{self._succeeded} succeeded, {self._failed} failed; busy worker-seconds "
+            + ", ".join(f"{stage} {seconds:.1f}s" for stage, seconds in self._busy.items())
+        )
+        return self._succeeded, self._failed
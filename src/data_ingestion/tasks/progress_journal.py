@@ -0,0 +1,91 @@
+# src/data_ingestion/tasks/progress_journal.py
+"""
+任务进度日志
+"""
+
+from datetime import datetime, timedelta
+
+from src.core.config import config
+from src.core.logger import logger
+from src.database.session import SessionLocal
+from src.database.models.progress import IngestProgress
+
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+
+class ProgressJournal:
+    """
+    按 (运行 ID, 数据集) 记录每个代码处理结果的进度日志
+
+    日志保存在数据库中（容器重启后本地文件会丢失），任务重试或进程重启时使用同一运行 ID
+    跳过已完成的代码；失败的代码会被记录下来，供任务末尾的重跑使用
+    """
+
+    def __init__(self, dataset: str, run_id=None):
+        """
+        初始化进度日志
+        """
+        self.dataset = dataset
+        self.run_id = run_id or config.RUN_ID
+
+    def completed(self) -> set:
+        """
+        本次运行中已完成的代码
+        """
+        with SessionLocal() as db:
+            rows = db.query(IngestProgress.item_key).filter(
+                IngestProgress.run_id == self.run_id,
+                IngestProgress.dataset == self.dataset,
+                IngestProgress.status == STATUS_DONE,
+            ).all()
+        return {key for key, in rows}
+
+    def _write(self, keys: list, status: str, error=None):
+        """
+        写入一批代码的处理结果，已有记录直接覆盖；写入失败只记录日志，不影响数据任务
+        """
+        now = datetime.now()
+        records = [
+            {"run_id": self.run_id, "dataset": self.dataset, "item_key": str(key),
+             "status": status, "error": error, "updated_at": now}
+            for key in keys
+        ]
+        try:
+            with SessionLocal() as db:
+                db.query(IngestProgress).filter(
+                    IngestProgress.run_id == self.run_id,
+                    IngestProgress.dataset == self.dataset,
+                    IngestProgress.item_key.in_([record["item_key"] for record in records]),
+                ).delete(synchronize_session=False)
+                db.bulk_insert_mappings(IngestProgress, records)
+                db.commit()
+        except Exception as e:
+            logger.warning(f"Failed to write progress journal for {self.dataset} run {self.run_id}: {e}")
+
+    def mark_done(self, keys: list):
+        """
+        记录一批已完成的代码
+        """
+        if keys:
+            self._write(keys, STATUS_DONE)
+
+    def mark_failed(self, key, error: str):
+        """
+        记录处理失败的代码
+        """
+        self._write([key], STATUS_FAILED, error[:1000])
+
+    @staticmethod
+    def purge(retention_days=config.PROGRESS_RETENTION_DAYS):
+        """
+        删除超过保留天数的进度记录
+        """
+        cutoff = datetime.now() - timedelta(days=retention_days)
+        with SessionLocal() as db:
+            deleted = db.query(IngestProgress).filter(IngestProgress.updated_at < cutoff).delete(
+                synchronize_session=False
+            )
+            db.commit()
+        if deleted:
+            logger.info(f"Purged {deleted} progress journal records older than {retention_days} days.")
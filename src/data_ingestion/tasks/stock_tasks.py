@@ -4,16 +4,28 @@
 """
 
 import pandas as pd
-from datetime import datetime
+from datetime import datetime, timedelta
 from src.data_ingestion.fetchers.akshare_fetcher import AkShareFetcher
 from src.data_ingestion.transformers.stock_transformer import StockTransformer
 from src.data_ingestion.loaders.database_loader import DatabaseLoader
+from src.data_ingestion.loaders.parquet_loader import ParquetLoader
+from src.data_ingestion.tasks.base_tasks import BaseTasks
+from src.data_ingestion.tasks.trading_calendar import get_trading_calendar
+from src.database.adjustment import ADJUST_HFQ
+from src.database.data_reader import DataReader
+from src.database.models.stock import StockDailyData
+from src.database.models.adj_factor import StockAdjFactor
 from src.core.config import config
 from src.core.logger import logger
+from src.data_ingestion.loaders.load_result import CONFLICT_UPDATE
 from src.utils.file_utils import check_file_validity
+from src.utils.date_utils import next_start_date
 
+# 存储设置中记录股票日线复权方式的名称
+STORE_ADJUST_SETTING = "stock_store_adjust"
 
-class StockTasks:
+
+class StockTasks(BaseTasks):
     """
     股票数据任务
     """
@@ -25,39 +37,183 @@ class StockTasks:
         self.fetcher = AkShareFetcher()
         self.transformer = StockTransformer()
         self.loader = DatabaseLoader()
+        self.lake_loader = ParquetLoader() if config.PARQUET_SINK_ENABLED else None
+        self.conflict_policy = config.STOCK_CONFLICT_POLICY
 
     def download_and_save_stock_data(self):
         """
         下载并保存股票数据
         """
-        # 获取股票列表
+        self._check_store_adjust()
+
+        # 增量模式下查询每只股票已存储的最后日期
+        latest_dates = self.loader.get_latest_stock_dates() if config.INCREMENTAL_MODE else {}
+
+        # 缓存的股票列表中每只股票都已存储最近的交易日时直接结束
+        stock_list = None
         if check_file_validity(config.CACHE_PATH + "/stock_list.csv", config.MAX_CSV_AGE_DAYS):
             logger.info("从缓存读取股票列表")
             stock_list = pd.read_csv(config.CACHE_PATH + "/stock_list.csv")
-        else:
+            if self._no_new_session("stock", latest_dates, stock_list["代码"]):
+                return
+
+        # 快照模式下获取全市场实时行情，它同时也是最新的股票列表
+        snapshot_date = self._snapshot_session()
+        snapshot = self.fetcher.fetch_stock_spot() if snapshot_date else None
+        if snapshot is not None:
+            stock_list = snapshot[["代码", "名称"]]
+            stock_list.to_csv(config.CACHE_PATH + "/stock_list.csv", index=False)
+        # 获取股票列表
+        elif stock_list is None:
             logger.info("从API获取股票列表")
             stock_list = self.fetcher.fetch_stock_list()
             #  这里可以不用saver了，直接保存到本地
             stock_list.to_csv(config.CACHE_PATH + "/stock_list.csv", index=False)
 
-        # 下载股票日数据并保存到数据库
+        # 只缺当日数据的股票直接由快照生成当日日线
+        covered = self._load_snapshot(snapshot, snapshot_date, latest_dates) if snapshot is not None else set()
+        end_date = datetime.today().strftime("%Y%m%d")
+
+        # 计算每只股票需要下载的区间，已是最新或已由快照覆盖的股票直接跳过（缺失多日的股票和新股逐只下载）
+        work_items = []
         for symbol in stock_list["代码"]:
-            try:
-                stock_data = self.fetcher.fetch_stock_daily_data(
-                    symbol,
-                    config.AKSHARE_DATA_START_DATE,
-                    datetime.today().strftime("%Y%m%d"),
-                    'hfq'
-                )
-                transformed_data = self.transformer.transform_stock_daily_data(stock_data)
-                self.loader.load_stock_daily_data(transformed_data, symbol)
-                logger.info(f"股票 {symbol} 日数据下载并保存完成")
-            except Exception as e:
-                logger.error(f"下载股票{symbol}数据失败: {e}")
+            if symbol in covered:
+                continue
+            window = self._fetch_window(
+                next_start_date(latest_dates.get(symbol), config.AKSHARE_DATA_START_DATE), end_date
+            )
+            if window is None:
+                logger.debug(f"股票 {symbol} 数据已是最新，跳过")
                 continue
+            work_items.append((symbol, *window))
+
+        # 流式下载、转换股票日数据，并合并成多股票批次保存到数据库
+        self._run_pipeline(
+            "stock", work_items, self._fetch_stock, self._transform_stock, self._load_stocks,
+            describe=lambda item: f"股票 {item[0]}",
+        )
+
+        # 存储不复权行情时同步刷新复权因子，复权价格在读取时计算
+        if not config.STOCK_STORE_ADJUST:
+            self.refresh_adj_factors(stock_list["代码"])
+
+        # 合并数据湖中的小文件
+        if self.lake_loader:
+            self.lake_loader.compact("stock")
 
         logger.info("股票数据下载任务完成")
 
+    def _check_store_adjust(self):
+        """
+        确认 STOCK_STORE_ADJUST 与数据库中已存储的股票日线的复权方式一致，不一致时拒绝写入，
+        避免增量下载把不同复权方式的价格追加到同一张表中
+
+        股票日线为空时记录当前的存储方式；已有数据但没有记录时，数据由只存储后复权价格的旧版本写入
+        """
+        if not self.loader.has_rows(StockDailyData):
+            self.loader.set_storage_setting(STORE_ADJUST_SETTING, config.STOCK_STORE_ADJUST)
+            return
+        stored = self.loader.get_storage_setting(STORE_ADJUST_SETTING)
+        if stored is None:
+            stored = ADJUST_HFQ
+            self.loader.set_storage_setting(STORE_ADJUST_SETTING, stored)
+            logger.info("股票日线由旧版本写入，记录存储方式为后复权 (hfq)")
+        if stored != config.STOCK_STORE_ADJUST:
+            raise ValueError(
+                f"stock_daily_data is stored with adjust='{stored}' but STOCK_STORE_ADJUST="
+                f"'{config.STOCK_STORE_ADJUST}'; set STOCK_STORE_ADJUST='{stored}', "
+                f"or empty stock_daily_data to download the full history again"
+            )
+
+    def _snapshot_session(self):
+        """
+        可以使用快照的交易日：启用快照模式、按不复权存储、增量模式，且今天是已收盘的交易日时返回今天，否则返回 None
+        """
+        if not (config.STOCK_SNAPSHOT_MODE and config.TRADING_CALENDAR_ENABLED and config.INCREMENTAL_MODE) \
+                or config.STOCK_STORE_ADJUST:
+            return None
+        today = datetime.now().date()
+        return today if get_trading_calendar().last_closed_session() == today else None
+
+    def _load_snapshot(self, snapshot: pd.DataFrame, trade_date, latest_dates: dict) -> set:
+        """
+        用收盘后的实时行情生成 trade_date 当日的日线并一次写入，返回已覆盖的股票代码
+
+        只处理最后日期恰好是上一个交易日的股票；流通股本沿用上一个交易日的值，换手率 = 成交量 / 流通股本。
+        当日停牌的股票没有日线，同样视为已覆盖
+        """
+        previous = get_trading_calendar().last_session_on_or_before(trade_date - timedelta(days=1))
+        eligible = {symbol for symbol, last_date in latest_dates.items() if last_date == previous}
+        if not eligible:
+            return set()
+
+        bars = self.transformer.transform_spot_snapshot(snapshot, trade_date)
+        bars = bars[bars["symbol"].isin(eligible)]
+        shares = DataReader.read_cross_section(StockDailyData, previous, ["outstanding_share"])
+        bars = bars.merge(shares[["symbol", "outstanding_share"]].astype({"symbol": object}), on="symbol", how="left")
+        bars["turnover"] = bars["volume"] / bars["outstanding_share"]
+        frame = self.loader.prepare_frame(StockDailyData, bars)
+        if not frame.empty:
+            self._load_batch(StockDailyData, "stock", frame, f"{len(frame)} stocks from spot snapshot")
+        logger.info(f"快照模式: 由实时行情生成 {trade_date} 的 {len(frame)} 条日线，"
+                    f"{len(eligible) - len(frame)} 只股票当日停牌或不在行情中")
+        return eligible
+
+    def refresh_adj_factors(self, symbols):
+        """
+        刷新复权因子：没有因子或因子超过 ADJ_FACTOR_REFRESH_DAYS 天未刷新的股票重新下载全部因子
+
+        因子表每次除权除息只有一行，整表覆盖写入的代价很小；已存储的不复权行情不需要改写
+        """
+        refreshed_at = self.loader.get_adj_factor_refresh_times()
+        threshold = datetime.now() - timedelta(days=config.ADJ_FACTOR_REFRESH_DAYS)
+        work_items = [(symbol,) for symbol in symbols
+                      if refreshed_at.get(symbol) is None or refreshed_at[symbol] < threshold]
+        logger.info(f"刷新 {len(work_items)} 只股票的复权因子，"
+                    f"{len(refreshed_at)} 只股票已有因子")
+        self._run_pipeline(
+            "stock_adj_factor", work_items, self._fetch_adj_factor, self._transform_adj_factor,
+            self._load_adj_factors, describe=lambda item: f"股票 {item[0]} 复权因子",
+        )
+
+    def _fetch_stock(self, item):
+        """
+        下载单只股票的日数据（不复权，或按 STOCK_STORE_ADJUST 指定的复权方式）
+        """
+        symbol, start_date, end_date = item
+        return self.fetcher.fetch_stock_daily_data(symbol, start_date, end_date, config.STOCK_STORE_ADJUST)
+
+    def _transform_stock(self, item, stock_data):
+        """
+        转换单只股票的日数据并按模型整理
+        """
+        transformed_data = self.transformer.transform_stock_daily_data(stock_data)
+        return self.loader.prepare_frame(StockDailyData, transformed_data, symbol=item[0])
+
+    def _load_stocks(self, frame, items):
+        """
+        保存合并后的多只股票日数据
+        """
+        self._load_batch(StockDailyData, "stock", frame, f"{len(items)} stocks")
+
+    def _fetch_adj_factor(self, item):
+        """
+        下载单只股票的复权因子
+        """
+        return self.fetcher.fetch_stock_adj_factor(item[0])
+
+    def _transform_adj_factor(self, item, factor_data):
+        """
+        按模型整理复权因子，记录刷新时间
+        """
+        return self.loader.prepare_frame(StockAdjFactor, factor_data, symbol=item[0], updated_at=datetime.now())
+
+    def _load_adj_factors(self, frame, items):
+        """
+        保存合并后的多只股票复权因子，已有的因子按最新数据更新
+        """
+        self.loader.load_dataframe(StockAdjFactor, frame, f"{len(items)} stocks adj factors", CONFLICT_UPDATE)
+
 
 # 示例用法
 if __name__ == '__main__':
@@ -0,0 +1,154 @@
+# src/data_ingestion/tasks/trading_calendar.py
+"""
+交易日历
+"""
+
+import os
+import threading
+from datetime import datetime, time
+
+import numpy as np
+import pandas as pd
+
+from src.core.config import config
+from src.core.logger import logger
+from src.data_ingestion.fetchers.akshare_fetcher import AkShareFetcher
+from src.utils.file_utils import check_file_validity
+
+
+class TradingCalendar:
+    """
+    沪深交易所交易日历
+
+    日历保存在缓存目录的 CSV 中，超过 TRADING_CALENDAR_MAX_AGE_DAYS 天或不覆盖今天时重新获取；
+    获取失败时使用过期的缓存，没有缓存时退化为按工作日计算。
+    交易所公布的日历之后的日期（如年底尚未公布下一年日历）同样按工作日处理
+    """
+
+    def __init__(self, path=None, fetcher=None):
+        """
+        初始化交易日历，首次使用时才加载
+        """
+        self.path = path or os.path.join(config.CACHE_PATH, "trade_calendar.csv")
+        self.fetcher = fetcher or AkShareFetcher()
+        self._sessions = None
+        self._loaded_on = None
+        self._lock = threading.Lock()
+
+    def _read_file(self):
+        """
+        读取缓存的日历，不存在时返回 None
+        """
+        if not os.path.exists(self.path):
+            return None
+        return pd.to_datetime(pd.read_csv(self.path)["trade_date"]).values.astype("datetime64[D]")
+
+    def _fetch(self):
+        """
+        从 AkShare 获取日历并写入缓存
+        """
+        calendar = self.fetcher.fetch_trade_calendar()
+        dates = pd.to_datetime(calendar["trade_date"]).values.astype("datetime64[D]")
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        pd.DataFrame({"trade_date": pd.DatetimeIndex(dates).strftime("%Y-%m-%d")}).to_csv(self.path, index=False)
+        logger.info(f"交易日历已更新: {len(dates)} 个交易日，最后 {dates[-1] if len(dates) else None}")
+        return dates
+
+    def _load(self) -> np.ndarray:
+        """
+        加载日历，返回排序后的 datetime64[D] 数组（可能为空）
+        """
+        today = np.datetime64(datetime.now().date(), "D")
+        dates = self._read_file()
+        fresh = check_file_validity(self.path, config.TRADING_CALENDAR_MAX_AGE_DAYS)
+        if dates is None or not fresh or not len(dates) or dates.max() < today:
+            try:
+                dates = self._fetch()
+            except Exception as e:
+                logger.warning(f"获取交易日历失败，{'使用过期的缓存' if dates is not None else '按工作日计算'}: {e}")
+        return np.unique(dates) if dates is not None else np.array([], dtype="datetime64[D]")
+
+    def sessions(self) -> np.ndarray:
+        """
+        全部交易日（datetime64[D]，升序），公布的日历之后到今天为止按工作日补齐；
+        常驻进程中日期变化后重新加载
+        """
+        today = np.datetime64(datetime.now().date(), "D")
+        if self._loaded_on != today:
+            with self._lock:
+                if self._loaded_on != today:
+                    dates = self._load()
+                    tail_start = dates[-1] + 1 if len(dates) else np.datetime64(
+                        f"{config.AKSHARE_DATA_START_DATE[:4]}-01-01", "D"
+                    )
+                    if tail_start <= today:
+                        tail = np.arange(tail_start, today + 1, dtype="datetime64[D]")
+                        dates = np.concatenate([dates, tail[np.is_busday(tail)]])
+                    self._sessions = dates
+                    self._loaded_on = today
+        return self._sessions
+
+    def last_closed_session(self, now=None):
+        """
+        最近一个已收盘的交易日（date）：今天是交易日且已过 MARKET_CLOSE_TIME 时为今天
+        """
+        now = now or datetime.now()
+        sessions = self.sessions()
+        closed = time.fromisoformat(config.MARKET_CLOSE_TIME)
+        cutoff = np.datetime64(now.date(), "D") + (1 if now.time() >= closed else 0)
+        position = np.searchsorted(sessions, cutoff, side="left") - 1
+        return pd.Timestamp(sessions[position]).date() if position >= 0 else None
+
+    def first_session_on_or_after(self, day):
+        """
+        不早于 day 的第一个交易日（date），之后没有交易日时返回 None；day 可以是 YYYYMMDD 字符串或日期
+        """
+        sessions = self.sessions()
+        position = np.searchsorted(sessions, np.datetime64(pd.Timestamp(day).date(), "D"), side="left")
+        return pd.Timestamp(sessions[position]).date() if position < len(sessions) else None
+
+    def last_session_on_or_before(self, day):
+        """
+        不晚于 day 的最后一个交易日（date），之前没有交易日时返回 None
+        """
+        sessions = self.sessions()
+        position = np.searchsorted(sessions, np.datetime64(pd.Timestamp(day).date(), "D"), side="right") - 1
+        return pd.Timestamp(sessions[position]).date() if position >= 0 else None
+
+    def fetch_window(self, start_date: str, end_date: str):
+        """
+        将 YYYYMMDD 格式的下载区间裁剪到交易日：起始日期后移到第一个交易日，
+        结束日期前移到不晚于它的最近一个已收盘交易日；区间内没有已收盘的交易日时返回 None
+        """
+        first = self.first_session_on_or_after(start_date)
+        last = self.last_closed_session()
+        if last is not None and pd.Timestamp(end_date).date() < last:
+            last = self.last_session_on_or_before(end_date)
+        if first is None or last is None or first > last:
+            return None
+        return first.strftime("%Y%m%d"), last.strftime("%Y%m%d")
+
+    def has_new_session(self, latest_dates: dict, keys) -> bool:
+        """
+        keys 中是否有代码缺少最近一个已收盘交易日的数据（没有已存储的数据或最后日期更早）；
+        只要有一个代码落后就返回 True，部分代码已写入最新交易日的中断运行不会被视为已完成
+        """
+        last = self.last_closed_session()
+        if last is None:
+            return True
+        return any(latest_dates.get(key) is None or latest_dates[key] < last for key in keys)
+
+
+_calendar = None
+_calendar_lock = threading.Lock()
+
+
+def get_trading_calendar() -> TradingCalendar:
+    """
+    获取进程内共享的交易日历
+    """
+    global _calendar
+    with _calendar_lock:
+        if _calendar is None:
+            _calendar = TradingCalendar()
+        return _calendar
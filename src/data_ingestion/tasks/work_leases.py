@@ -0,0 +1,185 @@
+# src/data_ingestion/tasks/work_leases.py
+"""
+基于数据库租约的分布式工作领取
+"""
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, or_
+from sqlalchemy.exc import IntegrityError
+
+from src.core.config import config
+from src.core.logger import logger
+from src.core.metrics import health
+from src.database.session import SessionLocal
+from src.database.models.lease import WorkUnit
+
+STATUS_PENDING = "pending"
+STATUS_LEASED = "leased"
+STATUS_DONE = "done"
+
+
+class WorkLeaseManager:
+    """
+    工作单元租约管理
+
+    第一个启动的副本把本次运行的代码按 WORK_UNIT_SIZE 切分为工作单元写入 work_units 表，
+    之后各副本通过带条件的 UPDATE 原子地领取未被领取或租约已过期的单元，因此多个副本处理互不重叠的分片；
+    处理期间后台线程定期续约，副本退出或崩溃后租约过期，单元会被其它副本自动重新领取
+    """
+
+    def __init__(self, dataset: str, run_id=None, owner=None, unit_size=config.WORK_UNIT_SIZE,
+                 lease_ttl=config.LEASE_TTL, heartbeat_interval=config.LEASE_HEARTBEAT_INTERVAL,
+                 poll_interval=config.LEASE_POLL_INTERVAL):
+        """
+        初始化租约管理
+        """
+        self.dataset = dataset
+        self.run_id = run_id or config.RUN_ID
+        self.owner = owner or config.WORKER_ID
+        self.unit_size = unit_size
+        self.lease_ttl = lease_ttl
+        self.heartbeat_interval = heartbeat_interval
+        self.poll_interval = poll_interval
+
+    def _filter(self, *criteria):
+        """
+        本次运行、本数据集的查询条件
+        """
+        return and_(WorkUnit.run_id == self.run_id, WorkUnit.dataset == self.dataset, *criteria)
+
+    def plan(self, keys: list) -> int:
+        """
+        切分工作单元，已有其它副本切分过时直接使用已有的单元，返回单元数
+        """
+        with SessionLocal() as db:
+            existing = db.query(WorkUnit).filter(self._filter()).count()
+            if existing:
+                return existing
+            now = datetime.utcnow()
+            units = [
+                {"run_id": self.run_id, "dataset": self.dataset, "unit_id": unit_id,
+                 "item_keys": json.dumps(keys[start:start + self.unit_size], ensure_ascii=False),
+                 "status": STATUS_PENDING, "updated_at": now}
+                for unit_id, start in enumerate(range(0, len(keys), self.unit_size))
+            ]
+            try:
+                db.bulk_insert_mappings(WorkUnit, units)
+                db.commit()
+            except IntegrityError:
+                # 其它副本同时完成了切分
+                db.rollback()
+                return db.query(WorkUnit).filter(self._filter()).count()
+        logger.info(f"{self.dataset}: 将 {len(keys)} 个代码切分为 {len(units)} 个工作单元 (运行 {self.run_id})")
+        return len(units)
+
+    def claim(self, exclude=()):
+        """
+        领取下一个工作单元，返回 (单元编号, 代码列表)；exclude 中的单元（本副本已释放的单元）不再领取
+
+        没有可领取的单元但其它副本仍持有未过期的租约时，每隔 poll_interval 秒重试（并记录存活进展），
+        以便在持有者崩溃时接手；全部单元完成后返回 None
+        """
+        while True:
+            now = datetime.utcnow()
+            claimable = and_(or_(
+                WorkUnit.status == STATUS_PENDING,
+                and_(WorkUnit.status == STATUS_LEASED, WorkUnit.lease_expires_at < now),
+            ), WorkUnit.unit_id.notin_(list(exclude)))
+            with SessionLocal() as db:
+                candidates = db.query(WorkUnit.unit_id, WorkUnit.owner).filter(self._filter(claimable)).order_by(
+                    WorkUnit.unit_id
+                ).limit(10).all()
+                for unit_id, previous_owner in candidates:
+                    claimed = db.query(WorkUnit).filter(self._filter(WorkUnit.unit_id == unit_id, claimable)).update(
+                        {"status": STATUS_LEASED, "owner": self.owner,
+                         "lease_expires_at": now + timedelta(seconds=self.lease_ttl), "updated_at": now},
+                        synchronize_session=False,
+                    )
+                    db.commit()
+                    if claimed == 1:
+                        item_keys = db.query(WorkUnit.item_keys).filter(
+                            self._filter(WorkUnit.unit_id == unit_id)
+                        ).scalar()
+                        if previous_owner and previous_owner != self.owner:
+                            logger.warning(f"{self.dataset}: 接管 {previous_owner} 租约已过期的工作单元 {unit_id}")
+                        return unit_id, json.loads(item_keys)
+
+                leased = db.query(WorkUnit).filter(self._filter(WorkUnit.status == STATUS_LEASED)).count()
+            if not leased:
+                return None
+            logger.debug(f"{self.dataset}: {leased} 个工作单元由其它副本处理中，{self.poll_interval} 秒后重试")
+            # 等待其它副本的租约也算作进展，避免存活探针在等待期间判定为卡住
+            health.touch()
+            time.sleep(self.poll_interval)
+
+    def _update_own(self, unit_id: int, values: dict) -> bool:
+        """
+        更新本副本持有的单元，租约已被其它副本接管时返回 False
+        """
+        values["updated_at"] = datetime.utcnow()
+        with SessionLocal() as db:
+            updated = db.query(WorkUnit).filter(self._filter(
+                WorkUnit.unit_id == unit_id, WorkUnit.owner == self.owner, WorkUnit.status == STATUS_LEASED
+            )).update(values, synchronize_session=False)
+            db.commit()
+        return updated == 1
+
+    def _heartbeat(self, unit_id: int, stop: threading.Event):
+        """
+        定期续约并记录存活进展，直到单元处理结束
+        """
+        while not stop.wait(self.heartbeat_interval):
+            try:
+                expires_at = datetime.utcnow() + timedelta(seconds=self.lease_ttl)
+                if not self._update_own(unit_id, {"lease_expires_at": expires_at}):
+                    logger.warning(f"{self.dataset}: 工作单元 {unit_id} 的租约已被其它副本接管")
+                    return
+                health.touch()
+            except Exception as e:
+                logger.warning(f"{self.dataset}: 工作单元 {unit_id} 续约失败: {e}")
+
+    def _release(self, unit_id: int):
+        """
+        释放本副本持有的单元，其它副本可以立即领取
+        """
+        self._update_own(unit_id, {"status": STATUS_PENDING, "owner": None, "lease_expires_at": None})
+
+    @contextmanager
+    def hold(self, unit_id: int, complete: bool = True):
+        """
+        持有工作单元期间定期续约；正常结束时标记完成（complete 为 False 时释放），
+        出现异常时释放租约以便其它副本立即领取
+        """
+        stop = threading.Event()
+        heartbeat = threading.Thread(
+            target=self._heartbeat, args=(unit_id, stop), name=f"{self.dataset}-lease-{unit_id}", daemon=True
+        )
+        heartbeat.start()
+        try:
+            yield
+        except BaseException:
+            stop.set()
+            heartbeat.join()
+            self._release(unit_id)
+            raise
+        stop.set()
+        heartbeat.join()
+        if not complete:
+            self._release(unit_id)
+        elif not self._update_own(unit_id, {"status": STATUS_DONE, "lease_expires_at": None}):
+            logger.warning(f"{self.dataset}: 工作单元 {unit_id} 完成时租约已被其它副本接管")
+
+    @staticmethod
+    def purge(retention_days=config.PROGRESS_RETENTION_DAYS):
+        """
+        删除超过保留天数的工作单元
+        """
+        cutoff = datetime.utcnow() - timedelta(days=retention_days)
+        with SessionLocal() as db:
+            db.query(WorkUnit).filter(WorkUnit.updated_at < cutoff).delete(synchronize_session=False)
+            db.commit()
@@ -0,0 +1,138 @@
+# src/data_ingestion/transformers/base_transformer.py
+"""
+数据转换器基类与基于 schema 的向量化转换引擎
+"""
+
+import logging
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_numeric_dtype
+
+from src.core.logger import logger
+from src.core.config import config
+
+# 缺失值处理策略：填充为 0、保留缺失值、删除包含缺失值的行
+NULL_ZERO = "zero"
+NULL_KEEP = "keep"
+NULL_DROP = "drop"
+
+
+@dataclass(frozen=True)
+class ColumnSchema:
+    """
+    单列转换规则：源列名、目标列名、目标类型
+    """
+    source: str
+    target: str
+    dtype: str = "float64"
+
+
+@dataclass(frozen=True)
+class TransformSchema:
+    """
+    数据集转换规则：日期列、数值列和缺失值处理策略
+    """
+    name: str
+    date_column: ColumnSchema
+    columns: tuple
+    null_policy: str = NULL_ZERO
+
+    @property
+    def required_columns(self) -> list:
+        """
+        需要的源列
+        """
+        return [self.date_column.source] + [col.source for col in self.columns]
+
+    @property
+    def target_columns(self) -> list:
+        """
+        输出的目标列
+        """
+        return [self.date_column.target] + [col.target for col in self.columns]
+
+
+class BaseTransformer:
+    """
+    数据转换器的抽象基类
+    """
+    @staticmethod
+    def _validate_dataframe(data: pd.DataFrame, required_columns: list):
+        """
+        验证 DataFrame 是否有效，包括类型检查和缺失值处理
+        """
+        if not isinstance(data, pd.DataFrame):
+            logger.error("Input data is not a pandas DataFrame.")
+            raise ValueError("Input data must be a pandas DataFrame.")
+
+        if data.empty:
+            logger.warning("DataFrame is empty, no transformation needed.")
+            return False
+
+        if not all(col in data.columns for col in required_columns):
+            missing_columns = [col for col in required_columns if col not in data.columns]
+            logger.error(f"Missing required columns: {missing_columns}")
+            raise ValueError(f"DataFrame missing required columns: {missing_columns}")
+        return True
+
+    @staticmethod
+    def transform_with_schema(data: pd.DataFrame, schema: TransformSchema) -> pd.DataFrame:
+        """
+        按 schema 转换数据，返回只包含目标列的新 DataFrame，不修改输入
+
+        所有数值列一次性转换为一个 float64 二维数组，统一处理缺失值后再按列转换为目标类型，
+        避免逐列 to_numeric/fillna 以及对输入数据的原地修改
+        """
+        if config.TRANSFORMER_VALIDATE_DATA:  # 从 config 中读取是否开启数据验证
+            if not BaseTransformer._validate_dataframe(data, schema.required_columns):
+                return pd.DataFrame(columns=schema.target_columns)
+
+        try:
+            sources = [col.source for col in schema.columns]
+            block = data[sources]
+            # 只有存在非数值列（例如接口返回字符串）时才逐列解析
+            if not all(is_numeric_dtype(dtype) for dtype in block.dtypes):
+                block = block.apply(pd.to_numeric, errors='coerce')
+            values = block.to_numpy(dtype="float64", na_value=np.nan)
+
+            missing = np.isnan(values)
+            keep_rows = None
+            if schema.null_policy == NULL_ZERO:
+                values[missing] = 0.0
+            elif schema.null_policy == NULL_DROP:
+                keep_rows = ~missing.any(axis=1)
+                values, missing = values[keep_rows], missing[keep_rows]
+
+            dates = pd.to_datetime(data[schema.date_column.source], errors='coerce')
+            if keep_rows is not None:
+                dates = dates[keep_rows]
+            result = {schema.date_column.target: dates.dt.date.to_numpy()}
+
+            for i, col in enumerate(schema.columns):
+                column_values = values[:, i]
+                if np.dtype(col.dtype).kind in "iu":
+                    column_missing = missing[:, i]
+                    if column_missing.any():
+                        # 整数列保留缺失值时使用可空整数类型
+                        column_values = pd.arrays.IntegerArray(
+                            np.where(column_missing, 0, column_values).astype(col.dtype), column_missing
+                        )
+                    else:
+                        column_values = column_values.astype(col.dtype)
+                else:
+                    column_values = column_values.astype(col.dtype, copy=False)
+                result[col.target] = column_values
+
+            transformed = pd.DataFrame(result, copy=False)
+
+            # 打印转换后的数据的前几行，用于调试（只在 DEBUG 级别格式化，避免每次调用都生成字符串）
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Transformed {schema.name} data sample:\n{transformed.head()}")
+
+            return transformed
+
+        except Exception as e:
+            logger.error(f"Error during data transformation: {e}")
+            raise
@@ -0,0 +1,73 @@
+# src/data_ingestion/transformers/concept_aggregator.py
+"""
+概念板块涨跌家数和总市值的聚合计算
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class ConceptAggregator:
+    """
+    根据成分股和股票日线计算概念板块每日的上涨家数、下跌家数和总市值
+
+    成分股关系表示为 板块 × 股票 的 0/1 矩阵，股票日线表示为 股票 × 日期 的矩阵，
+    一次矩阵乘法得到全部板块全部日期的结果，计算量与 板块数 × 股票数 × 日期数 成正比，不需要按板块循环
+    """
+
+    @staticmethod
+    def stock_changes(bars: pd.DataFrame, adjusted_close=None) -> pd.DataFrame:
+        """
+        计算每只股票每日的涨跌幅，bars 需按 (symbol, date) 排序
+
+        adjusted_close 为复权收盘价（除权日不产生虚假的下跌），未提供时使用 close 列；
+        每只股票区间内的第一行没有前收盘价，涨跌幅为 NaN
+        """
+        close = np.asarray(bars["close"] if adjusted_close is None else adjusted_close, dtype="float64")
+        symbols = bars["symbol"].to_numpy()
+        previous = np.empty_like(close)
+        previous[0:1] = np.nan
+        previous[1:] = close[:-1]
+        previous[1:][symbols[1:] != symbols[:-1]] = np.nan
+        return bars.assign(change=close / previous - 1)
+
+    @staticmethod
+    def aggregate(stock_days: pd.DataFrame, constituents: pd.DataFrame) -> pd.DataFrame:
+        """
+        stock_days 包含 symbol、date、change、market_value 列，constituents 包含 concept_code、symbol 列；
+        返回每个板块每个日期的 up_count、down_count 和 total_market_value（没有成分股市值时为 NaN）
+        """
+        columns = ["concept_code", "date", "up_count", "down_count", "total_market_value"]
+        if stock_days.empty or constituents.empty:
+            return pd.DataFrame(columns=columns)
+
+        boards = pd.Index(pd.unique(constituents["concept_code"]))
+        stocks = pd.Index(pd.unique(stock_days["symbol"]))
+        dates = pd.Index(np.sort(pd.unique(stock_days["date"])))
+
+        membership = np.zeros((len(boards), len(stocks)))
+        board_rows = boards.get_indexer(constituents["concept_code"])
+        stock_cols = stocks.get_indexer(constituents["symbol"])
+        known = stock_cols >= 0
+        membership[board_rows[known], stock_cols[known]] = 1.0
+
+        stock_rows = stocks.get_indexer(stock_days["symbol"])
+        date_cols = dates.get_indexer(stock_days["date"])
+        change = stock_days["change"].to_numpy(dtype="float64")
+        market_value = stock_days["market_value"].to_numpy(dtype="float64")
+        # 三个 股票 × 日期 矩阵：是否上涨、是否下跌、市值（缺失为 0），另记录市值是否存在
+        values = np.zeros((4, len(stocks), len(dates)))
+        values[0, stock_rows, date_cols] = change > 0
+        values[1, stock_rows, date_cols] = change < 0
+        values[2, stock_rows, date_cols] = np.nan_to_num(market_value)
+        values[3, stock_rows, date_cols] = ~np.isnan(market_value)
+
+        up, down, total, priced = (membership @ values[i] for i in range(4))
+        total[priced == 0] = np.nan
+        return pd.DataFrame({
+            "concept_code": np.repeat(boards.to_numpy(), len(dates)),
+            "date": np.tile(dates.to_numpy(), len(boards)),
+            "up_count": up.ravel().round().astype("int64"),
+            "down_count": down.ravel().round().astype("int64"),
+            "total_market_value": total.ravel(),
+        })
@@ -0,0 +1,78 @@
+# src/data_ingestion/transformers/schemas.py
+"""
+各数据集的转换规则
+
+百分比列（涨跌幅、振幅、换手率）接口只保留两位小数，使用 float32；成交量使用 int64
+"""
+
+from src.data_ingestion.transformers.base_transformer import ColumnSchema, TransformSchema, NULL_ZERO
+
+# 股票日线数据（stock_zh_a_daily，已是英文列名）
+STOCK_DAILY_SCHEMA = TransformSchema(
+    name="stock_daily",
+    date_column=ColumnSchema("date", "date"),
+    columns=(
+        ColumnSchema("open", "open"),
+        ColumnSchema("close", "close"),
+        ColumnSchema("high", "high"),
+        ColumnSchema("low", "low"),
+        ColumnSchema("volume", "volume", "int64"),
+        ColumnSchema("amount", "amount"),
+        ColumnSchema("outstanding_share", "outstanding_share"),
+        ColumnSchema("turnover", "turnover"),
+    ),
+    null_policy=NULL_ZERO,
+)
+
+# 股票实时行情快照（stock_zh_a_spot），收盘后即为当日的日线；date 列由调用方附加
+STOCK_SPOT_SCHEMA = TransformSchema(
+    name="stock_spot",
+    date_column=ColumnSchema("date", "date"),
+    columns=(
+        ColumnSchema("今开", "open"),
+        ColumnSchema("最新价", "close"),
+        ColumnSchema("最高", "high"),
+        ColumnSchema("最低", "low"),
+        ColumnSchema("成交量", "volume", "int64"),
+        ColumnSchema("成交额", "amount"),
+    ),
+    null_policy=NULL_ZERO,
+)
+
+# 指数日线数据（index_zh_a_hist）
+INDEX_DAILY_SCHEMA = TransformSchema(
+    name="index_daily",
+    date_column=ColumnSchema("日期", "date"),
+    columns=(
+        ColumnSchema("开盘", "open"),
+        ColumnSchema("收盘", "close"),
+        ColumnSchema("最高", "high"),
+        ColumnSchema("最低", "low"),
+        ColumnSchema("成交量", "volume", "int64"),
+        ColumnSchema("成交额", "amount"),
+        ColumnSchema("振幅", "amplitude", "float32"),
+        ColumnSchema("涨跌幅", "change_rate", "float32"),
+        ColumnSchema("涨跌额", "change_amount"),
+        ColumnSchema("换手率", "turnover_rate", "float32"),
+    ),
+    null_policy=NULL_ZERO,
+)
+
+# 概念板块日线数据（stock_board_concept_hist_em）
+CONCEPT_DAILY_SCHEMA = TransformSchema(
+    name="concept_daily",
+    date_column=ColumnSchema("日期", "date"),
+    columns=(
+        ColumnSchema("开盘", "open"),
+        ColumnSchema("收盘", "close"),
+        ColumnSchema("最高", "high"),
+        ColumnSchema("最低", "low"),
+        ColumnSchema("涨跌幅", "change_rate", "float32"),
+        ColumnSchema("涨跌额", "change_amount"),
+        ColumnSchema("成交量", "volume", "int64"),
+        ColumnSchema("成交额", "amount"),
+        ColumnSchema("振幅", "amplitude", "float32"),
+        ColumnSchema("换手率", "turnover_rate", "float32"),
+    ),
+    null_policy=NULL_ZERO,
+)
@@ -0,0 +1,94 @@
+# src/database/adjustment.py
+"""
+复权计算模块
+"""
+
+import numpy as np
+import pandas as pd
+
+# 复权方式：不复权、前复权、后复权
+ADJUST_NONE = ""
+ADJUST_QFQ = "qfq"
+ADJUST_HFQ = "hfq"
+ADJUST_MODES = (ADJUST_NONE, ADJUST_QFQ, ADJUST_HFQ)
+
+# 需要复权的价格列
+PRICE_COLUMNS = ("open", "high", "low", "close")
+
+# 日期换算为天数后加上的偏移，保证 1900 年以来的日期都为正数，可以与代码编号组合成一个排序键
+_DAY_OFFSET = 1 << 17
+_KEY_SHIFT = 1 << 20
+
+
+class PriceAdjuster:
+    """
+    基于复权因子的向量化复权计算
+
+    不复权行情和复权因子（每次除权除息一行）按 (代码, 日期) 编码为一个 int64 排序键，
+    用 np.searchsorted 一次性为每一行找到当日生效的因子，不需要按代码循环；
+    计算量与行数成正比，分红送转只影响因子表中新增的一行
+    """
+
+    @staticmethod
+    def _sort_keys(codes: np.ndarray, dates) -> np.ndarray:
+        """
+        将代码编号和日期组合为单调的 int64 排序键
+        """
+        days = pd.to_datetime(dates).values.astype("datetime64[D]").astype(np.int64)
+        return codes.astype(np.int64) * _KEY_SHIFT + days + _DAY_OFFSET
+
+    @staticmethod
+    def row_factors(bar_keys, bar_dates, factor_keys, factor_dates, factor_values) -> tuple:
+        """
+        返回 (每行当日生效的后复权因子, 每行所属代码的最新因子)
+
+        早于第一次因子生效日期的行使用该代码的第一个因子；没有因子的代码因子为 1
+        """
+        if len(factor_values) == 0:
+            return np.ones(len(bar_keys)), np.ones(len(bar_keys))
+
+        categories = pd.Index(pd.unique(np.concatenate([np.asarray(bar_keys), np.asarray(factor_keys)])))
+        bar_codes = categories.get_indexer(bar_keys)
+        factor_codes = categories.get_indexer(factor_keys)
+
+        factor_sort = PriceAdjuster._sort_keys(factor_codes, factor_dates)
+        order = np.argsort(factor_sort, kind="stable")
+        factor_sort = factor_sort[order]
+        factor_values = np.asarray(factor_values, dtype="float64")[order]
+
+        bar_sort = PriceAdjuster._sort_keys(bar_codes, bar_dates)
+        position = np.searchsorted(factor_sort, bar_sort, side="right") - 1
+        first = np.searchsorted(factor_sort, bar_codes.astype(np.int64) * _KEY_SHIFT, side="left")
+        last = np.searchsorted(factor_sort, (bar_codes.astype(np.int64) + 1) * _KEY_SHIFT, side="left") - 1
+        has_factors = first <= last
+
+        # 日期早于第一个因子（此时落在上一个代码的因子上或越界）时回退到本代码的第一个因子
+        position = np.clip(np.maximum(position, first), 0, len(factor_values) - 1)
+        last = np.clip(last, 0, len(factor_values) - 1)
+        current = np.where(has_factors, factor_values[position], 1.0)
+        latest = np.where(has_factors, factor_values[last], 1.0)
+        return current, latest
+
+    @staticmethod
+    def adjust(bars: pd.DataFrame, factors: pd.DataFrame, mode: str, key_column="symbol",
+               price_columns=PRICE_COLUMNS) -> pd.DataFrame:
+        """
+        对不复权行情计算前复权或后复权价格，返回新的 DataFrame（成交量、成交额等其它列不变）
+
+        bars 需包含代码列、date 列和价格列；factors 需包含代码列、date 列和 hfq_factor 列
+        """
+        if mode not in ADJUST_MODES:
+            raise ValueError(f"Unknown adjust mode '{mode}', expected one of {ADJUST_MODES}")
+        if mode == ADJUST_NONE or bars.empty:
+            return bars.copy()
+
+        current, latest = PriceAdjuster.row_factors(
+            bars[key_column].to_numpy(), bars["date"],
+            factors[key_column].to_numpy(), factors["date"], factors["hfq_factor"].to_numpy(),
+        )
+        multiplier = current if mode == ADJUST_HFQ else current / latest
+        adjusted = bars.copy()
+        for name in price_columns:
+            if name in adjusted.columns:
+                adjusted[name] = adjusted[name].to_numpy(dtype="float64") * multiplier
+        return adjusted
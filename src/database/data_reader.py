@@ -0,0 +1,296 @@
+# src/database/data_reader.py
+"""
+日线数据读取模块
+"""
+
+import io
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+from sqlalchemy import select, Date, Integer, Numeric, Float, String
+
+from src.core.config import config
+from src.core.exceptions import DataReadError
+from src.core.logger import logger
+from src.database.adjustment import PriceAdjuster
+from src.database.models.adj_factor import StockAdjFactor
+from src.database.models.stock import StockDailyData
+from src.database.session import get_engine
+
+
+def _to_date(value):
+    """
+    将 YYYYMMDD 字符串、日期或时间戳统一为 date，None 原样返回
+    """
+    return None if value is None else pd.Timestamp(str(value) if isinstance(value, int) else value).date()
+
+
+def _key_column(table) -> str:
+    """
+    日线表的代码列：主键中日期以外的列（股票和指数为 symbol，概念板块为 concept_code）
+    """
+    return next(col.name for col in table.primary_key.columns if col.name != "date")
+
+
+class ReadCache:
+    """
+    最近查询结果的 LRU 缓存，按总行数限制大小
+
+    每个条目记录查询的表、代码集合（None 表示全部代码）和日期区间；
+    加载器写入数据后调用 invalidate，与写入的代码和日期有交集的条目被清除。
+    缓存只在进程内有效，其它进程写入的数据不会使本进程的缓存失效
+    """
+
+    def __init__(self, max_rows=config.READ_CACHE_MAX_ROWS):
+        """
+        初始化缓存
+        """
+        self.max_rows = max_rows
+        self._entries = OrderedDict()
+        self._rows = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """
+        读取缓存，命中时返回副本
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return entry.copy()
+
+    def put(self, key, frame: pd.DataFrame):
+        """
+        写入缓存，超过行数上限时淘汰最久未使用的条目；单个结果超过上限时不缓存
+        """
+        if len(frame) > self.max_rows:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._rows -= len(previous)
+            self._entries[key] = frame.copy()
+            self._rows += len(frame)
+            while self._rows > self.max_rows:
+                _, evicted = self._entries.popitem(last=False)
+                self._rows -= len(evicted)
+
+    def invalidate(self, table_name: str, written: dict):
+        """
+        清除与写入数据有交集的条目，written 为 {代码: (最早日期, 最晚日期)}
+        """
+        with self._lock:
+            for key in list(self._entries):
+                entry_table, keys, start_date, end_date, _ = key
+                if entry_table != table_name:
+                    continue
+                for code in (written if keys is None else keys & written.keys()):
+                    first, last = written[code]
+                    if (end_date is None or first <= end_date) and (start_date is None or last >= start_date):
+                        self._rows -= len(self._entries.pop(key))
+                        break
+
+    def __len__(self):
+        """
+        缓存条目数
+        """
+        return len(self._entries)
+
+    def clear(self):
+        """
+        清空缓存
+        """
+        with self._lock:
+            self._entries.clear()
+            self._rows = 0
+
+
+# 全局读取缓存
+read_cache = ReadCache()
+
+
+class DataReader:
+    """
+    日线数据读取器
+
+    按 代码 × 日期区间 × 列 查询日线表，返回 DataFrame（date 列为 datetime64，数值列为 float64）。
+    PostgreSQL 下完整结果通过 COPY TO 读取，比逐行构造结果快得多；大结果用 iter_chunks 通过服务器端游标分块读取，
+    内存占用与块大小成正比。完整结果会进入 LRU 缓存，加载器写入新数据时相关条目自动失效
+    """
+
+    @staticmethod
+    def _build_query(table, keys=None, start_date=None, end_date=None, columns=None, order_by_date=False):
+        """
+        构造查询：代码、日期区间过滤，按 (代码, 日期) 或 (日期, 代码) 排序
+        """
+        key_name = _key_column(table)
+        names = [key_name, "date"] + [name for name in (columns or [col.name for col in table.columns])
+                                      if name not in (key_name, "date")]
+        unknown = [name for name in names if name not in table.columns]
+        if unknown:
+            raise ValueError(f"Unknown columns for {table.name}: {unknown}")
+
+        query = select(*[table.columns[name] for name in names])
+        if keys is not None:
+            query = query.where(table.columns[key_name].in_(list(keys)))
+        if start_date is not None:
+            query = query.where(table.columns["date"] >= start_date)
+        if end_date is not None:
+            query = query.where(table.columns["date"] <= end_date)
+        order = ("date", key_name) if order_by_date else (key_name, "date")
+        return query.order_by(*[table.columns[name] for name in order]), names
+
+    @staticmethod
+    def _normalize(frame: pd.DataFrame, table) -> pd.DataFrame:
+        """
+        将查询结果转换为统一的 pandas 类型
+        """
+        for name in frame.columns:
+            column_type = table.columns[name].type
+            if isinstance(column_type, Date):
+                frame[name] = pd.to_datetime(frame[name])
+            elif isinstance(column_type, Integer):
+                frame[name] = pd.to_numeric(frame[name]).astype("Int64")
+            elif isinstance(column_type, (Numeric, Float)):
+                frame[name] = pd.to_numeric(frame[name]).astype("float64")
+            elif isinstance(column_type, String):
+                frame[name] = frame[name].astype("string")
+        return frame
+
+    @staticmethod
+    def _read_copy(engine, query, names: list, table) -> pd.DataFrame:
+        """
+        PostgreSQL 下通过 COPY (SELECT ...) TO STDOUT 读取完整结果
+        """
+        sql = str(query.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True}))
+        buffer = io.StringIO()
+        connection = engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            cursor.copy_expert(f"COPY ({sql}) TO STDOUT WITH (FORMAT csv, HEADER)", buffer)
+            cursor.close()
+            connection.commit()
+        finally:
+            connection.close()
+        buffer.seek(0)
+        string_columns = {name: "string" for name in names if isinstance(table.columns[name].type, String)}
+        return pd.read_csv(buffer, dtype=string_columns, keep_default_na=False, na_values=[""])
+
+    @staticmethod
+    def _read_rows(engine, query, names: list) -> pd.DataFrame:
+        """
+        通过普通游标读取完整结果
+        """
+        with engine.connect() as connection:
+            rows = connection.execute(query).all()
+        return pd.DataFrame.from_records(rows, columns=names)
+
+    @staticmethod
+    def read_range(model, keys=None, start_date=None, end_date=None, columns=None, use_cache=True) -> pd.DataFrame:
+        """
+        读取一组代码在日期区间内的数据，按 (代码, 日期) 排序
+
+        keys 为 None 时读取全部代码；日期可以是 YYYYMMDD 字符串或日期，None 表示不限；
+        columns 为 None 时读取全部列（代码列和 date 列总是包含在内）
+        """
+        table = model.__table__
+        keys = None if keys is None else frozenset([keys] if isinstance(keys, str) else keys)
+        start_date, end_date = _to_date(start_date), _to_date(end_date)
+        cache_key = (table.name, keys, start_date, end_date, tuple(columns) if columns else None)
+        if use_cache and config.READ_CACHE_ENABLED:
+            cached = read_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        query, names = DataReader._build_query(table, keys, start_date, end_date, columns)
+        engine = get_engine()
+        try:
+            if config.USE_PG_COPY_READER and engine.dialect.name == "postgresql":
+                frame = DataReader._read_copy(engine, query, names, table)
+            else:
+                frame = DataReader._read_rows(engine, query, names)
+        except Exception as e:
+            logger.error(f"Failed to read {table.name}: {e}")
+            raise DataReadError(f"Failed to read {table.name}: {e}")
+
+        frame = DataReader._normalize(frame, table)
+        logger.debug(f"Read {len(frame)} rows from {table.name}.")
+        if use_cache and config.READ_CACHE_ENABLED:
+            read_cache.put(cache_key, frame)
+        return frame
+
+    @staticmethod
+    def read_panel(model, keys=None, start_date=None, end_date=None, columns=None, wide=False) -> pd.DataFrame:
+        """
+        读取面板数据：以 (date, 代码) 为索引；wide 为 True 时展开为 日期 × (列, 代码) 的宽表
+        """
+        frame = DataReader.read_range(model, keys, start_date, end_date, columns)
+        key_name = _key_column(model.__table__)
+        panel = frame.set_index(["date", key_name]).sort_index()
+        return panel.unstack(key_name) if wide else panel
+
+    @staticmethod
+    def read_cross_section(model, trade_date, columns=None) -> pd.DataFrame:
+        """
+        读取某一交易日全部代码的数据（使用日期索引，分区表只扫描对应年份的分区）
+        """
+        return DataReader.read_range(model, None, trade_date, trade_date, columns)
+
+    @staticmethod
+    def read_stock_adjusted(keys=None, start_date=None, end_date=None, columns=None, adjust="qfq") -> pd.DataFrame:
+        """
+        读取股票日线并计算复权价格，adjust 为 qfq（前复权）、hfq（后复权）或空字符串（不复权）
+
+        行情按不复权存储时，读取区间内的行情和这些股票的全部复权因子后向量化计算；
+        前复权以数据库中最新的因子为基准，新的除权除息因子写入后结果随之变化。
+        STOCK_STORE_ADJUST 不为空（旧的按复权价格存储）时只能读取与存储方式相同的复权价格
+        """
+        bars = DataReader.read_range(StockDailyData, keys, start_date, end_date, columns)
+        if config.STOCK_STORE_ADJUST:
+            if adjust != config.STOCK_STORE_ADJUST:
+                raise ValueError(f"Stock bars are stored with adjust='{config.STOCK_STORE_ADJUST}', "
+                                 f"cannot compute adjust='{adjust}'")
+            return bars
+        factors = DataReader.read_range(StockAdjFactor, keys, columns=["hfq_factor"])
+        return PriceAdjuster.adjust(bars, factors, adjust)
+
+    @staticmethod
+    def iter_chunks(model, keys=None, start_date=None, end_date=None, columns=None,
+                    chunk_rows=config.READ_CHUNK_ROWS, order_by_date=False):
+        """
+        通过服务器端游标分块读取，每块最多 chunk_rows 行，用于不适合一次放入内存的大查询；结果不进入缓存
+        """
+        table = model.__table__
+        keys = None if keys is None else [keys] if isinstance(keys, str) else list(keys)
+        query, names = DataReader._build_query(
+            table, keys, _to_date(start_date), _to_date(end_date), columns, order_by_date
+        )
+        engine = get_engine()
+        with engine.connect().execution_options(stream_results=True, max_row_buffer=chunk_rows) as connection:
+            result = connection.execute(query)
+            for rows in result.partitions(chunk_rows):
+                yield DataReader._normalize(pd.DataFrame.from_records(rows, columns=names), table)
+
+    @staticmethod
+    def invalidate(model, frame: pd.DataFrame):
+        """
+        加载器写入数据后调用：清除与写入的代码和日期区间有交集的缓存条目
+        """
+        if not len(read_cache) or frame.empty or "date" not in frame.columns:
+            return
+        table = model.__table__
+        key_name = _key_column(table)
+        if key_name not in frame.columns:
+            read_cache.clear()
+            return
+        bounds = frame.groupby(key_name, observed=True)["date"].agg(["min", "max"])
+        written = {code: (_to_date(first), _to_date(last))
+                   for code, first, last in bounds.itertuples(name=None)}
+        read_cache.invalidate(table.name, written)
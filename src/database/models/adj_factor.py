@@ -0,0 +1,35 @@
+# src/database/models/adj_factor.py
+"""
+复权因子模型
+"""
+
+from sqlalchemy import Column, String, Float, Date, DateTime, PrimaryKeyConstraint
+from src.database.base import Base
+
+
+class StockAdjFactor(Base):
+    """
+    股票后复权因子模型，每次除权除息一行
+
+    某日的后复权价格 = 不复权价格 × 该日及之前最近一次的 hfq_factor；
+    前复权价格 = 后复权价格 / 最新的 hfq_factor
+    """
+    __tablename__ = "stock_adj_factor"
+
+    symbol = Column(String, nullable=False)  # 股票代码
+    date = Column(Date, nullable=False)  # 因子生效日期
+    hfq_factor = Column(Float, nullable=False)  # 后复权因子
+    updated_at = Column(DateTime, nullable=False)  # 最近一次刷新时间
+
+    __table_args__ = (
+        PrimaryKeyConstraint('symbol', 'date'),
+    )
+
+    # 定义字段映射关系，用于DataFrame转换（stock_zh_a_daily(adjust="hfq-factor") 已返回英文列名）
+    column_mappings = {
+        'date': 'date',
+        'hfq_factor': 'hfq_factor'
+    }
+
+    def __repr__(self):
+        return f"<StockAdjFactor(symbol={self.symbol}, date={self.date}, hfq_factor={self.hfq_factor})>"
@@ -3,8 +3,9 @@
 概念板块数据模型
 """
 
-from sqlalchemy import Column, String, Float, Date, Integer, PrimaryKeyConstraint
+from sqlalchemy import Column, String, Float, Date, DateTime, Integer, PrimaryKeyConstraint
 from src.database.base import Base
+from src.database.partitioning import DailyPartitioning
 
 
 class ConceptBoardData(Base):
@@ -32,7 +33,43 @@ class ConceptBoardData(Base):
 
     __table_args__ = (
         PrimaryKeyConstraint('concept_code', 'date'),
+        # 以日期开头的索引（截面查询），PostgreSQL 下可按年份分区
+        *DailyPartitioning.table_args("concept_board", "concept_code"),
+    )
+
+    # 定义字段映射关系，用于DataFrame转换
+    column_mappings = {
+        '日期': 'date',
+        '开盘': 'open',
+        '收盘': 'close',
+        '最高': 'high',
+        '最低': 'low',
+        '涨跌幅': 'change_rate',
+        '涨跌额': 'change_amount',
+        '成交量': 'volume',
+        '成交额': 'amount',
+        '振幅': 'amplitude',
+        '换手率': 'turnover_rate'
+    }
+
+    def __repr__(self):
+        return f"<ConceptBoardData(concept_name={self.concept_name}, date={self.date})>"
+
+
+class ConceptConstituent(Base):
+    """
+    概念板块成分股模型，只保存最近一次刷新时的成分股
+    """
+    __tablename__ = "concept_constituent"
+
+    concept_code = Column(String, nullable=False)  # 板块代码
+    symbol = Column(String, nullable=False)  # 股票代码（与 stock_daily_data 一致，带 sh/sz/bj 前缀）
+    concept_name = Column(String, nullable=False)  # 板块名称
+    updated_at = Column(DateTime, nullable=False)  # 最近一次刷新时间
+
+    __table_args__ = (
+        PrimaryKeyConstraint('concept_code', 'symbol'),
     )
 
     def __repr__(self):
-        return f"<ConceptBoardData(concept_name={self.concept_name}, date={self.date})>"
\ No newline at end of file
+        return f"<ConceptConstituent(concept_code={self.concept_code}, symbol={self.symbol})>"
\ No newline at end of file
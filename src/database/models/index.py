@@ -5,6 +5,7 @@
 
 from sqlalchemy import Column, String, Float, Date, BigInteger, Numeric, PrimaryKeyConstraint
 from src.database.base import Base
+from src.database.partitioning import DailyPartitioning
 
 
 class IndexDailyData(Base):
@@ -29,6 +30,8 @@ class IndexDailyData(Base):
 
     __table_args__ = (
         PrimaryKeyConstraint('symbol', 'date'),
+        # 以日期开头的索引（截面查询），PostgreSQL 下可按年份分区
+        *DailyPartitioning.table_args("index_daily_data", "symbol"),
     )
 
     # 定义字段映射关系，用于DataFrame转换
@@ -46,5 +49,10 @@ class IndexDailyData(Base):
         '换手率': 'turnover_rate'
     }
 
+    # 写入前需要换算单位的列：{列名: 除数}，成交额由元换算为万元
+    column_divisors = {
+        'amount': 10000
+    }
+
     def __repr__(self):
         return f"<IndexDailyData(symbol={self.symbol}, date={self.date})>"
\ No newline at end of file
@@ -0,0 +1,30 @@
+# src/database/models/lease.py
+"""
+分布式工作单元模型
+"""
+
+from sqlalchemy import Column, String, Integer, Text, DateTime, PrimaryKeyConstraint
+from src.database.base import Base
+
+
+class WorkUnit(Base):
+    """
+    工作单元模型，一次运行中一个数据集的代码按固定大小切分为多个单元，由各副本通过租约领取
+    """
+    __tablename__ = "work_units"
+
+    run_id = Column(String(64), nullable=False)  # 运行 ID
+    dataset = Column(String(32), nullable=False)  # 数据集（stock/index/concept）
+    unit_id = Column(Integer, nullable=False)  # 单元编号
+    item_keys = Column(Text, nullable=False)  # 单元内的代码（JSON 列表）
+    status = Column(String(16), nullable=False)  # 状态：pending/leased/done
+    owner = Column(String(128))  # 持有租约的副本
+    lease_expires_at = Column(DateTime)  # 租约到期时间（UTC）
+    updated_at = Column(DateTime, nullable=False)  # 更新时间（UTC）
+
+    __table_args__ = (
+        PrimaryKeyConstraint('run_id', 'dataset', 'unit_id'),
+    )
+
+    def __repr__(self):
+        return f"<WorkUnit(run_id={self.run_id}, dataset={self.dataset}, unit_id={self.unit_id})>"
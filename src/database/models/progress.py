@@ -0,0 +1,28 @@
+# src/database/models/progress.py
+"""
+任务进度日志模型
+"""
+
+from sqlalchemy import Column, String, DateTime, PrimaryKeyConstraint
+from src.database.base import Base
+
+
+class IngestProgress(Base):
+    """
+    任务进度日志模型，记录每次运行中每个代码的处理结果，用于中断后续跑
+    """
+    __tablename__ = "ingest_progress"
+
+    run_id = Column(String(64), nullable=False)  # 运行 ID
+    dataset = Column(String(32), nullable=False)  # 数据集（stock/index/concept）
+    item_key = Column(String(64), nullable=False)  # 代码
+    status = Column(String(16), nullable=False)  # 处理结果：done/failed
+    error = Column(String)  # 失败原因
+    updated_at = Column(DateTime, nullable=False)  # 更新时间
+
+    __table_args__ = (
+        PrimaryKeyConstraint('run_id', 'dataset', 'item_key'),
+    )
+
+    def __repr__(self):
+        return f"<IngestProgress(run_id={self.run_id}, dataset={self.dataset}, item_key={self.item_key})>"
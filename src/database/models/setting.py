@@ -0,0 +1,21 @@
+# src/database/models/setting.py
+"""
+存储设置模型
+"""
+
+from sqlalchemy import Column, String, DateTime
+from src.database.base import Base
+
+
+class StorageSetting(Base):
+    """
+    存储设置模型，记录已写入数据的存储方式（如股票日线的复权方式），防止更改配置后新旧数据混在同一张表中
+    """
+    __tablename__ = "storage_settings"
+
+    name = Column(String(64), primary_key=True)  # 设置名称
+    value = Column(String(64), nullable=False)  # 设置值
+    updated_at = Column(DateTime, nullable=False)  # 更新时间
+
+    def __repr__(self):
+        return f"<StorageSetting(name={self.name}, value={self.value})>"
@@ -5,6 +5,7 @@
 
 from sqlalchemy import Column, String, Float, Date, PrimaryKeyConstraint
 from src.database.base import Base
+from src.database.partitioning import DailyPartitioning
 
 
 class StockDailyData(Base):
@@ -26,7 +27,22 @@ class StockDailyData(Base):
 
     __table_args__ = (
         PrimaryKeyConstraint('symbol', 'date'),
+        # 以日期开头的索引（截面查询），PostgreSQL 下可按年份分区
+        *DailyPartitioning.table_args("stock_daily_data", "symbol"),
     )
 
+    # 定义字段映射关系，用于DataFrame转换（stock_zh_a_daily 已返回英文列名）
+    column_mappings = {
+        'date': 'date',
+        'open': 'open',
+        'close': 'close',
+        'high': 'high',
+        'low': 'low',
+        'volume': 'volume',
+        'amount': 'amount',
+        'outstanding_share': 'outstanding_share',
+        'turnover': 'turnover'
+    }
+
     def __repr__(self):
         return f"<StockDailyData(symbol={self.symbol}, date={self.date})>"
\ No newline at end of file
@@ -0,0 +1,184 @@
+# src/database/partitioning.py
+"""
+日线表按年份分区和日期索引
+"""
+
+import threading
+from datetime import date
+
+from sqlalchemy import Index, text
+
+from src.core.config import config
+from src.core.logger import logger
+
+
+class DailyPartitioning:
+    """
+    日线表的存储布局
+
+    默认每张日线表只有 (代码, 日期) 主键，按日期截面查询（某一天的全部股票）需要扫描整张表。
+    这里为日线表增加以日期开头的索引（btree 或 BRIN）；PostgreSQL 下启用 DAILY_PARTITIONING_ENABLED 时
+    表按年份范围分区，截面查询和按日期区间的查询只扫描对应年份的分区。
+    分区由 init_database 预先创建到下一年，加载器写入前确保批次涉及的年份都有分区
+    """
+
+    _known_partitions = set()
+    _partitioned_tables = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def table_args(table_name: str, key_column: str) -> tuple:
+        """
+        模型 __table_args__ 中追加的日期索引和分区选项
+        """
+        if config.DAILY_DATE_INDEX_TYPE == "brin":
+            index = Index(f"ix_{table_name}_date", "date", postgresql_using="brin")
+        else:
+            index = Index(f"ix_{table_name}_date", "date", key_column)
+        options = {"postgresql_partition_by": "RANGE (date)"} if config.DAILY_PARTITIONING_ENABLED else {}
+        return index, options
+
+    @staticmethod
+    def enabled(engine) -> bool:
+        """
+        是否使用分区布局
+        """
+        return config.DAILY_PARTITIONING_ENABLED and engine.dialect.name == "postgresql"
+
+    @staticmethod
+    def is_partitioned(connection, table_name: str) -> bool:
+        """
+        表是否已是分区表
+        """
+        return connection.execute(text(
+            "SELECT 1 FROM pg_partitioned_table pt JOIN pg_class c ON c.oid = pt.partrelid "
+            "WHERE c.relname = :name AND pg_table_is_visible(c.oid)"
+        ), {"name": table_name}).first() is not None
+
+    @staticmethod
+    def partitioned_in_database(engine, table_name: str) -> bool:
+        """
+        数据库中的表是否为分区表，按实际表结构而不是当前配置判断；结果在进程内缓存
+        """
+        if engine.dialect.name != "postgresql":
+            return False
+        if table_name not in DailyPartitioning._partitioned_tables:
+            with engine.connect() as connection:
+                DailyPartitioning._partitioned_tables[table_name] = DailyPartitioning.is_partitioned(
+                    connection, table_name
+                )
+        return DailyPartitioning._partitioned_tables[table_name]
+
+    @staticmethod
+    def partition_name(table_name: str, year: int) -> str:
+        """
+        年份分区的表名
+        """
+        return f"{table_name}_y{year}"
+
+    @staticmethod
+    def _create_partition(connection, quote, table_name: str, year: int):
+        """
+        创建一个年份分区
+        """
+        connection.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {quote(DailyPartitioning.partition_name(table_name, year))} "
+            f"PARTITION OF {quote(table_name)} FOR VALUES FROM ('{date(year, 1, 1)}') TO ('{date(year + 1, 1, 1)}')"
+        ))
+
+    @staticmethod
+    def is_partition_table(table) -> bool:
+        """
+        模型的表是否定义为分区表
+        """
+        return table.dialect_options["postgresql"]["partition_by"] is not None
+
+    @staticmethod
+    def ensure_year_partitions(engine, table, years):
+        """
+        确保各年份的分区存在，已确认存在的分区在进程内缓存
+        """
+        missing = sorted({int(year) for year in years} - {
+            year for name, year in DailyPartitioning._known_partitions if name == table.name
+        })
+        if not missing:
+            return
+        quote = engine.dialect.identifier_preparer.quote
+        with DailyPartitioning._lock:
+            for year in missing:
+                try:
+                    with engine.begin() as connection:
+                        DailyPartitioning._create_partition(connection, quote, table.name, year)
+                except Exception as e:
+                    # 其它副本同时创建同一分区时 IF NOT EXISTS 仍可能报错，确认分区存在即可
+                    partition = DailyPartitioning.partition_name(table.name, year)
+                    with engine.connect() as connection:
+                        exists = connection.execute(text("SELECT to_regclass(:name)"), {"name": partition}).scalar()
+                    if exists is None:
+                        raise
+                    logger.debug(f"Partition {partition} was created concurrently: {e}")
+                DailyPartitioning._known_partitions.add((table.name, year))
+        logger.info(f"Ensured partitions of {table.name} for years {missing}.")
+
+    @staticmethod
+    def ensure_for_frame(engine, model, frame):
+        """
+        写入前确保批次涉及的年份都有分区（prepare_frame 之后日期列为 date 对象），表不是分区表时不做任何事
+        """
+        table = model.__table__
+        if frame.empty or "date" not in frame.columns \
+                or not DailyPartitioning.partitioned_in_database(engine, table.name):
+            return
+        DailyPartitioning.ensure_year_partitions(engine, table, {value.year for value in frame["date"].unique()})
+
+    @staticmethod
+    def initial_years() -> range:
+        """
+        init_database 预先创建分区的年份：DAILY_PARTITION_START_YEAR 到下一年
+        """
+        return range(config.DAILY_PARTITION_START_YEAR, date.today().year + 2)
+
+    @staticmethod
+    def migrate(engine, table):
+        """
+        将已有的普通日线表迁移为按年份分区的表：旧表改名后创建分区表，复制数据，再删除旧表
+
+        在一个事务中完成，失败时整体回滚；复制期间表被锁定，应在没有摄取任务运行时执行
+        """
+        if not DailyPartitioning.enabled(engine) or not DailyPartitioning.is_partition_table(table):
+            raise ValueError("Partition migration requires PostgreSQL and DAILY_PARTITIONING_ENABLED=True")
+        quote = engine.dialect.identifier_preparer.quote
+        legacy = f"{table.name}_unpartitioned"
+        with engine.begin() as connection:
+            if DailyPartitioning.is_partitioned(connection, table.name):
+                logger.info(f"{table.name} is already partitioned, skipping migration.")
+                return
+            years = connection.execute(text(
+                f"SELECT EXTRACT(YEAR FROM MIN(date))::int, EXTRACT(YEAR FROM MAX(date))::int FROM {quote(table.name)}"
+            )).first()
+            connection.execute(text(f"ALTER TABLE {quote(table.name)} RENAME TO {quote(legacy)}"))
+            # 主键和索引名称在模式内唯一，改名后新表才能使用原来的名称
+            for constraint in connection.execute(text(
+                "SELECT conname FROM pg_constraint WHERE conrelid = to_regclass(:name)"
+            ), {"name": legacy}).scalars().all():
+                connection.execute(text(
+                    f"ALTER TABLE {quote(legacy)} RENAME CONSTRAINT {quote(constraint)} "
+                    f"TO {quote(constraint + '_unpartitioned')}"
+                ))
+            for index in table.indexes:
+                connection.execute(text(
+                    f"ALTER INDEX IF EXISTS {quote(index.name)} RENAME TO {quote(index.name + '_unpartitioned')}"
+                ))
+
+            table.create(connection)
+            first_year = years[0] if years[0] is not None else date.today().year
+            last_year = max(years[1] or first_year, date.today().year + 1)
+            for year in range(min(first_year, config.DAILY_PARTITION_START_YEAR), last_year + 1):
+                DailyPartitioning._create_partition(connection, quote, table.name, year)
+            columns = ", ".join(quote(col.name) for col in table.columns)
+            copied = connection.execute(text(
+                f"INSERT INTO {quote(table.name)} ({columns}) SELECT {columns} FROM {quote(legacy)}"
+            )).rowcount
+            connection.execute(text(f"DROP TABLE {quote(legacy)}"))
+        DailyPartitioning._partitioned_tables[table.name] = True
+        logger.info(f"Migrated {copied} rows of {table.name} to a table partitioned by year.")
@@ -3,16 +3,84 @@
 数据库会话管理模块
 """
 
+import threading
+from contextlib import contextmanager
+
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import sessionmaker, scoped_session
 from .base import Base
 from src.core.config import config
 
-# 创建数据库引擎
-engine = create_engine(config.DATABASE_URL)
+
+def _engine_options(url) -> dict:
+    """
+    按数据库类型生成引擎参数：连接池大小、溢出、回收和取用前探测；psycopg2 启用批量 executemany
+
+    SQLite 使用 SQLAlchemy 默认的连接池，不设置池大小
+    """
+    url = make_url(url)
+    options = {"pool_pre_ping": config.DB_POOL_PRE_PING}
+    if url.get_backend_name() != "sqlite":
+        options.update(
+            pool_size=config.DB_POOL_SIZE,
+            max_overflow=config.DB_MAX_OVERFLOW,
+            pool_timeout=config.DB_POOL_TIMEOUT,
+            pool_recycle=config.DB_POOL_RECYCLE,
+        )
+    if url.get_backend_name() == "postgresql" and url.get_driver_name() == "psycopg2":
+        options.update(
+            executemany_mode=config.PG_EXECUTEMANY_MODE,
+            executemany_batch_page_size=config.PG_EXECUTEMANY_PAGE_SIZE,
+            insertmanyvalues_page_size=config.PG_EXECUTEMANY_PAGE_SIZE,
+        )
+    return options
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine():
+    """
+    获取数据库引擎，首次调用时才创建（导入本模块不会加载数据库驱动或建立连接池）
+    """
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = create_engine(config.DATABASE_URL, **_engine_options(config.DATABASE_URL))
+    return _engine
+
+
+def __getattr__(name):
+    """
+    兼容 from src.database.session import engine，访问时才创建引擎
+    """
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class _LazySessionmaker(sessionmaker):
+    """
+    首次创建会话时才绑定引擎的会话工厂
+    """
+
+    def __call__(self, **local_kw):
+        """
+        创建会话，必要时先绑定引擎
+        """
+        if self.kw.get("bind") is None:
+            self.configure(bind=get_engine())
+        return super().__call__(**local_kw)
+
 
 # 创建会话工厂
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = _LazySessionmaker(autocommit=False, autoflush=False)
+
+# 线程本地会话：加载线程在整个运行期间复用同一个会话
+WorkerSession = scoped_session(SessionLocal)
 
 
 # 创建数据库表
@@ -20,7 +88,7 @@ def create_tables():
     """
     创建数据库表
     """
-    Base.metadata.create_all(bind=engine)
+    Base.metadata.create_all(bind=get_engine())
 
 
 # 获取数据库会话
@@ -32,4 +100,27 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+@contextmanager
+def worker_session():
+    """
+    为当前线程绑定一个会话，退出时关闭会话并归还连接；期间 session_scope() 都返回这个会话
+    """
+    try:
+        yield WorkerSession()
+    finally:
+        WorkerSession.remove()
+
+
+@contextmanager
+def session_scope():
+    """
+    返回当前线程绑定的会话；没有绑定时创建临时会话，用完关闭
+    """
+    if WorkerSession.registry.has():
+        yield WorkerSession()
+        return
+    with SessionLocal() as db:
+        yield db
@@ -0,0 +1,33 @@
+# src/utils/date_utils.py
+"""
+日期工具模块
+"""
+
+from datetime import timedelta
+
+
+def next_start_date(last_date, default_start):
+    """
+    根据已存储的最后日期计算增量下载的起始日期 (YYYYMMDD)
+
+    没有历史数据时返回 default_start
+    """
+    if last_date is None:
+        return default_start
+    return (last_date + timedelta(days=1)).strftime("%Y%m%d")
+
+
+def is_range_empty(start_date, end_date):
+    """
+    判断 YYYYMMDD 格式的日期区间是否为空（起始日期晚于结束日期）
+    """
+    return start_date > end_date
+
+
+if __name__ == '__main__':
+    # 示例用法
+    from datetime import date
+
+    print(next_start_date(None, "20040101"))
+    print(next_start_date(date(2024, 12, 31), "20040101"))
+    print(is_range_empty("20250102", "20250101"))
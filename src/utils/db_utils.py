@@ -3,8 +3,8 @@
 数据库工具模块
 """
 
-from sqlalchemy import inspect
-from src.database.session import engine
+from sqlalchemy import inspect, text
+from src.database.session import get_engine
 from src.core.logger import logger
 from scripts.init_db import init_database  # 避免循环引用，这里直接import脚本
 
@@ -12,13 +12,24 @@ def check_database_initialized():
     """
     检查数据库是否已经初始化
     """
-    inspector = inspect(engine)
+    inspector = inspect(get_engine())
     # 检查必要的表是否存在
-    required_tables = {'concept_board', 'index_daily_data', 'stock_daily_data'}  # 根据实际表名调整
+    required_tables = {  # 根据实际表名调整
+        'concept_board', 'concept_constituent', 'index_daily_data', 'stock_daily_data', 'stock_adj_factor', 'ingest_progress', 'work_units', 'storage_settings'
+    }
     existing_tables = set(inspector.get_table_names())
     return required_tables.issubset(existing_tables)
 
 
+def check_database_connection():
+    """
+    检查数据库能否连接，用于就绪探针
+    """
+    with get_engine().connect() as connection:
+        connection.execute(text("SELECT 1"))
+    return True
+
+
 def initialize_database_if_needed():
     """
     检查数据库是否初始化，未初始化则进行初始化
@@ -0,0 +1,61 @@
+# src/utils/lazy_import.py
+"""
+延迟导入工具模块
+"""
+
+import importlib
+import sys
+import threading
+import types
+
+
+class LazyModule(types.ModuleType):
+    """
+    延迟导入的模块代理：首次访问属性时才真正导入模块，之后直接转发属性访问
+
+    用于 akshare 这类导入开销很大、但 --help 等路径完全用不到的依赖。导入过程加锁，
+    多个获取线程同时首次访问时只导入一次
+    """
+
+    def __init__(self, name: str):
+        """
+        初始化模块代理，此时不导入模块
+        """
+        super().__init__(name)
+        self._lock = threading.Lock()
+        self._module = None
+
+    def _load(self) -> types.ModuleType:
+        """
+        导入并返回实际模块
+        """
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    self._module = importlib.import_module(self.__name__)
+        return self._module
+
+    def __getattr__(self, attr):
+        """
+        转发属性访问到实际模块
+        """
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        """
+        列出实际模块的属性
+        """
+        return dir(self._load())
+
+
+def lazy_import(name: str) -> types.ModuleType:
+    """
+    返回模块本身（已导入时）或延迟导入的模块代理
+    """
+    return importlib.import_module(name) if name in sys.modules else LazyModule(name)
+
+
+if __name__ == '__main__':
+    # 示例用法
+    json = lazy_import("json")
+    print(json.dumps({"lazy": True}))
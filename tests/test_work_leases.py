@@ -0,0 +1,65 @@
+# tests/test_work_leases.py
+"""
+工作单元租约测试
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+
+from src.core.metrics import health
+from src.database.session import SessionLocal
+from src.database.models.lease import WorkUnit
+from src.data_ingestion.tasks.work_leases import WorkLeaseManager, STATUS_LEASED
+
+
+@pytest.fixture
+def lease_db(tmp_path):
+    """
+    使用临时 SQLite 数据库的会话工厂
+    """
+    engine = create_engine(f"sqlite:///{tmp_path / 'leases.db'}")
+    WorkUnit.__table__.create(bind=engine)
+    previous_bind = SessionLocal.kw.get("bind")
+    SessionLocal.configure(bind=engine)
+    yield engine
+    SessionLocal.configure(bind=previous_bind)
+    engine.dispose()
+
+
+def test_claim_wait_longer_than_stall_window_stays_alive(lease_db):
+    """
+    等待其它副本的租约超过 HEALTH_STALL_SECONDS 时，存活探针仍然返回存活
+    """
+    leases = WorkLeaseManager("stock", run_id="test", owner="replica-a", poll_interval=0.05)
+    leases.plan(["600000", "600001"])
+    with SessionLocal() as db:
+        db.query(WorkUnit).update({
+            "status": STATUS_LEASED, "owner": "replica-b",
+            "lease_expires_at": datetime.utcnow() + timedelta(seconds=1.5),
+        }, synchronize_session=False)
+        db.commit()
+
+    previous_stall_seconds = health.stall_seconds
+    health.stall_seconds = 0.5
+    health.task_started()
+    claimed = []
+    try:
+        waiter = threading.Thread(target=lambda: claimed.append(leases.claim()))
+        waiter.start()
+        probes = []
+        while waiter.is_alive():
+            probes.append(health.is_alive())
+            time.sleep(0.05)
+        waiter.join()
+    finally:
+        health.task_finished()
+        health.stall_seconds = previous_stall_seconds
+
+    # 等待时间超过存活窗口，期间每次探测都为存活，租约过期后接管单元
+    assert len(probes) * 0.05 > 0.5
+    assert all(probes)
+    assert claimed == [(0, ["600000", "600001"])]